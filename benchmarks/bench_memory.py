@@ -0,0 +1,72 @@
+"""
+Memory benchmark: ``FSE`` versus ``CompactFSE`` and ``AssessmentChecklist``
+versus ``CompactChecklist``.
+
+Builds N assessed establishments (and N checklists) in each layout and
+reports the memory allocated, as measured by ``tracemalloc``. Run from the
+project root:
+
+    python benchmarks/bench_memory.py --records 100000
+"""
+import argparse
+import os
+import random
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fse_rating_system.models import FSE, AssessmentChecklist, CompactFSE, CompactChecklist
+from fse_rating_system.schema import DEFAULT_SCHEMA
+
+
+def measure(build, records: int) -> int:
+    tracemalloc.start()
+    objects = build(records)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+    return size
+
+
+def make_fses(cls):
+    def build(records):
+        rng = random.Random(42)
+        fses = []
+        for i in range(records):
+            fse = cls(f"FSE {i}", f"Location {i % 50}", f"Owner {i}", f"555-{i:07d}")
+            fse.assessment_scores = {
+                name: rng.randint(0, max_score)
+                for name, max_score in zip(DEFAULT_SCHEMA.part_names, DEFAULT_SCHEMA.max_scores)
+            }
+            fse.total_score = sum(fse.assessment_scores.values())
+            fses.append(fse)
+        return fses
+    return build
+
+
+def make_checklists(cls):
+    def build(records):
+        return [cls() for _ in range(records)]
+    return build
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=100000)
+    args = parser.parse_args()
+
+    rows = [
+        ("FSE", make_fses(FSE)),
+        ("CompactFSE", make_fses(CompactFSE)),
+        ("AssessmentChecklist", make_checklists(AssessmentChecklist)),
+        ("CompactChecklist", make_checklists(CompactChecklist)),
+    ]
+    print(f"{'layout':<20} {'total MiB':>10} {'bytes/record':>13}")
+    for label, build in rows:
+        size = measure(build, args.records)
+        print(f"{label:<20} {size / 2**20:>10.1f} {size / args.records:>13.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+SMS rendering micro-benchmark.
+
+Compares the original f-string implementation of ``format_assessment_sms``
+(which built a new ``AssessmentChecklist`` per message to get the maximum
+score) with the current template-based one and with calling a compiled
+template directly. Run from the project root:
+
+    python benchmarks/bench_sms_render.py --messages 200000
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fse_rating_system.models import FSE, AssessmentChecklist
+from fse_rating_system.notifications import format_assessment_sms
+from fse_rating_system.templates import get_template
+
+
+def legacy_format_assessment_sms(fse: FSE) -> str:
+    """The implementation of format_assessment_sms before templates were compiled."""
+    if fse.total_score is None or fse.star_rating is None:
+        return "Assessment data for SMS is incomplete. Cannot generate message."
+    max_score = AssessmentChecklist().get_max_total_score()
+    return (
+        f"Dear {fse.owner_name},\n"
+        f"The food safety assessment for '{fse.name}' is complete.\n"
+        f"Final Score: {fse.total_score}/{max_score}.\n"
+        f"Star Rating: {fse.star_rating} Star(s).\n"
+        f"Thank you."
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=200000)
+    args = parser.parse_args()
+
+    fse = FSE("The Corner Cafe", "789 Main St", "Sarah Owner", "555-8765")
+    fse.total_score = 85
+    fse.star_rating = 4
+    template = get_template()
+    assert legacy_format_assessment_sms(fse) == format_assessment_sms(fse) == template.render(fse)
+
+    cases = [
+        ("legacy f-string", lambda: legacy_format_assessment_sms(fse)),
+        ("format_assessment_sms", lambda: format_assessment_sms(fse)),
+        ("template.render", lambda: template.render(fse)),
+    ]
+    print(f"{'implementation':<24} {'ns/message':>11} {'messages/s':>12}")
+    for label, func in cases:
+        seconds = min(timeit.repeat(func, number=args.messages, repeat=3))
+        print(f"{label:<24} {seconds / args.messages * 1e9:>11.0f} {args.messages / seconds:>12.0f}")
+    print(f"\nTemplate cost: {template.encoding}, up to {template.max_length} units, "
+          f"{template.max_segments} segment(s) per message")
+
+
+if __name__ == "__main__":
+    main()
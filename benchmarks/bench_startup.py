@@ -0,0 +1,69 @@
+"""
+Start-up time of the command-line interface.
+
+Runs ``python -X importtime`` on the CLI (and optionally other modules)
+several times, and reports the total import time, the slowest imports and
+the wall-clock time of a complete ``main_cli.py --help`` run. Run from the
+project root:
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --module fse_rating_system.bulk --top 15
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_times(module: str) -> dict:
+    """Imports ``module`` in a fresh interpreter and returns ``{module: cumulative_us}`` for each import."""
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                               cwd=ROOT, capture_output=True, text=True, check=True)
+    times = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line.split("|")
+        times[name.strip()] = int(cumulative_us)
+    return times
+
+
+def wall_time(argv: list[str]) -> float:
+    """Returns the wall-clock seconds of running ``python argv`` to completion."""
+    start = time.perf_counter()
+    subprocess.run([sys.executable] + argv, cwd=ROOT, capture_output=True, check=True)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="main_cli", help="Module to import (default: main_cli).")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement; the best is kept.")
+    parser.add_argument("--top", type=int, default=10, help="Number of slowest imports to list.")
+    parser.add_argument("--json", dest="json_path", help="Write the results to this JSON file.")
+    args = parser.parse_args()
+
+    runs = [import_times(args.module) for _ in range(args.repeat)]
+    best = min(runs, key=lambda times: times[args.module])
+    walls = [wall_time(["main_cli.py", "--help"]) for _ in range(args.repeat)]
+
+    print(f"import {args.module}: {best[args.module] / 1000:.1f} ms (best of {args.repeat})")
+    print(f"main_cli.py --help wall time: {min(walls) * 1000:.1f} ms best, "
+          f"{sum(walls) / len(walls) * 1000:.1f} ms mean")
+    print("\nSlowest imports (cumulative ms):")
+    slowest = sorted(best.items(), key=lambda item: item[1], reverse=True)
+    for name, cumulative_us in slowest[1:args.top + 1]:
+        print(f"  {cumulative_us / 1000:>8.1f}  {name}")
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump({"module": args.module, "import_us": best[args.module], "help_wall_seconds": min(walls),
+                       "imports_us": best}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
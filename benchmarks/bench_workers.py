@@ -0,0 +1,43 @@
+"""
+Scaling benchmark for the multi-process bulk path.
+
+Writes a synthetic JSON Lines file and times ``run_batch`` with 1, 2, 4 and
+8 workers. Run from the project root:
+
+    python benchmarks/bench_workers.py --records 200000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fse_rating_system.bulk import run_batch
+from benchmarks.datagen import write_jsonl
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=100000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        in_path = os.path.join(tmp, "input.jsonl")
+        out_path = os.path.join(tmp, "output.jsonl")
+        write_jsonl(in_path, args.records)
+
+        print(f"{'workers':>8} {'seconds':>10} {'records/s':>12} {'speedup':>8}")
+        baseline = None
+        for workers in args.workers:
+            start = time.perf_counter()
+            run_batch(in_path, out_path, workers=workers)
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(f"{workers:>8} {elapsed:>10.2f} {args.records / elapsed:>12.0f} {baseline / elapsed:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Seeded synthetic data for the benchmarks.
+
+The same seed always produces the same establishments and scores, so runs
+on different machines or commits measure the same work.
+"""
+import json
+import random
+
+from fse_rating_system.schema import DEFAULT_SCHEMA, ChecklistSchema
+
+
+def generate_scores(count: int, seed: int = 42, schema: ChecklistSchema = DEFAULT_SCHEMA,
+                    invalid_rate: float = 0.0) -> list[tuple]:
+    """
+    Returns ``count`` rows of part scores in schema order.
+
+    A fraction ``invalid_rate`` of the rows has one score above its part's maximum.
+    """
+    rng = random.Random(seed)
+    rows = []
+    for _ in range(count):
+        row = [rng.randint(0, max_score) for max_score in schema.max_scores]
+        if invalid_rate and rng.random() < invalid_rate:
+            part = rng.randrange(len(row))
+            row[part] = schema.max_scores[part] + 1
+        rows.append(tuple(row))
+    return rows
+
+
+def generate_records(count: int, seed: int = 42, schema: ChecklistSchema = DEFAULT_SCHEMA,
+                     invalid_rate: float = 0.0, locations: int = 50, owners: int = 1000):
+    """Yields ``count`` bulk-pipeline records (see ``bulk.read_records``)."""
+    rng = random.Random(seed + 1)
+    for i, row in enumerate(generate_scores(count, seed, schema, invalid_rate)):
+        yield {
+            "name": f"FSE {i}",
+            "location": f"Location {i % locations}",
+            "owner_name": f"Owner {i % owners}",
+            "owner_contact": f"555-{i % owners:04d}",
+            "background_info": {
+                "Date of Assessment": f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+                "Assessor Name": f"Assessor {rng.randint(1, 20)}",
+            },
+            "scores": dict(zip(schema.part_names, row)),
+        }
+
+
+def write_jsonl(path: str, count: int, seed: int = 42, **options):
+    """Writes ``count`` generated records to a JSON Lines file."""
+    with open(path, "w", encoding="utf-8") as f:
+        for record in generate_records(count, seed, **options):
+            f.write(json.dumps(record) + "\n")
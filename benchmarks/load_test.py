@@ -0,0 +1,113 @@
+"""
+Load test for the HTTP assessment service.
+
+Starts an ``AssessmentService`` in-process (or targets a running one with
+``--url``), opens ``--concurrency`` keep-alive connections and sends
+``--requests`` seeded assessment submissions spread over them. Reports the
+p50/p99 latency and requests per second. Run from the project root:
+
+    python benchmarks/load_test.py --requests 5000 --concurrency 50
+    python benchmarks/load_test.py --batch-window 0   # micro-batching off
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fse_rating_system.service import AssessmentService
+from benchmarks.datagen import generate_records
+
+
+async def _request(reader, writer, host: str, path: str, record: dict) -> int:
+    body = json.dumps(record).encode("utf-8")
+    writer.write((
+        f"POST {path} HTTP/1.1\r\n"
+        f"Host: {host}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n"
+    ).encode("ascii") + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+async def _client(host: str, port: int, records: list, latencies: list, statuses: dict):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for record in records:
+            start = time.perf_counter()
+            status = await _request(reader, writer, f"{host}:{port}", "/assess", record)
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+    finally:
+        writer.close()
+
+
+async def run_load(url: str, records: list, concurrency: int) -> dict:
+    """Sends ``records`` over ``concurrency`` connections and returns latency statistics."""
+    parts = urlsplit(url)
+    latencies, statuses = [], {}
+    shares = [records[i::concurrency] for i in range(concurrency)]
+    start = time.perf_counter()
+    await asyncio.gather(*(_client(parts.hostname, parts.port, share, latencies, statuses)
+                           for share in shares if share))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "seconds": elapsed,
+        "requests_per_sec": len(latencies) / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+        "statuses": statuses,
+    }
+
+
+async def main_async(args) -> dict:
+    records = list(generate_records(args.requests, args.seed))
+    if args.url:
+        return await run_load(args.url, records, args.concurrency)
+    async with AssessmentService(port=0, batch_window=args.batch_window, max_batch=args.max_batch) as service:
+        report = await run_load(service.url, records, args.concurrency)
+        report["micro_batches"] = service.stats["batches"]
+        return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="URL of a running service; by default one is started in-process.")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50, help="Number of keep-alive connections.")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-window", type=float, default=0.002)
+    parser.add_argument("--max-batch", type=int, default=256)
+    parser.add_argument("--json", dest="json_path", help="Write the report to this JSON file.")
+    args = parser.parse_args()
+
+    report = asyncio.run(main_async(args))
+    print(f"{report['requests']} requests in {report['seconds']:.2f}s: "
+          f"{report['requests_per_sec']:.0f} req/s, p50 {report['p50_ms']:.2f} ms, p99 {report['p99_ms']:.2f} ms")
+    print(f"Status codes: {report['statuses']}")
+    if "micro_batches" in report:
+        print(f"Micro-batches: {report['micro_batches']}")
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+Benchmark suite for the FSE Rating System.
+
+Times the hot paths on seeded synthetic data:
+
+    set_score, get_total_score, calculate_star_rating, perform_assessment,
+    perform_assessments_batch, format_assessment_sms, and an end-to-end
+    run_batch over N establishments.
+
+Each benchmark reports the best of several repeats as operations per second.
+The result caches are off unless ``--cache-size`` is given, so repeats
+measure the uncached hot paths.
+Results can be saved as JSON and compared against a saved baseline; any
+benchmark that is slower than the baseline by more than the threshold is
+flagged and the runner exits with status 1. Run from the project root:
+
+    python benchmarks/run.py --json baseline.json
+    # ... change the code ...
+    python benchmarks/run.py --compare baseline.json --threshold 0.10
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fse_rating_system.models import FSE, AssessmentChecklist
+from fse_rating_system.assessment import calculate_star_rating, perform_assessment, perform_assessments_batch
+from fse_rating_system.notifications import format_assessment_sms
+from fse_rating_system.bulk import run_batch
+from fse_rating_system.schema import DEFAULT_SCHEMA
+from fse_rating_system import cache
+from benchmarks.datagen import generate_scores, write_jsonl
+
+
+def bench_set_score(rows):
+    part_names = DEFAULT_SCHEMA.part_names
+    checklist = AssessmentChecklist()
+    def run():
+        for row in rows:
+            for part_name, score in zip(part_names, row):
+                checklist.set_score(part_name, score)
+    return run, len(rows) * len(part_names)
+
+
+def bench_get_total_score(rows):
+    checklists = []
+    for row in rows[:1000]:
+        checklist = AssessmentChecklist()
+        for part_name, score in zip(DEFAULT_SCHEMA.part_names, row):
+            checklist.set_score(part_name, score)
+        checklists.append(checklist)
+    def run():
+        for checklist in checklists:
+            checklist.get_total_score()
+    return run, len(checklists)
+
+
+def bench_calculate_star_rating(rows):
+    totals = [sum(row) for row in rows]
+    def run():
+        for total in totals:
+            calculate_star_rating(total, 100)
+    return run, len(totals)
+
+
+def bench_perform_assessment(rows):
+    records = [dict(zip(DEFAULT_SCHEMA.part_names, row)) for row in rows]
+    fse = FSE("Benchmark Cafe", "Accra", "Owner", "555-0000")
+    def run():
+        for scores in records:
+            perform_assessment(fse, scores)
+    return run, len(records)
+
+
+def bench_perform_assessments_batch(rows):
+    def run():
+        perform_assessments_batch(rows)
+    return run, len(rows)
+
+
+def bench_format_assessment_sms(rows):
+    fses = []
+    for i, row in enumerate(rows[:1000]):
+        fse = FSE(f"FSE {i}", "Accra", f"Owner {i}", "555-0000")
+        fse.total_score = sum(row)
+        fse.star_rating = DEFAULT_SCHEMA.star_rating(fse.total_score)
+        fses.append(fse)
+    def run():
+        for fse in fses:
+            format_assessment_sms(fse)
+    return run, len(fses)
+
+
+def bench_end_to_end(records, tmp):
+    in_path = os.path.join(tmp, "input.jsonl")
+    out_path = os.path.join(tmp, "output.jsonl")
+    write_jsonl(in_path, records)
+    def run():
+        run_batch(in_path, out_path)
+    return run, records
+
+
+def measure(run, operations: int, repeat: int) -> dict:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    best = min(timings)
+    return {"ops": operations, "seconds": best, "ops_per_sec": operations / best,
+            "ns_per_op": best / operations * 1e9}
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """Returns the names of benchmarks more than ``threshold`` slower than the baseline."""
+    regressions = []
+    print(f"\n{'benchmark':<28} {'baseline ops/s':>15} {'current ops/s':>15} {'change':>8}")
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before = baseline[name]["ops_per_sec"]
+        change = result["ops_per_sec"] / before - 1
+        flag = ""
+        if change < -threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<28} {before:>15.0f} {result['ops_per_sec']:>15.0f} {change:>+7.1%}{flag}")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=20000, help="Synthetic assessments per benchmark.")
+    parser.add_argument("--repeat", type=int, default=3, help="Repeats per benchmark; the best is kept.")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--cache-size", type=int, default=0,
+                        help="Result cache size (default: 0 = caching off).")
+    parser.add_argument("--only", nargs="+", help="Run only these benchmarks.")
+    parser.add_argument("--json", dest="json_path", help="Write the results to this JSON file.")
+    parser.add_argument("--compare", dest="baseline_path", help="Compare against a saved JSON baseline.")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Allowed slowdown before a benchmark is flagged (default: 0.10 = 10%%).")
+    args = parser.parse_args(argv)
+    cache.configure(args.cache_size)
+
+    rows = generate_scores(args.records, args.seed)
+    benchmarks = {
+        "set_score": lambda tmp: bench_set_score(rows),
+        "get_total_score": lambda tmp: bench_get_total_score(rows),
+        "calculate_star_rating": lambda tmp: bench_calculate_star_rating(rows),
+        "perform_assessment": lambda tmp: bench_perform_assessment(rows),
+        "perform_assessments_batch": lambda tmp: bench_perform_assessments_batch(rows),
+        "format_assessment_sms": lambda tmp: bench_format_assessment_sms(rows),
+        "end_to_end_batch": lambda tmp: bench_end_to_end(args.records, tmp),
+    }
+    if args.only:
+        unknown = set(args.only) - set(benchmarks)
+        if unknown:
+            parser.error(f"Unknown benchmarks: {', '.join(sorted(unknown))}")
+        benchmarks = {name: setup for name, setup in benchmarks.items() if name in args.only}
+
+    results = {}
+    print(f"{'benchmark':<28} {'ops/s':>12} {'ns/op':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, setup in benchmarks.items():
+            run, operations = setup(tmp)
+            results[name] = measure(run, operations, args.repeat)
+            print(f"{name:<28} {results[name]['ops_per_sec']:>12.0f} {results[name]['ns_per_op']:>10.0f}")
+
+    if args.json_path:
+        report = {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "records": args.records,
+            "seed": args.seed,
+            "results": results,
+        }
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline_path:
+        with open(args.baseline_path, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,60 @@
-# This file makes Python treat the directory fse_rating_system as a package.
-
-# You can optionally import key classes or functions here to make them
-# more easily accessible from the package level, e.g.:
-# from .models import FSE, AssessmentChecklist
-# from .assessment import perform_assessment, calculate_star_rating
-# from .notifications import format_assessment_sms, send_sms
-
-# For now, keeping it empty is fine. Users of the package will import
-# specific modules like:
-# from fse_rating_system.models import FSE
-# from fse_rating_system.assessment import perform_assessment
+"""
+FSE Rating System package.
+
+Importing the package does not import any of its modules. The most used
+names can still be reached from the package, e.g.
+``fse_rating_system.perform_assessment``; the module that defines a name is
+imported the first time it is accessed (PEP 562). The optional, slower
+parts (SQLite storage, analytics, asyncio dispatch and the HTTP service)
+are therefore only loaded by programs that use them.
+
+Importing specific modules works as before:
+from fse_rating_system.models import FSE
+from fse_rating_system.assessment import perform_assessment
+"""
+from importlib import import_module as _import_module
+
+_EXPORTS = {
+    "FSE": "models",
+    "AssessmentChecklist": "models",
+    "CompactFSE": "models",
+    "CompactChecklist": "models",
+    "establishment_key": "models",
+    "ItemScores": "items",
+    "ChecklistSchema": "schema",
+    "DEFAULT_SCHEMA": "schema",
+    "load_schema": "schema",
+    "perform_assessment": "assessment",
+    "perform_assessments_batch": "assessment",
+    "calculate_star_rating": "assessment",
+    "format_assessment_sms": "notifications",
+    "send_sms": "notifications",
+    "validate_scores": "validation",
+    "run_batch": "bulk",
+    "AssessmentStore": "storage",
+    "AssessmentIndex": "index",
+    "RunningAggregates": "analytics",
+    "SmsDispatcher": "dispatch",
+    "AssessmentService": "service",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        # Submodules, e.g. fse_rating_system.storage, are also imported on access.
+        try:
+            return _import_module(f".{name}", __name__)
+        except ModuleNotFoundError as exc:
+            if exc.name != f"{__name__}.{name}":
+                raise
+            raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = getattr(_import_module(f".{module_name}", __name__), name)
+    globals()[name] = value # Later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
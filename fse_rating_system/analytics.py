@@ -0,0 +1,231 @@
+"""
+Star-rating and checklist-part analytics for supervisor dashboards.
+
+``RunningAggregates`` keeps small running totals per location and per
+month: star-rating counts, per-part score sums and total-score sums. Adding
+an assessment updates a handful of counters, and every dashboard query is
+answered from those totals without going back over the assessment history.
+
+``summarize`` builds the aggregates from columnar data in one pass. Each
+column is reduced with flat, bincount-style counting (``counts[code] +=
+value``) into lists indexed by a location code, rather than walking a
+dict per record.
+"""
+from .models import ASSESSMENT_DATE_KEY, FSE
+from .schema import DEFAULT_SCHEMA, ChecklistSchema
+
+MAX_STARS = 5
+
+
+def _month(assessment_date) -> str:
+    """Returns the YYYY-MM part of an assessment date, or "unknown"."""
+    return assessment_date[:7] if assessment_date else "unknown"
+
+
+class RunningAggregates:
+    """Incrementally maintained assessment aggregates by location and by month."""
+
+    def __init__(self, schema: ChecklistSchema = DEFAULT_SCHEMA):
+        self.schema = schema
+        self.location_codes = {}
+        self.counts = []        # per location code
+        self.total_sums = []    # per location code
+        self.star_counts = []   # per location code: counts for 0..MAX_STARS stars
+        self.part_sums = []     # per location code: score sum per part
+        self.months = {}        # "YYYY-MM" -> [count, total_sum, star_sum]
+
+    def _code(self, location: str) -> int:
+        code = self.location_codes.get(location)
+        if code is None:
+            code = self.location_codes[location] = len(self.counts)
+            self.counts.append(0)
+            self.total_sums.append(0)
+            self.star_counts.append([0] * (MAX_STARS + 1))
+            self.part_sums.append([0] * len(self.schema))
+        return code
+
+    def add(self, location: str, assessment_date: str, scores, total_score: int, star_rating: int):
+        """
+        Adds one assessment.
+
+        Args:
+            location: FSE location (used as the region).
+            assessment_date: Date of the assessment as YYYY-MM-DD, or None.
+            scores: Part scores in schema order.
+            total_score: Total score of the assessment.
+            star_rating: Star rating of the assessment.
+        """
+        code = self._code(location)
+        self.counts[code] += 1
+        self.total_sums[code] += total_score
+        self.star_counts[code][star_rating] += 1
+        part_sums = self.part_sums[code]
+        for i, score in enumerate(scores):
+            part_sums[i] += score
+        month = self.months.setdefault(_month(assessment_date), [0, 0, 0])
+        month[0] += 1
+        month[1] += total_score
+        month[2] += star_rating
+
+    def add_fse(self, fse: FSE, background_info: dict = None):
+        """Adds an FSE after ``perform_assessment`` has filled in its results."""
+        scores = [fse.assessment_scores.get(part_name, 0) for part_name in self.schema.part_names]
+        date = (background_info or {}).get(ASSESSMENT_DATE_KEY)
+        self.add(fse.location, date, scores, fse.total_score, fse.star_rating)
+
+    def add_result(self, result: dict):
+        """Adds a result dictionary from the bulk pipeline; results with an error are ignored."""
+        if "error" in result:
+            return
+        scores = [result["assessment_scores"].get(part_name, 0) for part_name in self.schema.part_names]
+        self.add(result["location"], result.get("assessment_date"), scores,
+                 result["total_score"], result["star_rating"])
+
+    def to_state(self) -> dict:
+        """Returns the running totals as a JSON-serializable dictionary (see ``from_state``)."""
+        return {"schema_version": self.schema.version, "locations": list(self.location_codes),
+                "counts": self.counts, "total_sums": self.total_sums, "star_counts": self.star_counts,
+                "part_sums": self.part_sums, "months": self.months}
+
+    @classmethod
+    def from_state(cls, state: dict, schema: ChecklistSchema = DEFAULT_SCHEMA) -> "RunningAggregates":
+        """
+        Rebuilds aggregates saved with ``to_state``, e.g. from a checkpoint.
+
+        Raises:
+            ValueError: If the state was saved under a different schema version.
+        """
+        if state["schema_version"] != schema.version:
+            raise ValueError(f"Aggregates were saved with schema version {state['schema_version']!r}, "
+                             f"not {schema.version!r}.")
+        aggregates = cls(schema)
+        aggregates.location_codes = {location: code for code, location in enumerate(state["locations"])}
+        aggregates.counts = list(state["counts"])
+        aggregates.total_sums = list(state["total_sums"])
+        aggregates.star_counts = [list(counts) for counts in state["star_counts"]]
+        aggregates.part_sums = [list(sums) for sums in state["part_sums"]]
+        aggregates.months = {month: list(values) for month, values in state["months"].items()}
+        return aggregates
+
+    def merge(self, other: "RunningAggregates"):
+        """Adds the totals of another ``RunningAggregates`` (e.g. from another shard) to these."""
+        for location, other_code in other.location_codes.items():
+            code = self._code(location)
+            self.counts[code] += other.counts[other_code]
+            self.total_sums[code] += other.total_sums[other_code]
+            for i, count in enumerate(other.star_counts[other_code]):
+                self.star_counts[code][i] += count
+            for i, score_sum in enumerate(other.part_sums[other_code]):
+                self.part_sums[code][i] += score_sum
+        for month, values in other.months.items():
+            totals = self.months.setdefault(month, [0, 0, 0])
+            for i, value in enumerate(values):
+                totals[i] += value
+
+    def _codes_for(self, location: str = None) -> list[int]:
+        if location is None:
+            return list(range(len(self.counts)))
+        code = self.location_codes.get(location)
+        return [] if code is None else [code]
+
+    def star_distribution(self, location: str = None) -> dict:
+        """Returns ``{stars: count}`` for one location, or overall if location is None."""
+        distribution = dict.fromkeys(range(MAX_STARS + 1), 0)
+        for code in self._codes_for(location):
+            for stars, count in enumerate(self.star_counts[code]):
+                distribution[stars] += count
+        return distribution
+
+    def star_distributions(self) -> dict:
+        """Returns ``{location: {stars: count}}`` for every location."""
+        return {location: dict(enumerate(self.star_counts[code]))
+                for location, code in self.location_codes.items()}
+
+    def mean_score(self, location: str = None) -> float:
+        """Returns the mean total score for one location or overall, or None if there is no data."""
+        codes = self._codes_for(location)
+        count = sum(self.counts[code] for code in codes)
+        return sum(self.total_sums[code] for code in codes) / count if count else None
+
+    def part_means(self, location: str = None) -> dict:
+        """Returns the mean score of each checklist part, for one location or overall."""
+        codes = self._codes_for(location)
+        count = sum(self.counts[code] for code in codes)
+        if not count:
+            return {}
+        return {part_name: sum(self.part_sums[code][i] for code in codes) / count
+                for i, part_name in enumerate(self.schema.part_names)}
+
+    def worst_part(self, location: str = None) -> tuple:
+        """
+        Returns the part with the lowest mean score as a percentage of its maximum.
+
+        Returns:
+            ``(part_name, mean_percentage)``, or ``(None, None)`` if there is no data.
+        """
+        means = self.part_means(location)
+        if not means:
+            return None, None
+        percentages = {part_name: mean / max_score * 100
+                       for (part_name, mean), max_score in zip(means.items(), self.schema.max_scores)}
+        part_name = min(percentages, key=percentages.get)
+        return part_name, percentages[part_name]
+
+    def worst_parts(self) -> dict:
+        """Returns ``{location: (part_name, mean_percentage)}`` for every location."""
+        return {location: self.worst_part(location) for location in self.location_codes}
+
+    def trend(self) -> list[dict]:
+        """Returns the number of assessments, mean score and mean stars per month, oldest first."""
+        return [
+            {"month": month, "assessments": count, "mean_score": total / count, "mean_stars": stars / count}
+            for month, (count, total, stars) in sorted(self.months.items())
+        ]
+
+
+def summarize(locations, assessment_dates, scores_matrix, totals, stars,
+              schema: ChecklistSchema = DEFAULT_SCHEMA) -> RunningAggregates:
+    """
+    Builds aggregates from columnar data in one pass over each column.
+
+    Args:
+        locations: Location of each assessment.
+        assessment_dates: Date (YYYY-MM-DD) of each assessment.
+        scores_matrix: Part scores of each assessment, in schema order.
+        totals: Total score of each assessment.
+        stars: Star rating of each assessment, e.g. from ``perform_assessments_batch``.
+        schema: Checklist schema of the scores.
+
+    Returns:
+        A ``RunningAggregates`` that further assessments can be added to.
+    """
+    aggregates = RunningAggregates(schema)
+    codes = [aggregates._code(location) for location in locations]
+    stride = MAX_STARS + 1
+
+    counts = [0] * len(aggregates.counts)
+    total_sums = [0] * len(aggregates.counts)
+    star_counts = [0] * (len(aggregates.counts) * stride)
+    for code, total, star in zip(codes, totals, stars):
+        counts[code] += 1
+        total_sums[code] += total
+        star_counts[code * stride + star] += 1
+
+    for i, column in enumerate(zip(*scores_matrix)):
+        sums = [0] * len(aggregates.counts)
+        for code, score in zip(codes, column):
+            sums[code] += score
+        for code, value in enumerate(sums):
+            aggregates.part_sums[code][i] = value
+
+    months = aggregates.months
+    for date, total, star in zip(assessment_dates, totals, stars):
+        month = months.setdefault(_month(date), [0, 0, 0])
+        month[0] += 1
+        month[1] += total
+        month[2] += star
+
+    aggregates.counts = counts
+    aggregates.total_sums = total_sums
+    aggregates.star_counts = [star_counts[code * stride:(code + 1) * stride] for code in range(len(counts))]
+    return aggregates
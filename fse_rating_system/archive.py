@@ -0,0 +1,315 @@
+"""
+Fixed-record binary archive of assessment results.
+
+For scanning millions of past assessments without parsing CSV or JSON, the
+results are stored as fixed-size little-endian records after a 64-byte
+header:
+
+    establishment_id  uint64   hash of the establishment key (see ``establishment_id``)
+    date              uint32   assessment date as YYYYMMDD, 0 if unknown
+    scores            uint8[n] one byte per checklist part, in schema order
+    total_score       uint16
+    star_rating       uint8
+
+The header records the format version, the number of parts, the record
+size and the schema name and version, so a reader can check that the file
+matches its schema.
+
+``ArchiveWriter`` appends records in bulk, packing a whole batch into one
+buffer and one ``write``. ``ArchiveReader`` memory-maps the file: records
+are unpacked straight from the mapped pages, and with NumPy installed
+``numpy_view`` returns a zero-copy structured array over the same pages,
+which the queries use to run as whole-column array operations.
+"""
+import hashlib
+import mmap
+import os
+import struct
+from collections import namedtuple
+from collections.abc import Iterable, Iterator
+
+from .models import ASSESSMENT_DATE_KEY, FSE, establishment_key
+from .schema import DEFAULT_SCHEMA, ChecklistSchema
+
+MAGIC = b"FSEA"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHHH24s24s6x")
+
+ArchiveRecord = namedtuple("ArchiveRecord", "establishment_id date scores total_score star_rating")
+
+
+def establishment_id(key: str) -> int:
+    """Returns a stable 64-bit ID for an establishment key (see ``models.establishment_key``)."""
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def date_to_int(assessment_date: str) -> int:
+    """Converts a YYYY-MM-DD date to the integer YYYYMMDD, or 0 if it is missing or malformed."""
+    if not assessment_date or len(assessment_date) != 10:
+        return 0
+    digits = assessment_date[:4] + assessment_date[5:7] + assessment_date[8:]
+    return int(digits) if digits.isdigit() else 0
+
+
+def int_to_date(value: int) -> str:
+    """Converts a YYYYMMDD integer back to YYYY-MM-DD, or None for 0."""
+    if not value:
+        return None
+    return f"{value // 10000:04d}-{value // 100 % 100:02d}-{value % 100:02d}"
+
+
+def pack_scores(assessment_scores: dict, schema: ChecklistSchema = DEFAULT_SCHEMA) -> bytes:
+    """Converts an ``FSE.assessment_scores`` dict to one byte per part, in schema order."""
+    packed = bytearray(len(schema))
+    for part_name, score in assessment_scores.items():
+        packed[schema.part_index[part_name]] = score
+    return bytes(packed)
+
+
+def unpack_scores(scores: bytes, schema: ChecklistSchema = DEFAULT_SCHEMA) -> dict:
+    """Converts packed part scores back to an ``FSE.assessment_scores`` dict."""
+    return dict(zip(schema.part_names, scores))
+
+
+def record_struct(schema: ChecklistSchema) -> struct.Struct:
+    """Returns the struct of one record for a schema."""
+    return struct.Struct(f"<QI{len(schema)}sHB")
+
+
+def numpy_dtype(schema: ChecklistSchema):
+    """Returns the NumPy structured dtype of one record. Requires NumPy."""
+    import numpy as np
+    return np.dtype([("establishment_id", "<u8"), ("date", "<u4"), ("scores", "u1", (len(schema),)),
+                     ("total_score", "<u2"), ("star_rating", "u1")])
+
+
+def _header(schema: ChecklistSchema) -> bytes:
+    return HEADER.pack(MAGIC, FORMAT_VERSION, len(schema), record_struct(schema).size,
+                       schema.name.encode("utf-8")[:24], schema.version.encode("utf-8")[:24])
+
+
+def _check_header(data: bytes, schema: ChecklistSchema, path: str):
+    if len(data) != HEADER.size:
+        raise ValueError(f"{path} is not an assessment archive (file too short).")
+    magic, version, parts, record_size, _, schema_version = HEADER.unpack(data)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise ValueError(f"{path} is not an assessment archive (format version {FORMAT_VERSION}).")
+    if parts != len(schema) or record_size != record_struct(schema).size:
+        raise ValueError(f"{path} has {parts} checklist parts, but the schema has {len(schema)}.")
+    schema_version = schema_version.rstrip(b"\0").decode("utf-8")
+    if schema_version != schema.version[:24]:
+        raise ValueError(f"{path} was written with schema version {schema_version!r}, not {schema.version!r}.")
+
+
+def _numpy():
+    """Returns the numpy module, or None if it is not installed."""
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+class ArchiveWriter:
+    """
+    Appends assessment records to an archive file.
+
+    Can be used as a context manager, which closes the file on exit.
+    """
+
+    def __init__(self, path: str, schema: ChecklistSchema = DEFAULT_SCHEMA):
+        """
+        Args:
+            path: Archive file; created with a header if it does not exist.
+            schema: Checklist schema of the records.
+
+        Raises:
+            ValueError: If an existing file was written for a different schema.
+        """
+        self.path = path
+        self.schema = schema
+        self._struct = record_struct(schema)
+        if os.path.exists(path) and os.path.getsize(path):
+            with open(path, "rb") as f:
+                _check_header(f.read(HEADER.size), schema, path)
+            self._file = open(path, "ab")
+        else:
+            self._file = open(path, "wb")
+            self._file.write(_header(schema))
+
+    def close(self):
+        """Flushes and closes the file."""
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def append_many(self, records: Iterable[tuple], batch_size: int = 65536) -> int:
+        """
+        Appends ``(establishment_id, date, scores, total_score, star_rating)`` tuples.
+
+        ``date`` is a YYYYMMDD integer and ``scores`` holds one byte per part.
+        Each batch of ``batch_size`` records is packed into one buffer and
+        written at once.
+
+        Returns:
+            The number of records appended.
+        """
+        pack_into = self._struct.pack_into
+        size = self._struct.size
+        count = 0
+        buffer = bytearray(size * batch_size)
+        used = 0
+        for record in records:
+            pack_into(buffer, used * size, *record)
+            used += 1
+            if used == batch_size:
+                self._file.write(buffer)
+                count += used
+                used = 0
+        if used:
+            self._file.write(memoryview(buffer)[:used * size])
+            count += used
+        return count
+
+    def append_results(self, results: Iterable[dict], batch_size: int = 65536) -> int:
+        """Appends result dictionaries from the bulk pipeline; results with an error are skipped."""
+        schema = self.schema
+        return self.append_many(
+            ((establishment_id(establishment_key(result["name"], result["location"], result.get("fse_id"))),
+              date_to_int(result.get("assessment_date")), pack_scores(result["assessment_scores"], schema),
+              result["total_score"], result["star_rating"])
+             for result in results if "error" not in result),
+            batch_size)
+
+    def append_fse(self, fse: FSE, background_info: dict = None):
+        """Appends one FSE after ``perform_assessment`` has filled in its results."""
+        self.append_many([(establishment_id(fse.key),
+                           date_to_int((background_info or {}).get(ASSESSMENT_DATE_KEY)),
+                           pack_scores(fse.assessment_scores, self.schema), fse.total_score, fse.star_rating)],
+                         batch_size=1)
+
+
+class ArchiveReader:
+    """
+    Read-only, memory-mapped view of an archive file.
+
+    Can be used as a context manager, which unmaps the file on exit.
+    """
+
+    def __init__(self, path: str, schema: ChecklistSchema = DEFAULT_SCHEMA):
+        """
+        Raises:
+            ValueError: If the file is not an archive for ``schema``.
+        """
+        self.path = path
+        self.schema = schema
+        self._struct = record_struct(schema)
+        with open(path, "rb") as f:
+            _check_header(f.read(HEADER.size), schema, path)
+            size = os.fstat(f.fileno()).st_size
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        # A partly written last record (e.g. after a crash) is ignored.
+        self.count = (size - HEADER.size) // self._struct.size if size > HEADER.size else 0
+        self._view = None
+
+    def close(self):
+        """Unmaps the file. Arrays returned by ``numpy_view`` must no longer be used."""
+        self._view = None
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index: int) -> ArchiveRecord:
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("archive record index out of range")
+        return ArchiveRecord(*self._struct.unpack_from(self._mmap, HEADER.size + index * self._struct.size))
+
+    def __iter__(self) -> Iterator[ArchiveRecord]:
+        if not self.count:
+            return
+        data = memoryview(self._mmap)[HEADER.size:HEADER.size + self.count * self._struct.size]
+        try:
+            for values in self._struct.iter_unpack(data):
+                yield ArchiveRecord(*values)
+        finally:
+            data.release()
+
+    def numpy_view(self):
+        """
+        Returns a zero-copy NumPy structured array over the mapped records.
+
+        Raises:
+            ImportError: If NumPy is not installed.
+        """
+        if self._view is None:
+            np = _numpy()
+            if np is None:
+                raise ImportError("NumPy views of assessment archives require NumPy (pip install numpy).")
+            self._view = np.frombuffer(self._mmap, dtype=numpy_dtype(self.schema), count=self.count,
+                                       offset=HEADER.size) if self.count else np.empty(0, numpy_dtype(self.schema))
+        return self._view
+
+    def to_result(self, record: ArchiveRecord) -> dict:
+        """Converts a record to a dictionary with ``assessment_scores`` in the ``FSE`` dict shape."""
+        return {"establishment_id": record.establishment_id, "assessment_date": int_to_date(record.date),
+                "assessment_scores": unpack_scores(record.scores, self.schema),
+                "total_score": record.total_score, "star_rating": record.star_rating}
+
+    def find(self, establishment: str = None, since: str = None, until: str = None,
+             star_rating: int = None) -> list[int]:
+        """
+        Returns the indices of the records matching all of the given filters.
+
+        Args:
+            establishment: Establishment key (see ``models.establishment_key``).
+            since: Earliest assessment date (inclusive, YYYY-MM-DD).
+            until: Latest assessment date (inclusive, YYYY-MM-DD).
+            star_rating: Exact star rating.
+        """
+        wanted_id = establishment_id(establishment) if establishment is not None else None
+        low = date_to_int(since) if since else 0
+        high = date_to_int(until) if until else 0xFFFFFFFF
+        np = _numpy()
+        if np is not None:
+            view = self.numpy_view()
+            mask = (view["date"] >= low) & (view["date"] <= high)
+            if wanted_id is not None:
+                mask &= view["establishment_id"] == wanted_id
+            if star_rating is not None:
+                mask &= view["star_rating"] == star_rating
+            return np.flatnonzero(mask).tolist()
+        return [i for i, record in enumerate(self)
+                if low <= record.date <= high
+                and (wanted_id is None or record.establishment_id == wanted_id)
+                and (star_rating is None or record.star_rating == star_rating)]
+
+    def star_distribution(self, since: str = None, until: str = None) -> dict:
+        """Returns ``{stars: count}`` over the records assessed between ``since`` and ``until``."""
+        low = date_to_int(since) if since else 0
+        high = date_to_int(until) if until else 0xFFFFFFFF
+        counts = [0] * 6 # 0 to 5 stars
+        np = _numpy()
+        if np is not None:
+            view = self.numpy_view()
+            stars = view["star_rating"][(view["date"] >= low) & (view["date"] <= high)]
+            counts = np.bincount(stars, minlength=6).tolist()
+        else:
+            for record in self:
+                if low <= record.date <= high:
+                    counts[record.star_rating] += 1
+        return dict(enumerate(counts))
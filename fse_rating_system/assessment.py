@@ -1,78 +1,162 @@
+from array import array
+from numbers import Integral
+
 from .models import FSE, AssessmentChecklist
+from .items import resolve_item_scores
+from .schema import DEFAULT_SCHEMA, ChecklistSchema
+from .instrumentation import instrumented
+from . import cache
 
-def calculate_star_rating(total_score: int, max_total_score: int) -> int:
+def calculate_star_rating(total_score: int, max_total_score: int, schema: ChecklistSchema = DEFAULT_SCHEMA) -> int:
     """
     Assigns a star rating based on the total score.
 
     Args:
         total_score: The FSE's total score from the assessment.
         max_total_score: The maximum possible score for the assessment.
+        schema: Checklist schema whose star bands are used.
 
     Returns:
-        An integer from 1 to 5 representing the star rating.
+        An integer from 1 to 5 representing the star rating, or 0 for a
+        negative score or a non-positive maximum.
     """
     if max_total_score <= 0:
         return 0 # Avoid division by zero, indicate error or no rating
 
+    if max_total_score == schema.max_total:
+        # Served from the schema's precomputed total-to-stars table.
+        return schema.star_rating(total_score)
+
     percentage_score = (total_score / max_total_score) * 100
+    return schema.rating_for_percentage(percentage_score)
+
 
-    if percentage_score >= 90:
-        return 5
-    elif percentage_score >= 80:
-        return 4
-    elif percentage_score >= 70:
-        return 3
-    elif percentage_score >= 60:
-        return 2
-    elif percentage_score < 60 and percentage_score >= 0: # Ensure score is not negative
-        return 1
-    else: # Handles scores below 0 or other unexpected cases
-        return 0 # Or raise an error, or return a specific indicator for invalid scores
-
-
-def perform_assessment(fse: FSE, checklist_scores: dict, background_info: dict = None) -> tuple[int, int]:
+@instrumented("perform_assessment")
+def perform_assessment(fse: FSE, checklist_scores: dict, background_info: dict = None,
+                       schema: ChecklistSchema = DEFAULT_SCHEMA, quiet: bool = False) -> tuple[int, int]:
     """
     Performs an assessment for a given FSE.
 
     Args:
         fse: The Food Service Establishment object.
         checklist_scores: A dictionary where keys are part names (e.g., "Part 2: Documentations")
-                          and values are the scores for those parts.
+                          and values are the scores for those parts. Parts with
+                          line items in the schema can be given as
+                          ``{item_name: score}`` instead (None for "not applicable",
+                          see ``items``).
         background_info: Optional dictionary for Part 1 background information.
+        schema: Checklist schema to assess against.
+        quiet: If True, nothing is printed for invalid scores. Use
+               ``validation.validate_scores`` to find out what was wrong.
 
     Returns:
         A tuple containing the total score and the star rating.
         Returns (None, None) if checklist_scores are invalid.
+        Valid results are cached per schema version and score vector (see ``cache``).
     """
-    assessment = AssessmentChecklist()
+    if schema.itemized_parts:
+        try:
+            checklist_scores = resolve_item_scores(checklist_scores, schema)
+        except ValueError as exc:
+            if not quiet:
+                print(f"Error: {exc} Aborting assessment.")
+            return None, None
+
+    cache_key = None
+    if cache.assessments.maxsize:
+        cache_key = (schema, tuple(checklist_scores.items()))
+        try:
+            cached = cache.assessments.get(cache_key)
+        except TypeError: # Unhashable score, e.g. a list from malformed input
+            cache_key, cached = None, cache.MISSING
+        if cached is not cache.MISSING:
+            part_scores, total_score, star_rating = cached
+            fse.assessment_scores = dict(part_scores)
+            fse.total_score = total_score
+            fse.star_rating = star_rating
+            return total_score, star_rating
+
+    assessment = AssessmentChecklist(schema)
 
     if background_info:
         assessment.set_background_info(background_info)
 
     all_scores_valid = True
     for part_name, score in checklist_scores.items():
-        if not assessment.set_score(part_name, score):
+        if not assessment.set_score(part_name, score, verbose=not quiet):
             all_scores_valid = False
-            print(f"Failed to set score for {part_name}. Aborting assessment.")
+            if not quiet:
+                print(f"Failed to set score for {part_name}. Aborting assessment.")
             return None, None # Indicate failure
 
     if not all_scores_valid:
         return None, None
 
     total_score = assessment.get_total_score()
-    max_score = assessment.get_max_total_score()
-    star_rating = calculate_star_rating(total_score, max_score)
+    star_rating = schema.star_rating(total_score)
 
     # Update the FSE object with assessment results
     fse.assessment_scores = {part: data["score"] for part, data in assessment.parts.items()}
     fse.total_score = total_score
     fse.star_rating = star_rating
+    if cache_key is not None:
+        cache.assessments.put(cache_key, (tuple(fse.assessment_scores.items()), total_score, star_rating))
 
     # Store background info in FSE object if needed, or handle it separately
     # For now, it's part of the AssessmentChecklist instance which could be stored or logged.
 
     return total_score, star_rating
 
+def perform_assessments_batch(scores_matrix, schema: ChecklistSchema = DEFAULT_SCHEMA) -> tuple[array, array, array]:
+    """
+    Scores many assessments at once.
+
+    Each row of ``scores_matrix`` holds one score per checklist part, in the
+    order of ``schema.part_names``. Any sequence of rows works, including a
+    list of tuples or a 2-D NumPy array.
+
+    Validation, totals and star banding are done column by column instead
+    of building an ``AssessmentChecklist`` per row. Star ratings come from
+    the schema's precomputed total-to-stars table.
+
+    Args:
+        scores_matrix: Rows of per-part scores.
+        schema: Checklist schema to assess against.
+
+    Returns:
+        A tuple ``(totals, stars, invalid)`` of equal-length arrays. Scores
+        must be integers. Rows that have the wrong number of columns or a
+        score that is not an integer (e.g. None, 18.5 or "18") or is out of
+        range are flagged with 1 in ``invalid`` and get a total and star
+        rating of 0.
+    """
+    max_scores = schema.max_scores
+    rating_table = schema.rating_table
+
+    width = len(max_scores)
+    # Rows of the wrong width are replaced by an out-of-range row so that the
+    # columns stay aligned; the bounds check below then flags them.
+    filler = (-1,) * width
+    rows = [row if len(row) == width else filler for row in scores_matrix]
+    invalid = array("B", bytes(len(rows)))
+    if not rows:
+        return array("H"), array("B"), invalid
+
+    totals = [0] * len(rows)
+    for column, max_score in zip(zip(*rows), max_scores):
+        # The type is checked before the bounds so that None or strings are
+        # flagged instead of raising; ``type(value) is int`` is the fast path.
+        invalid = array("B", [
+            bad or not ((type(value) is int or isinstance(value, Integral) and not isinstance(value, bool))
+                        and 0 <= value <= max_score)
+            for bad, value in zip(invalid, column)
+        ])
+        totals = [total if bad else total + value for bad, total, value in zip(invalid, totals, column)]
+
+    totals = array("H", [0 if bad else total for bad, total in zip(invalid, totals)])
+    stars = array("B", [0 if bad else rating_table[total] for bad, total in zip(invalid, totals)])
+    return totals, stars, invalid
+
 # Example Usage (for testing purposes, will be moved or integrated into main app flow)
 if __name__ == "__main__":
     # Create an FSE instance
@@ -103,14 +187,14 @@ if __name__ == "__main__":
 
     if total_score is not None:
         print(f"Assessment Complete for {my_fse.name}:")
-        print(f"  Total Score: {my_fse.total_score} / {AssessmentChecklist().get_max_total_score()}")
+        print(f"  Total Score: {my_fse.total_score} / {DEFAULT_SCHEMA.max_total}")
         print(f"  Star Rating: {my_fse.star_rating} Stars")
         print(f"  Breakdown: {my_fse.assessment_scores}")
 
         # Test star rating function directly
         print("\nTesting star rating boundaries:")
         test_scores = [59, 60, 69, 70, 79, 80, 89, 90, 100]
-        max_total = AssessmentChecklist().get_max_total_score() # Assuming 100
+        max_total = DEFAULT_SCHEMA.max_total # Assuming 100
         for score in test_scores:
             rating = calculate_star_rating(score, max_total)
             print(f"Score {score}/{max_total} -> {rating} Stars")
@@ -0,0 +1,355 @@
+"""
+Streaming bulk assessment pipeline.
+
+Records flow through a chain of generators so that only one record (plus
+one output chunk) is held in memory at a time, however large the input:
+
+    read_records -> build_fses -> validate_fses -> assess_fses -> write_results
+
+With an ``AssessmentIndex``, ``skip_duplicates`` drops records that were
+already assessed before they reach scoring, and ``index_results`` records
+the new results. With a ``digests.DigestOutbox``, ``outbox_results`` groups
+the SMS messages per recipient into an outbox file for ``dispatch``.
+
+With more than one worker, ``assess_fses_parallel`` replaces ``assess_fses``
+and shards the records across a process pool in chunks.
+
+Input files are CSV (one column per FSE field, checklist part and
+background field) or JSON Lines (one object per record). The output is
+JSON Lines with one result per input record, in input order (skipped
+duplicates excepted).
+"""
+import csv
+import json
+from collections import deque
+from collections.abc import Iterable, Iterator
+from itertools import islice
+
+from .models import ASSESSMENT_DATE_KEY, FSE
+from .assessment import perform_assessment
+from .notifications import format_assessment_sms
+from .schema import DEFAULT_SCHEMA, ChecklistSchema
+from .validation import ValidationResult, validate_scores
+
+FSE_FIELDS = ("name", "location", "owner_name", "owner_contact", "fse_id")
+
+
+def _parse_csv_row(row: dict, part_names) -> dict:
+    """Turns a flat CSV row into a pipeline record."""
+    record = {field: row.get(field, "") for field in FSE_FIELDS}
+    scores = {}
+    background_info = {}
+    for column, value in row.items():
+        if column in FSE_FIELDS or column is None:
+            continue
+        if column in part_names:
+            try:
+                scores[column] = int(value)
+            except (TypeError, ValueError):
+                scores[column] = value # Reported by validate_fses
+        elif value:
+            background_info[column] = value
+    record["scores"] = scores
+    record["background_info"] = background_info
+    return record
+
+
+def read_records(path: str, schema: ChecklistSchema = DEFAULT_SCHEMA) -> Iterator[dict]:
+    """
+    Lazily reads assessment records from a CSV or JSON Lines file.
+
+    Files ending in ``.csv`` are read as CSV. Columns named after an FSE
+    field (``name``, ``location``, ``owner_name``, ``owner_contact`` and the
+    optional ``fse_id``) or a
+    checklist part (e.g. ``Part 2: Documentations``) are mapped accordingly;
+    any other non-empty column becomes Part 1 background information.
+    Any other file is read as JSON Lines, where each object has the FSE
+    fields plus ``scores`` and optional ``background_info`` dictionaries.
+    A line that is not valid JSON becomes a record with an ``error``, so it
+    is reported in the output instead of stopping the run.
+
+    Args:
+        path: Path to the input file.
+        schema: Checklist schema that defines the part columns.
+
+    Yields:
+        One record dictionary per input row.
+    """
+    if path.lower().endswith(".csv"):
+        part_names = schema.part_index
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                yield _parse_csv_row(row, part_names)
+    else:
+        with open(path, encoding="utf-8") as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError as exc:
+                    yield {"error": f"Line {line_number} is not valid JSON: {exc}."}
+
+
+def record_error(record) -> str:
+    """
+    Checks the shape of an input record.
+
+    Returns:
+        Why the record cannot be assessed, or None if it is well-formed.
+    """
+    if not isinstance(record, dict):
+        return f"Record must be an object, not {type(record).__name__}."
+    for field in FSE_FIELDS:
+        value = record.get(field)
+        if value is not None and not isinstance(value, str) and not (field == "fse_id" and isinstance(value, int)):
+            return f"{field} must be a string."
+    if not isinstance(record.get("scores", {}), dict):
+        return "scores must be an object mapping part names to scores."
+    background_info = record.get("background_info") or {}
+    if not isinstance(background_info, dict):
+        return "background_info must be an object."
+    if not isinstance(background_info.get(ASSESSMENT_DATE_KEY, ""), (str, type(None))):
+        return f"{ASSESSMENT_DATE_KEY} must be a YYYY-MM-DD string."
+    return None
+
+
+def build_fses(records: Iterable[dict]) -> Iterator[tuple]:
+    """
+    Builds an FSE for each record.
+
+    Yields:
+        ``(fse, checklist_scores, background_info, error)`` tuples, where
+        ``error`` is None unless the record could not be parsed or is not
+        well-formed (see ``record_error``).
+    """
+    for record in records:
+        error = record_error(record)
+        if error is not None:
+            if not isinstance(record, dict):
+                record = {}
+            names = {field: record.get(field) if isinstance(record.get(field), str) else ""
+                     for field in FSE_FIELDS[:4]}
+            yield FSE(**names), {}, {}, record.get("error") or error
+            continue
+        fse = FSE(name=record.get("name", ""),
+                  location=record.get("location", ""),
+                  owner_name=record.get("owner_name", ""),
+                  owner_contact=record.get("owner_contact", ""),
+                  fse_id=record.get("fse_id") or None)
+        yield fse, record.get("scores", {}), record.get("background_info") or {}, record.get("error")
+
+
+def validate_fses(items: Iterable[tuple], schema: ChecklistSchema = DEFAULT_SCHEMA) -> Iterator[tuple]:
+    """
+    Validates the scores of each FSE without printing.
+
+    Records with invalid scores are passed on with their ``ValidationResult``
+    as the error, so that ``assess_fses`` skips them and reports every
+    problem found. Validation runs in the calling process so that
+    ``validation.counters`` covers all records, even with several workers.
+    """
+    for fse, checklist_scores, background_info, error in items:
+        if error is None:
+            result = validate_scores(checklist_scores, schema)
+            if not result.ok:
+                error = result
+        yield fse, checklist_scores, background_info, error
+
+
+def skip_duplicates(items: Iterable[tuple], index, schema: ChecklistSchema = DEFAULT_SCHEMA) -> Iterator[tuple]:
+    """
+    Drops records whose assessment is already in an ``AssessmentIndex``.
+
+    A record is a duplicate if the same establishment has already been
+    assessed with the same date and part scores, either in an earlier load
+    or earlier in this one. Duplicates are counted in ``index.duplicates``
+    and never reach scoring or SMS formatting. Records with errors are
+    passed on unchanged.
+    """
+    for fse, checklist_scores, background_info, error in items:
+        if error is None and not index.claim(fse.key, background_info.get(ASSESSMENT_DATE_KEY),
+                                             index.scores_tuple(checklist_scores)):
+            continue
+        yield fse, checklist_scores, background_info, error
+
+
+def assess_fses(items: Iterable[tuple], schema: ChecklistSchema = DEFAULT_SCHEMA) -> Iterator[dict]:
+    """
+    Runs ``perform_assessment`` and formats the SMS for each FSE.
+
+    Yields:
+        One JSON-serializable result dictionary per FSE.
+    """
+    for fse, checklist_scores, background_info, error in items:
+        result = {
+            "name": fse.name,
+            "location": fse.location,
+            "owner_name": fse.owner_name,
+            "owner_contact": fse.owner_contact,
+            "fse_id": fse.fse_id,
+            "assessment_date": background_info.get(ASSESSMENT_DATE_KEY),
+        }
+        if error is None:
+            total_score, star_rating = perform_assessment(fse, checklist_scores, background_info, schema,
+                                                          quiet=True)
+            if total_score is None:
+                error = validate_scores(checklist_scores, schema)
+        if isinstance(error, ValidationResult):
+            result["error_codes"] = [list(e) for e in error.errors]
+            error = " ".join(error.messages(schema))
+        if error is None:
+            result["total_score"] = fse.total_score
+            result["star_rating"] = fse.star_rating
+            result["assessment_scores"] = fse.assessment_scores
+            result["sms"] = format_assessment_sms(fse, schema)
+        else:
+            result["error"] = error
+        yield result
+
+
+def _assess_chunk(chunk: list, schema: ChecklistSchema) -> list:
+    """Worker entry point: assesses one chunk and returns JSON-encoded results."""
+    return [json.dumps(result) for result in assess_fses(chunk, schema)]
+
+
+def _chunks(items: Iterable, size: int) -> Iterator[list]:
+    """Groups an iterable into lists of at most ``size`` items."""
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def assess_fses_parallel(items: Iterable[tuple], workers: int, chunk_size: int = 500,
+                         schema: ChecklistSchema = DEFAULT_SCHEMA, executor=None) -> Iterator[str]:
+    """
+    Same as ``assess_fses`` but spreads the work over a process pool.
+
+    Records are sent to the workers in chunks of ``chunk_size`` to keep the
+    pickling overhead per record low. Workers also JSON-encode their results,
+    so the parent process only has to write them out. At most two chunks
+    per worker are in flight at any time, so memory stays bounded, and
+    results are yielded in input order.
+
+    Args:
+        items: ``(fse, checklist_scores, background_info, error)`` tuples
+               as produced by ``build_fses``.
+        workers: Number of worker processes.
+        chunk_size: Number of records sent to a worker at once.
+        schema: Checklist schema to assess against.
+        executor: Process pool to reuse across calls; by default a pool is
+                  started and shut down for this call.
+
+    Yields:
+        One JSON-encoded result per FSE, in input order.
+    """
+    if executor is None:
+        from concurrent.futures import ProcessPoolExecutor # multiprocessing is slow to import; only load it here
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            yield from assess_fses_parallel(items, workers, chunk_size, schema, executor)
+        return
+    pending = deque()
+    for chunk in _chunks(items, chunk_size):
+        pending.append(executor.submit(_assess_chunk, chunk, schema))
+        if len(pending) >= workers * 2:
+            yield from pending.popleft().result()
+    while pending:
+        yield from pending.popleft().result()
+
+
+def persist_results(results: Iterable, store, chunk_size: int = 1000) -> Iterator:
+    """
+    Passes results through unchanged while saving them to an ``AssessmentStore``.
+
+    Results are inserted ``chunk_size`` at a time, each chunk in one
+    transaction. JSON-encoded results (from ``assess_fses_parallel``) are
+    decoded for storage and passed on in their encoded form.
+    """
+    chunk = []
+    for result in results:
+        chunk.append(json.loads(result) if isinstance(result, str) else result)
+        yield result
+        if len(chunk) >= chunk_size:
+            store.add_results(chunk)
+            chunk.clear()
+    if chunk:
+        store.add_results(chunk)
+
+
+def index_results(results: Iterable, index) -> Iterator:
+    """Passes results through unchanged while recording them in an ``AssessmentIndex``."""
+    for result in results:
+        index.add_result(json.loads(result) if isinstance(result, str) else result)
+        yield result
+
+
+def outbox_results(results: Iterable, outbox) -> Iterator:
+    """Passes results through unchanged while adding them to a ``DigestOutbox``."""
+    for result in results:
+        outbox.add(json.loads(result) if isinstance(result, str) else result)
+        yield result
+
+
+def write_results(results: Iterable[dict], path: str, chunk_size: int = 1000, append: bool = False) -> int:
+    """
+    Writes results as JSON Lines, flushing every ``chunk_size`` records.
+
+    Results may be dictionaries or strings that are already JSON-encoded.
+    With ``append``, the results are added to the end of an existing file.
+
+    Returns:
+        The number of results written.
+    """
+    count = 0
+    with open(path, "a" if append else "w", encoding="utf-8") as f:
+        chunk = []
+        for result in results:
+            chunk.append(result if isinstance(result, str) else json.dumps(result))
+            count += 1
+            if len(chunk) >= chunk_size:
+                f.write("\n".join(chunk) + "\n")
+                f.flush()
+                chunk.clear()
+        if chunk:
+            f.write("\n".join(chunk) + "\n")
+    return count
+
+
+def run_batch(in_path: str, out_path: str, chunk_size: int = 1000, workers: int = 1,
+              schema: ChecklistSchema = DEFAULT_SCHEMA, store=None, index=None, outbox=None) -> int:
+    """
+    Assesses every record in ``in_path`` and writes the results to ``out_path``.
+
+    Args:
+        in_path: Input CSV or JSON Lines file.
+        out_path: Output JSON Lines file.
+        chunk_size: Number of results written per flush.
+        workers: Number of worker processes. 1 runs everything in-process.
+        schema: Checklist schema to assess against.
+        store: Optional ``AssessmentStore`` that successful results are saved to.
+        index: Optional ``AssessmentIndex``. Records it already holds are
+               skipped, and new results are added to it.
+        outbox: Optional ``DigestOutbox`` that collects the SMS messages per
+                recipient. The caller closes it to write the last window.
+
+    Returns:
+        The number of records processed (not counting skipped duplicates).
+    """
+    items = validate_fses(build_fses(read_records(in_path, schema)), schema)
+    if index is not None:
+        items = skip_duplicates(items, index, schema)
+    if workers > 1:
+        results = assess_fses_parallel(items, workers, schema=schema)
+    else:
+        results = assess_fses(items, schema)
+    if store is not None:
+        results = persist_results(results, store, chunk_size)
+    if index is not None:
+        results = index_results(results, index)
+    if outbox is not None:
+        results = outbox_results(results, outbox)
+    return write_results(results, out_path, chunk_size)
@@ -0,0 +1,117 @@
+"""
+Bounded LRU caches for repeated assessments and SMS messages.
+
+Re-queries and re-sends for the same establishment and score vector are
+common, so ``perform_assessment`` and ``format_assessment_sms`` keep their
+results in two module-level caches:
+
+*   ``assessments``, keyed by the checklist schema plus the
+    ``(part_name, score)`` pairs, holding the total, star rating and part
+    scores, and
+*   ``messages``, keyed by language and checklist schema plus the
+    template's field values (owner name, establishment name, score, stars),
+    holding the rendered text.
+
+The schema itself is part of every key, and schemas hash and compare by
+their content (parts, items, star bands, name and version), so results
+computed under one schema are never returned for another, even when two
+schemas share a name and version. A changed schema simply starts with cold
+entries while the old ones age out. ``register_template``
+clears the message cache.
+
+Both caches hold ``DEFAULT_MAXSIZE`` entries by default. Use ``configure``
+to resize them, or ``configure(0)`` to turn caching off (e.g. in tests).
+"""
+from collections import OrderedDict
+
+DEFAULT_MAXSIZE = 4096
+
+MISSING = object()
+
+
+class LRUCache:
+    """Dictionary-like cache that evicts the least recently used entry when full."""
+
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE):
+        """
+        Args:
+            maxsize: Maximum number of entries; 0 disables the cache.
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=MISSING):
+        """Returns the cached value for ``key`` (marking it recently used), or ``default``."""
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """Stores a value, evicting the least recently used entry if the cache is full."""
+        if not self.maxsize:
+            return
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def resize(self, maxsize: int):
+        """Changes the maximum size, evicting entries as needed."""
+        self.maxsize = maxsize
+        while len(self._data) > maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        """Removes every entry and resets the statistics."""
+        self._data.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict:
+        """Returns the size and hit/miss statistics as a dictionary."""
+        lookups = self.hits + self.misses
+        return {
+            "maxsize": self.maxsize,
+            "size": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+assessments = LRUCache()
+messages = LRUCache()
+
+
+def configure(maxsize: int):
+    """Sets the size of both caches; 0 disables caching."""
+    assessments.resize(maxsize)
+    messages.resize(maxsize)
+
+
+def clear():
+    """Empties both caches and resets their statistics."""
+    assessments.clear()
+    messages.clear()
+
+
+def stats() -> dict:
+    """Returns the statistics of both caches."""
+    return {"assessments": assessments.stats(), "messages": messages.stats()}
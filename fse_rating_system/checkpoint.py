@@ -0,0 +1,332 @@
+"""
+Checkpointed, resumable bulk assessment runs.
+
+``run_checkpointed`` runs the ``bulk`` pipeline over the input in segments
+of ``every`` records. After each segment every side effect of the segment
+is made durable (results file, outbox, index file and database rows), and
+only then is the checkpoint file replaced atomically with:
+
+*   the number of input records committed (the offset to resume from),
+*   the committed size of each output file and the last database row id,
+*   running totals (records written, errors, duplicates) and the partial
+    ``analytics.RunningAggregates`` of the results so far.
+
+On restart, ``Checkpoint.restore`` truncates the files back to their
+committed sizes and the store drops rows inserted after the checkpoint, so
+whatever the crashed run wrote past its last checkpoint is discarded and
+the run continues from the committed offset. Every record is therefore
+written exactly once: no duplicate results, index entries or outbox SMS.
+Running a completed job again does nothing.
+
+The input can be split across several processes with ``shard=(i, n)``:
+each process assesses the records at positions ``i, i + n, i + 2n, ...``
+and has its own checkpoint, results, outbox, index and database files.
+Rolling back a shared file would remove what the other shards wrote, so
+``claim_files`` marks the files of a run as in use until it completes and
+rejects any other run that tries to write to them. Shard aggregates can be
+combined with ``load_aggregates``.
+"""
+import json
+import os
+from collections.abc import Iterable, Iterator
+from itertools import islice
+
+from .analytics import RunningAggregates
+from .bulk import (assess_fses, assess_fses_parallel, build_fses, index_results, outbox_results,
+                   persist_results, read_records, skip_duplicates, validate_fses, write_results)
+from .schema import DEFAULT_SCHEMA, ChecklistSchema
+
+FORMAT_VERSION = 1
+
+
+def _fsync(path: str):
+    """Forces a file's written data to disk."""
+    with open(path, "rb") as f:
+        os.fsync(f.fileno())
+
+
+def _file_size(path: str) -> int:
+    return os.path.getsize(path) if os.path.exists(path) else 0
+
+
+class Checkpoint:
+    """
+    Progress of one checkpointed run, kept in a small JSON file.
+
+    A missing file is a fresh run at offset 0.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Checkpoint file; replaced atomically on every ``save``.
+        """
+        self.path = path
+        self.state = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.state = json.load(f)
+            if self.state.get("format_version") != FORMAT_VERSION:
+                raise ValueError(f"{path} is not a checkpoint file (format version {FORMAT_VERSION}).")
+
+    @property
+    def offset(self) -> int:
+        """Number of input records committed so far."""
+        return self.state.get("offset", 0)
+
+    @property
+    def complete(self) -> bool:
+        return self.state.get("complete", False)
+
+    @property
+    def totals(self) -> dict:
+        """Running ``records``, ``written``, ``errors`` and ``duplicates`` counts."""
+        return self.state.get("totals", {"records": 0, "written": 0, "errors": 0, "duplicates": 0})
+
+    def aggregates(self, schema: ChecklistSchema = DEFAULT_SCHEMA) -> RunningAggregates:
+        """Returns the partial aggregates committed so far."""
+        state = self.state.get("aggregates")
+        return RunningAggregates.from_state(state, schema) if state else RunningAggregates(schema)
+
+    def check_job(self, job: dict):
+        """
+        Checks that the checkpoint belongs to this job (input, shard and schema).
+
+        Raises:
+            ValueError: If it was written for a different job.
+        """
+        saved = self.state.get("job")
+        if saved is not None and saved != job:
+            raise ValueError(f"{self.path} belongs to a different run ({saved}); "
+                             "remove it to start this run from the beginning.")
+
+    def restore(self, store=None):
+        """
+        Rolls back everything written after the last checkpoint.
+
+        Files are truncated to their committed sizes (files created after the
+        checkpoint are emptied) and, with a ``store``, rows inserted after it
+        are deleted. Call this before opening an ``AssessmentIndex`` or
+        ``DigestOutbox`` on the checkpointed files.
+        """
+        for path, size in self.state.get("files", {}).items():
+            if _file_size(path) > size:
+                with open(path, "r+b") as f:
+                    f.truncate(size)
+        if store is not None and "store_last_id" in self.state:
+            store.delete_after(self.state["store_last_id"])
+
+    def save(self, job: dict, offset: int, files: Iterable[str], store, totals: dict,
+             aggregates: RunningAggregates, complete: bool = False):
+        """
+        Makes the given files and the store durable, then atomically records the new checkpoint.
+
+        The store is synced with ``AssessmentStore.sync``, so the recorded
+        ``store_last_id`` never points past rows that a power failure could
+        still lose.
+        The state is written to a temporary file, synced and renamed over the
+        checkpoint, so a crash leaves either the old or the new checkpoint.
+        """
+        sizes = {}
+        for path in files:
+            _fsync(path)
+            sizes[path] = _file_size(path)
+        state = {"format_version": FORMAT_VERSION, "job": job, "offset": offset, "complete": complete,
+                 "files": sizes, "totals": dict(totals), "aggregates": aggregates.to_state()}
+        if store is not None:
+            store.sync()
+            state["store_last_id"] = store.last_id()
+        temporary = self.path + ".tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, self.path)
+        self.state = state
+
+
+def claim_files(job: dict, paths: Iterable[str]):
+    """
+    Marks output files as written by ``job`` until it completes.
+
+    A ``<path>.owner`` file holding the job is created next to each file;
+    claiming a file again for the same job does nothing. ``run_checkpointed``
+    removes the marks with ``release_files`` once the job is complete, or
+    right away if it was already complete. Files of a complete job need not
+    be claimed.
+
+    Raises:
+        ValueError: If an unfinished run of another job (e.g. another shard)
+                    writes to one of the files.
+    """
+    claimed = []
+    try:
+        for path in paths:
+            if not path or path == ":memory:":
+                continue
+            owner_path = path + ".owner"
+            try:
+                fd = os.open(owner_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL)
+            except FileExistsError:
+                try:
+                    with open(owner_path, encoding="utf-8") as f:
+                        owner = json.load(f)
+                except ValueError: # Being written by a run starting at the same time
+                    owner = None
+                if owner != job:
+                    raise ValueError(f"{path} is in use by another run ({owner}); give each shard its own "
+                                     f"results, database, index and outbox files, or remove {owner_path} "
+                                     "if that run was abandoned.") from None
+                continue
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(job, f)
+            claimed.append(path)
+    except ValueError:
+        release_files(job, claimed)
+        raise
+
+
+def release_files(job: dict, paths: Iterable[str]):
+    """Removes the marks that ``claim_files`` left for ``job``; other jobs' marks are kept."""
+    for path in paths:
+        if not path:
+            continue
+        owner_path = path + ".owner"
+        try:
+            with open(owner_path, encoding="utf-8") as f:
+                owner = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if owner == job:
+            os.remove(owner_path)
+
+
+def checkpoint_job(in_path: str, out_path: str, schema: ChecklistSchema = DEFAULT_SCHEMA,
+                   shard: tuple = None) -> dict:
+    """Returns the description of a job that its checkpoint is checked against."""
+    return {"input": os.path.abspath(in_path), "output": os.path.abspath(out_path),
+            "shard": list(shard or (0, 1)), "schema_version": schema.version}
+
+
+def aggregate_results(results: Iterable, aggregates: RunningAggregates, totals: dict) -> Iterator:
+    """Passes results through unchanged while counting them and adding them to ``aggregates``."""
+    for result in results:
+        decoded = json.loads(result) if isinstance(result, str) else result
+        totals["written"] += 1
+        if "error" in decoded:
+            totals["errors"] += 1
+        else:
+            aggregates.add_result(decoded)
+        yield result
+
+
+def run_checkpointed(in_path: str, out_path: str, checkpoint: Checkpoint, every: int = 10000,
+                     workers: int = 1, schema: ChecklistSchema = DEFAULT_SCHEMA, store=None, index=None,
+                     outbox=None, shard: tuple = None) -> dict:
+    """
+    Same as ``bulk.run_batch``, but commits a checkpoint every ``every`` input records.
+
+    If ``checkpoint`` holds progress from an earlier run of the same job,
+    the run resumes after the committed records and appends to the output
+    files. ``checkpoint.check_job``, ``claim_files`` and
+    ``checkpoint.restore`` must have been called before ``index`` and
+    ``outbox`` were opened; they are called here again for the results file
+    and the store.
+
+    Args:
+        in_path: Input CSV or JSON Lines file.
+        out_path: Output JSON Lines file.
+        checkpoint: ``Checkpoint`` of this run.
+        every: Input records per checkpoint.
+        workers: Number of worker processes for scoring.
+        schema: Checklist schema to assess against.
+        store: Optional ``AssessmentStore`` for successful results.
+        index: Optional file-backed ``AssessmentIndex`` for duplicate skipping.
+        outbox: Optional ``DigestOutbox``; it is flushed at every checkpoint.
+        shard: Optional ``(i, n)``: only assess the input records whose
+               position modulo ``n`` is ``i``.
+
+    Returns:
+        The totals of the whole run, including the resumed part: input
+        ``records`` read, results ``written``, ``errors`` and skipped
+        ``duplicates``.
+
+    Raises:
+        ValueError: If the checkpoint belongs to a different job, or another
+                    unfinished run writes to the same files (see ``claim_files``).
+    """
+    shard_index, shard_count = shard or (0, 1)
+    if not 0 <= shard_index < shard_count:
+        raise ValueError(f"Invalid shard {shard_index} of {shard_count}.")
+    job = checkpoint_job(in_path, out_path, schema, shard)
+    checkpoint.check_job(job)
+    totals = checkpoint.totals
+    files = [out_path] + [path for path in (getattr(index, "path", None), getattr(outbox, "path", None)) if path]
+    owned = files + [getattr(store, "path", None)]
+    if checkpoint.complete:
+        release_files(job, owned) # In case they were claimed before the job was found to be complete
+        return totals
+    aggregates = checkpoint.aggregates(schema)
+    claim_files(job, owned)
+    offset = checkpoint.offset
+    if checkpoint.state:
+        checkpoint.restore(store)
+    else:
+        # Record the starting point, so a crash in the first segment is rolled back too.
+        open(out_path, "w").close()
+        checkpoint.save(job, 0, files, store, totals, aggregates)
+
+    executor = None
+    if workers > 1:
+        from concurrent.futures import ProcessPoolExecutor # multiprocessing is slow to import; only load it here
+        executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        records = islice(read_records(in_path, schema), offset, None)
+        while True:
+            segment = list(islice(records, every))
+            if not segment:
+                break
+            if shard_count > 1:
+                segment_records = [record for position, record in enumerate(segment, offset)
+                                   if position % shard_count == shard_index]
+            else:
+                segment_records = segment
+            duplicates_before = index.duplicates if index is not None else 0
+
+            items = validate_fses(build_fses(segment_records), schema)
+            if index is not None:
+                items = skip_duplicates(items, index, schema)
+            if executor is not None:
+                results = assess_fses_parallel(items, workers, schema=schema, executor=executor)
+            else:
+                results = assess_fses(items, schema)
+            if store is not None:
+                results = persist_results(results, store)
+            if index is not None:
+                results = index_results(results, index)
+            if outbox is not None:
+                results = outbox_results(results, outbox)
+            write_results(aggregate_results(results, aggregates, totals), out_path, append=True)
+
+            if index is not None:
+                index.flush()
+                totals["duplicates"] += index.duplicates - duplicates_before
+            if outbox is not None:
+                outbox.flush()
+            offset += len(segment)
+            totals["records"] += len(segment_records)
+            checkpoint.save(job, offset, files, store, totals, aggregates)
+        checkpoint.save(job, offset, files, store, totals, aggregates, complete=True)
+        release_files(job, owned)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return totals
+
+
+def load_aggregates(checkpoint_paths: Iterable[str], schema: ChecklistSchema = DEFAULT_SCHEMA) -> RunningAggregates:
+    """Combines the aggregates of several checkpoints, e.g. one per shard."""
+    combined = RunningAggregates(schema)
+    for path in checkpoint_paths:
+        combined.merge(Checkpoint(path).aggregates(schema))
+    return combined
@@ -0,0 +1,141 @@
+"""
+Long-lived worker process for many small command-line runs.
+
+Starting Python and importing the package costs more than assessing a
+small file, so cron jobs and shell loops can hand their commands to one
+warm process instead:
+
+*   ``python main_cli.py daemon`` reads one command line per line from
+    standard input and runs each in turn, e.g.
+    ``for f in *.csv; do echo "batch --in $f --out $f.jsonl"; done | python main_cli.py daemon``
+*   ``python main_cli.py daemon --socket /tmp/fse.sock`` listens on a Unix
+    domain socket; ``python main_cli.py --daemon-socket /tmp/fse.sock batch ...``
+    then forwards the command to it and prints its output. The forwarding
+    client only parses its arguments and opens the socket, so it never
+    imports the assessment modules.
+
+Commands run one at a time, in the client's working directory, with their
+output captured and returned. Loaded modules, compiled templates and the
+result caches stay warm between commands.
+"""
+import io
+import json
+import os
+import shlex
+import socket
+import sys
+from contextlib import redirect_stderr, redirect_stdout
+
+
+def run_command_line(runner, argv: list[str], cwd: str = None) -> tuple[int, str]:
+    """
+    Runs one command in this process and captures what it prints.
+
+    Args:
+        runner: Function taking an argument list, e.g. ``main_cli.main``.
+        argv: Arguments of the command.
+        cwd: Directory to run the command in; relative paths resolve from it.
+
+    Returns:
+        A tuple ``(status, output)`` with the exit status (0 on success) and
+        everything written to stdout and stderr.
+    """
+    output = io.StringIO()
+    previous = os.getcwd()
+    status = 0
+    try:
+        if cwd:
+            os.chdir(cwd)
+        with redirect_stdout(output), redirect_stderr(output):
+            runner(argv)
+    except SystemExit as exc:
+        if isinstance(exc.code, int):
+            status = exc.code
+        elif exc.code is not None:
+            output.write(f"{exc.code}\n")
+            status = 1
+    except Exception as exc: # One failing command must not stop the daemon
+        output.write(f"Error: {type(exc).__name__}: {exc}\n")
+        status = 1
+    finally:
+        os.chdir(previous)
+    return status, output.getvalue()
+
+
+def run_lines(runner, lines, out=None) -> int:
+    """
+    Runs one command per line, e.g. from standard input.
+
+    Blank lines and lines starting with ``#`` are skipped.
+
+    Returns:
+        The number of commands that failed.
+    """
+    out = out or sys.stdout
+    failures = 0
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        status, output = run_command_line(runner, shlex.split(line))
+        out.write(output)
+        if status:
+            failures += 1
+            out.write(f"[exit status {status}] {line}\n")
+        out.flush()
+    return failures
+
+
+def serve_socket(runner, path: str, max_requests: int = None):
+    """
+    Runs commands received on a Unix domain socket until interrupted.
+
+    Each connection sends one JSON line ``{"argv": [...], "cwd": "..."}`` and
+    receives one JSON line ``{"status": ..., "output": "..."}``.
+
+    Args:
+        runner: Function taking an argument list, e.g. ``main_cli.main``.
+        path: Socket file to listen on.
+        max_requests: Stop after this many commands; None runs until interrupted.
+    """
+    if os.path.exists(path):
+        os.unlink(path) # Left behind by a daemon that did not shut down cleanly
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        server.bind(path)
+        server.listen()
+        served = 0
+        while max_requests is None or served < max_requests:
+            connection, _ = server.accept()
+            served += 1
+            with connection, connection.makefile("rwb") as stream:
+                try:
+                    request = json.loads(stream.readline())
+                    status, output = run_command_line(runner, request["argv"], request.get("cwd"))
+                except (ValueError, KeyError, TypeError) as exc:
+                    status, output = 2, f"Bad daemon request: {exc}\n"
+                stream.write(json.dumps({"status": status, "output": output}).encode("utf-8") + b"\n")
+    finally:
+        server.close()
+        if os.path.exists(path):
+            os.unlink(path)
+
+
+def send(path: str, argv: list[str], cwd: str = None) -> tuple[int, str]:
+    """
+    Runs a command in the daemon listening on ``path``.
+
+    Returns:
+        ``(status, output)`` as returned by ``run_command_line``.
+
+    Raises:
+        OSError: If no daemon is listening on ``path``.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(path)
+        with client.makefile("rwb") as stream:
+            request = {"argv": argv, "cwd": cwd or os.getcwd()}
+            stream.write(json.dumps(request).encode("utf-8") + b"\n")
+            stream.flush()
+            response = json.loads(stream.readline())
+    return response["status"], response["output"]
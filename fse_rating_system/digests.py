@@ -0,0 +1,153 @@
+"""
+Per-recipient notification digests.
+
+One owner often runs many establishments, so sending one SMS per assessed
+FSE can send dozens of messages to the same phone. ``DigestOutbox`` groups
+results by owner phone number (normalized with ``normalize_phone``) over a
+window of consecutive results and writes one combined message per
+recipient to an outbox file:
+
+*   a recipient with a single result gets the usual assessment SMS,
+*   a recipient with several results gets a digest with one line per
+    establishment (see ``templates.DIGEST_TEMPLATES``), split into several
+    digests of at most ``max_items`` lines so each stays a few segments long,
+*   repeated results for the same establishment within a window are
+    reduced to the latest one.
+
+The outbox is JSON Lines with ``to`` and ``message`` entries, which the
+``dispatch`` command sends as is.
+"""
+import json
+from collections.abc import Iterator
+
+from .models import establishment_key
+from .schema import DEFAULT_SCHEMA, ChecklistSchema
+from .templates import get_digest_templates
+
+_PHONE_PUNCTUATION = str.maketrans("", "", " -.()/\t")
+
+
+def normalize_phone(number: str, country_code: str = None) -> str:
+    """
+    Returns a canonical form of a phone number for grouping.
+
+    Spaces and punctuation are removed and a ``00`` international prefix
+    becomes ``+``. With ``country_code`` (e.g. "233"), a national number
+    with a leading 0 is turned into the international form, so that
+    "024 123 4567" and "+233 24 123 4567" are the same recipient.
+
+    Returns:
+        The normalized number, or "" if it contains no digits.
+    """
+    number = (number or "").strip().translate(_PHONE_PUNCTUATION)
+    if number.startswith("00"):
+        number = "+" + number[2:]
+    international = number.startswith("+")
+    digits = "".join(char for char in number if char.isdigit())
+    if not digits:
+        return ""
+    if international:
+        return "+" + digits
+    if country_code and digits.startswith("0"):
+        return f"+{country_code}{digits[1:]}"
+    return digits
+
+
+def render_digest(results: list[dict], schema: ChecklistSchema = DEFAULT_SCHEMA, language: str = "en") -> str:
+    """Renders one digest message for several results of the same recipient."""
+    header, line, footer = get_digest_templates(language, schema)
+    first = results[0]
+    parts = [header.render_values(tuple(first[field] for field in header.fields))]
+    for result in results:
+        parts.append(line.render_values(tuple(result[field] for field in line.fields)))
+    parts.append(footer.render_values(tuple(first[field] for field in footer.fields)))
+    return "".join(parts)
+
+
+class DigestOutbox:
+    """
+    Collects assessment results and writes one message per recipient to an outbox file.
+
+    Can be used as a context manager; leaving the block writes the last
+    window and closes the file.
+    """
+
+    def __init__(self, path: str, window: int = 10000, max_items: int = 10,
+                 schema: ChecklistSchema = DEFAULT_SCHEMA, language: str = "en", country_code: str = None,
+                 append: bool = False):
+        """
+        Args:
+            path: Outbox JSON Lines file to write.
+            window: Number of consecutive results grouped together before
+                    their messages are written.
+            max_items: Maximum establishments listed in one digest.
+            schema: Checklist schema the results were assessed against.
+            language: Language of the messages.
+            country_code: Country calling code used by ``normalize_phone``
+                          for national numbers.
+            append: Add to the end of an existing outbox file instead of
+                    replacing it (e.g. when resuming a checkpointed run).
+        """
+        self.window = window
+        self.max_items = max_items
+        self.schema = schema
+        self.language = language
+        self.country_code = country_code
+        self.path = path
+        self.stats = {"results": 0, "skipped": 0, "duplicates": 0, "messages": 0, "digests": 0}
+        self._groups = {} # phone -> {establishment key: result}
+        self._pending = 0
+        self._file = open(path, "a" if append else "w", encoding="utf-8")
+
+    def add(self, result: dict):
+        """Adds one result; results without an SMS or a phone number are skipped."""
+        self.stats["results"] += 1
+        phone = normalize_phone(result.get("owner_contact"), self.country_code)
+        if "error" in result or not result.get("sms") or not phone:
+            self.stats["skipped"] += 1
+            return
+        group = self._groups.setdefault(phone, {})
+        key = establishment_key(result["name"], result["location"], result.get("fse_id"))
+        previous = group.get(key)
+        if previous is not None:
+            self.stats["duplicates"] += 1
+            if (previous.get("assessment_date") or "") > (result.get("assessment_date") or ""):
+                return
+        group[key] = result
+        self._pending += 1
+        if self._pending >= self.window:
+            self.flush()
+
+    def messages(self) -> Iterator[dict]:
+        """Yields the messages for the results collected so far and forgets them."""
+        groups, self._groups, self._pending = self._groups, {}, 0
+        for phone, group in groups.items():
+            results = list(group.values())
+            if len(results) == 1:
+                yield {"to": phone, "message": results[0]["sms"], "establishments": 1}
+                continue
+            for start in range(0, len(results), self.max_items):
+                chunk = results[start:start + self.max_items]
+                self.stats["digests"] += 1
+                yield {"to": phone, "message": render_digest(chunk, self.schema, self.language),
+                       "establishments": len(chunk)}
+
+    def flush(self):
+        """Writes the messages for the current window to the outbox."""
+        lines = [json.dumps(message) for message in self.messages()]
+        self.stats["messages"] += len(lines)
+        if lines:
+            self._file.write("\n".join(lines) + "\n")
+            self._file.flush()
+
+    def close(self):
+        """Writes the last window and closes the outbox file."""
+        self.flush()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
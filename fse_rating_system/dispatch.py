@@ -0,0 +1,345 @@
+"""
+Asynchronous SMS dispatch.
+
+``SmsDispatcher`` takes messages from an in-memory queue and sends them
+through a pluggable transport, so that producing assessments never waits
+on the SMS gateway. It provides:
+
+*   bounded concurrency (a fixed number of sender tasks),
+*   a token-bucket rate limit in messages per second,
+*   batched submissions (up to ``batch_size`` messages per gateway call),
+*   retries with exponential backoff, and
+*   a dead-letter file (JSON Lines) for messages that still fail.
+
+Sender tasks never stop on an error while messages are queued: messages
+that can be neither sent nor written to the dead-letter file are counted
+as ``lost`` and the reason is kept in ``SmsDispatcher.errors``.
+
+Messages are dictionaries with a ``to`` phone number and a ``message`` text.
+
+``HttpGatewayTransport`` posts batches as JSON to an HTTP gateway.
+``FakeGateway`` is a local HTTP server with the same interface that records
+what it receives and can be told to fail, for testing offline. Run this
+module to start one:
+
+    python -m fse_rating_system.dispatch --port 8025
+"""
+import asyncio
+import json
+import time
+from collections.abc import Iterable
+from urllib.parse import urlsplit
+
+
+class TransportError(Exception):
+    """Raised by a transport when a batch could not be delivered."""
+
+
+class Transport:
+    """Base class for SMS gateway transports."""
+
+    async def send_batch(self, messages: list[dict]):
+        """
+        Delivers a batch of messages.
+
+        Raises:
+            TransportError: If the gateway did not accept the batch.
+        """
+        raise NotImplementedError
+
+
+class HttpGatewayTransport(Transport):
+    """Posts each batch as ``{"messages": [...]}`` JSON to an HTTP endpoint."""
+
+    def __init__(self, url: str, timeout: float = 10.0):
+        parts = urlsplit(url)
+        if parts.scheme != "http":
+            raise ValueError(f"Only http:// gateway URLs are supported, got {url!r}.")
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.path = parts.path or "/"
+        self.timeout = timeout
+
+    async def send_batch(self, messages: list[dict]):
+        body = json.dumps({"messages": messages}).encode("utf-8")
+        request = (
+            f"POST {self.path} HTTP/1.1\r\n"
+            f"Host: {self.host}:{self.port}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Connection: close\r\n\r\n"
+        ).encode("ascii") + body
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(self.host, self.port), self.timeout)
+            try:
+                writer.write(request)
+                await writer.drain()
+                status_line = await asyncio.wait_for(reader.readline(), self.timeout)
+            finally:
+                writer.close()
+        except (OSError, asyncio.TimeoutError) as exc:
+            raise TransportError(f"Gateway unreachable: {exc}") from exc
+        fields = status_line.decode("latin-1").split()
+        if len(fields) < 2 or not fields[1].startswith("2"):
+            raise TransportError(f"Gateway rejected batch: {status_line.decode('latin-1').strip()!r}")
+
+
+class FakeGateway:
+    """
+    Local stand-in for an HTTP SMS gateway.
+
+    Accepts the requests sent by ``HttpGatewayTransport`` and stores the
+    delivered messages in ``received``. The first ``fail_first`` requests are
+    answered with ``503 Service Unavailable``.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, fail_first: int = 0):
+        self.host = host
+        self.port = port
+        self.fail_first = fail_first
+        self.requests = 0
+        self.received = []
+        self._server = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}/sms"
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.stop()
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+                self.requests += 1
+                if self.requests <= self.fail_first:
+                    status = "503 Service Unavailable"
+                else:
+                    status = "200 OK"
+                    self.received.extend(json.loads(body)["messages"])
+                writer.write(f"HTTP/1.1 {status}\r\nContent-Length: 0\r\n\r\n".encode("ascii"))
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+class TokenBucket:
+    """Token-bucket rate limiter: ``rate`` tokens per second, up to ``capacity``."""
+
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, tokens: float = 1.0):
+        """Waits until ``tokens`` are available and takes them."""
+        tokens = min(tokens, self.capacity)
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self.tokens) / self.rate)
+
+
+class SmsDispatcher:
+    """
+    Queues SMS messages and sends them in the background.
+
+    Usage:
+
+        async with SmsDispatcher(HttpGatewayTransport(url)) as dispatcher:
+            for fse in assessed_fses:
+                await dispatcher.submit(fse.owner_contact, format_assessment_sms(fse))
+
+    Leaving the ``async with`` block waits until every queued message has
+    been sent or written to the dead-letter file.
+    """
+
+    def __init__(self, transport: Transport, concurrency: int = 4, rate: float = 10.0,
+                 batch_size: int = 50, max_retries: int = 5, base_delay: float = 0.5,
+                 dead_letter_path: str = None, queue_size: int = 10000):
+        """
+        Args:
+            transport: Gateway transport used to deliver batches.
+            concurrency: Number of batches in flight at once.
+            rate: Maximum messages per second.
+            batch_size: Maximum messages per gateway call.
+            max_retries: Retries per batch before it is dead-lettered.
+            base_delay: Delay before the first retry, doubled on each further retry.
+            dead_letter_path: JSON Lines file for undeliverable messages.
+            queue_size: Maximum queued messages; ``submit`` waits when full.
+        """
+        self.transport = transport
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.dead_letter_path = dead_letter_path
+        self.stats = {"submitted": 0, "sent": 0, "batches": 0, "retries": 0, "dead_lettered": 0, "lost": 0}
+        self.errors = [] # Why messages were lost
+        self._bucket = TokenBucket(rate, capacity=max(rate, batch_size))
+        self._queue = asyncio.Queue(maxsize=queue_size)
+        self._workers = []
+
+    async def start(self):
+        """Starts the sender tasks."""
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+
+    async def close(self):
+        """Waits for the queue to drain, then stops the sender tasks."""
+        await self._queue.join()
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def submit(self, phone_number: str, message: str):
+        """Queues one message for sending."""
+        await self._queue.put({"to": phone_number, "message": message})
+        self.stats["submitted"] += 1
+
+    async def _worker(self):
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                await self._send_with_retries(batch)
+            except Exception as exc: # A sender must keep draining the queue, or close() never returns
+                self._lose(batch, f"{type(exc).__name__}: {exc}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _send_with_retries(self, batch: list[dict]):
+        error = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self.stats["retries"] += 1
+                await asyncio.sleep(self.base_delay * 2 ** (attempt - 1))
+            await self._bucket.acquire(len(batch))
+            try:
+                await self.transport.send_batch(batch)
+            except Exception as exc: # Any failure is a failed attempt, so a broken transport cannot stop the sender
+                error = exc if isinstance(exc, TransportError) else TransportError(f"{type(exc).__name__}: {exc}")
+                continue
+            self.stats["sent"] += len(batch)
+            self.stats["batches"] += 1
+            return
+        self._dead_letter(batch, error)
+
+    def _dead_letter(self, batch: list[dict], error: Exception):
+        self.stats["dead_lettered"] += len(batch)
+        if self.dead_letter_path is None:
+            return
+        try:
+            with open(self.dead_letter_path, "a", encoding="utf-8") as f:
+                for message in batch:
+                    f.write(json.dumps({**message, "error": str(error)}) + "\n")
+        except OSError as exc:
+            self._lose(batch, f"Could not write to the dead-letter file: {exc}")
+
+    def _lose(self, batch: list[dict], reason: str):
+        self.stats["lost"] += len(batch)
+        self.errors.append(reason)
+
+
+def messages_from_results(results: Iterable[dict]) -> Iterable[dict]:
+    """
+    Yields ``{"to", "message"}`` dicts for bulk results that have an SMS and a contact.
+
+    Entries that are already messages, e.g. from a digest outbox file, are
+    passed on as they are.
+    """
+    for result in results:
+        if "to" in result and "message" in result:
+            yield {"to": result["to"], "message": result["message"]}
+        elif result.get("sms") and result.get("owner_contact"):
+            yield {"to": result["owner_contact"], "message": result["sms"]}
+
+
+async def dispatch_messages(messages: Iterable[dict], transport: Transport, **options) -> dict:
+    """
+    Sends every message through a new ``SmsDispatcher``.
+
+    Args:
+        messages: ``{"to", "message"}`` dictionaries.
+        transport: Gateway transport.
+        **options: Passed on to ``SmsDispatcher``.
+
+    Returns:
+        The dispatcher's statistics.
+    """
+    async with SmsDispatcher(transport, **options) as dispatcher:
+        for message in messages:
+            await dispatcher.submit(message["to"], message["message"])
+    return dispatcher.stats
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run a local fake SMS gateway.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8025)
+    parser.add_argument("--fail-first", type=int, default=0,
+                        help="Answer the first N requests with 503 to exercise retries.")
+    args = parser.parse_args()
+
+    async def serve():
+        gateway = FakeGateway(args.host, args.port, args.fail_first)
+        await gateway.start()
+        print(f"Fake SMS gateway listening on {gateway.url}")
+        try:
+            while True:
+                await asyncio.sleep(5)
+                print(f"{gateway.requests} requests, {len(gateway.received)} messages received")
+        finally:
+            await gateway.stop()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
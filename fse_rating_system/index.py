@@ -0,0 +1,161 @@
+"""
+Latest and historical assessments per establishment.
+
+``AssessmentIndex`` maps each establishment identity key (see
+``models.establishment_key``) to its assessments, so "current rating for
+FSE X" is a dictionary lookup. It also remembers a fingerprint of every
+assessment (key, assessment date and part scores), which lets bulk loads
+detect duplicate submissions before scoring them.
+
+With a path, the index is kept on disk as an append-only JSON Lines file:
+every new assessment is appended as one line, and opening the index again
+replays the file.
+"""
+import json
+import os
+
+from .items import resolve_item_scores
+from .models import ASSESSMENT_DATE_KEY, FSE, establishment_key
+from .schema import DEFAULT_SCHEMA, ChecklistSchema
+
+
+class AssessmentIndex:
+    """
+    In-memory index of assessments by establishment, optionally persisted to a file.
+
+    Can be used as a context manager, which closes the file on exit.
+    """
+
+    def __init__(self, path: str = None, schema: ChecklistSchema = DEFAULT_SCHEMA):
+        """
+        Args:
+            path: JSON Lines file to load from and append to, or None to keep
+                  the index in memory only.
+            schema: Checklist schema that orders the part scores.
+        """
+        self.path = path
+        self.schema = schema
+        self.duplicates = 0 # Submissions rejected by claim()
+        self._history = {}  # key -> list of entries, oldest first
+        self._latest = {}   # key -> entry with the latest assessment date
+        self._fingerprints = set()
+        self._file = None
+        if path is not None:
+            if os.path.exists(path):
+                with open(path, encoding="utf-8") as f:
+                    for line in f:
+                        if line.strip():
+                            self._insert(json.loads(line))
+            self._file = open(path, "a", encoding="utf-8")
+
+    def flush(self):
+        """Writes buffered entries to the index file."""
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self):
+        """Closes the index file."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __len__(self):
+        return len(self._history)
+
+    def __contains__(self, key: str):
+        return key in self._history
+
+    def scores_tuple(self, assessment_scores: dict) -> tuple:
+        """
+        Returns part scores in schema order, as used in fingerprints.
+
+        Item scores of itemized parts are resolved to their part scores first.
+        """
+        if self.schema.itemized_parts:
+            assessment_scores = resolve_item_scores(assessment_scores, self.schema)
+        return tuple(assessment_scores.get(part_name, 0) for part_name in self.schema.part_names)
+
+    def _insert(self, entry: dict):
+        key = entry["key"]
+        self._history.setdefault(key, []).append(entry)
+        self._fingerprints.add((key, entry["assessment_date"], tuple(entry["scores"])))
+        latest = self._latest.get(key)
+        if latest is None or (entry["assessment_date"] or "") >= (latest["assessment_date"] or ""):
+            self._latest[key] = entry
+
+    def is_duplicate(self, key: str, assessment_date: str, scores: tuple) -> bool:
+        """Returns True if this exact assessment has already been seen."""
+        return (key, assessment_date, scores) in self._fingerprints
+
+    def claim(self, key: str, assessment_date: str, scores: tuple) -> bool:
+        """
+        Marks an assessment as seen before it is scored.
+
+        Returns:
+            False (and counts a duplicate) if the assessment was already
+            seen, True otherwise.
+        """
+        fingerprint = (key, assessment_date, scores)
+        if fingerprint in self._fingerprints:
+            self.duplicates += 1
+            return False
+        self._fingerprints.add(fingerprint)
+        return True
+
+    def release(self, key: str, assessment_date: str, scores: tuple):
+        """Forgets a ``claim`` whose assessment failed, so it can be submitted again."""
+        self._fingerprints.discard((key, assessment_date, scores))
+
+    def add(self, key: str, assessment_date: str, scores, total_score: int, star_rating: int) -> dict:
+        """
+        Records an assessment and appends it to the index file.
+
+        Args:
+            key: Establishment identity key.
+            assessment_date: Date of the assessment as YYYY-MM-DD, or None.
+            scores: Part scores in schema order.
+            total_score: Total score of the assessment.
+            star_rating: Star rating of the assessment.
+
+        Returns:
+            The new index entry.
+        """
+        entry = {"key": key, "assessment_date": assessment_date, "scores": list(scores),
+                 "total_score": total_score, "star_rating": star_rating,
+                 "schema_version": self.schema.version}
+        self._insert(entry)
+        if self._file is not None:
+            self._file.write(json.dumps(entry) + "\n")
+        return entry
+
+    def add_fse(self, fse: FSE, background_info: dict = None) -> dict:
+        """Records an FSE after ``perform_assessment`` has filled in its results."""
+        return self.add(fse.key, (background_info or {}).get(ASSESSMENT_DATE_KEY),
+                        self.scores_tuple(fse.assessment_scores), fse.total_score, fse.star_rating)
+
+    def add_result(self, result: dict):
+        """Records a result dictionary from the bulk pipeline; results with an error are ignored."""
+        if "error" in result:
+            return None
+        key = establishment_key(result["name"], result["location"], result.get("fse_id"))
+        return self.add(key, result.get("assessment_date"), self.scores_tuple(result["assessment_scores"]),
+                        result["total_score"], result["star_rating"])
+
+    def latest(self, key: str) -> dict:
+        """Returns the latest assessment of an establishment, or None if it has none."""
+        return self._latest.get(key)
+
+    def history(self, key: str) -> list[dict]:
+        """Returns every assessment of an establishment, in the order they were added."""
+        return list(self._history.get(key, ()))
+
+    def current_rating(self, key: str) -> int:
+        """Returns the star rating of the latest assessment, or None."""
+        latest = self._latest.get(key)
+        return None if latest is None else latest["star_rating"]
@@ -0,0 +1,222 @@
+"""
+Opt-in instrumentation for the assessment pipeline.
+
+``perform_assessment``, ``format_assessment_sms`` and ``send_sms`` are
+wrapped with ``instrumented``. While instrumentation is disabled (the
+default) the wrapper only checks one module-level flag before calling
+through. After ``enable()``, every call records its latency in a
+fixed-bucket histogram, and the collected metrics can be exported with
+``export_json`` or ``export_prometheus``. The validation counters from
+``validation.counters`` and the result-cache statistics from ``cache`` are
+included in both exports.
+
+Metrics are kept per process: with ``--workers``, calls made in worker
+processes are not included.
+
+``profiled`` wraps a block of code in cProfile and tracemalloc and writes
+a text report.
+"""
+import functools
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from . import cache, validation
+
+# Histogram bucket upper bounds, in seconds.
+LATENCY_BUCKETS = (1e-6, 5e-6, 1e-5, 5e-5, 1e-4, 5e-4, 1e-3, 5e-3, 1e-2, 5e-2, 0.1, 0.5, 1.0, 5.0)
+
+_enabled = False
+_started = None
+_metrics = {}
+
+
+class Histogram:
+    """Call count, total latency and a fixed-bucket latency histogram."""
+    __slots__ = ("count", "total", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1) # Last bucket is +Inf
+
+    def observe(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        self.buckets[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+
+    def quantile(self, q: float) -> float:
+        """Estimates a latency quantile as the upper bound of the bucket it falls in."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS + (float("inf"),), self.buckets):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+def enable():
+    """Starts collecting metrics."""
+    global _enabled, _started
+    _enabled = True
+    if _started is None:
+        _started = time.perf_counter()
+
+
+def disable():
+    """Stops collecting metrics; collected values are kept."""
+    global _enabled
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def reset():
+    """Clears all collected metrics."""
+    global _started
+    _metrics.clear()
+    _started = time.perf_counter() if _enabled else None
+
+
+def instrumented(name: str):
+    """Decorator that records the latency of each call under ``name`` while enabled."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                histogram = _metrics.get(name)
+                if histogram is None:
+                    histogram = _metrics[name] = Histogram()
+                histogram.observe(elapsed)
+        return wrapper
+    return decorator
+
+
+def export_json() -> dict:
+    """Returns the collected metrics as a JSON-serializable dictionary."""
+    elapsed = time.perf_counter() - _started if _started is not None else 0.0
+    functions = {}
+    for name, histogram in sorted(_metrics.items()):
+        functions[name] = {
+            "calls": histogram.count,
+            "total_seconds": histogram.total,
+            "calls_per_second": histogram.count / elapsed if elapsed else 0.0,
+            "mean_seconds": histogram.total / histogram.count if histogram.count else 0.0,
+            "p50_seconds": histogram.quantile(0.50),
+            "p99_seconds": histogram.quantile(0.99),
+            "buckets": {str(bound): count for bound, count
+                        in zip(LATENCY_BUCKETS + ("+Inf",), histogram.buckets)},
+        }
+    return {"elapsed_seconds": elapsed, "functions": functions, "validation": validation.counters.export(),
+            "cache": cache.stats()}
+
+
+def export_prometheus() -> str:
+    """Returns the collected metrics in the Prometheus text exposition format."""
+    data = export_json()
+    lines = [
+        "# HELP fse_call_duration_seconds Latency of instrumented pipeline functions.",
+        "# TYPE fse_call_duration_seconds histogram",
+    ]
+    for name, histogram in sorted(_metrics.items()):
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS + ("+Inf",), histogram.buckets):
+            cumulative += count
+            lines.append(f'fse_call_duration_seconds_bucket{{function="{name}",le="{bound}"}} {cumulative}')
+        lines.append(f'fse_call_duration_seconds_sum{{function="{name}"}} {histogram.total}')
+        lines.append(f'fse_call_duration_seconds_count{{function="{name}"}} {histogram.count}')
+    lines += [
+        "# HELP fse_calls_per_second Calls per second since instrumentation was enabled.",
+        "# TYPE fse_calls_per_second gauge",
+    ]
+    for name, values in data["functions"].items():
+        lines.append(f'fse_calls_per_second{{function="{name}"}} {values["calls_per_second"]}')
+
+    counters = data["validation"]
+    lines += [
+        "# HELP fse_validation_records_total Records validated.",
+        "# TYPE fse_validation_records_total counter",
+        f"fse_validation_records_total {counters['records']}",
+        "# HELP fse_validation_invalid_records_total Records that failed validation.",
+        "# TYPE fse_validation_invalid_records_total counter",
+        f"fse_validation_invalid_records_total {counters['invalid_records']}",
+        "# HELP fse_validation_errors_total Validation errors by error code.",
+        "# TYPE fse_validation_errors_total counter",
+    ]
+    for code, count in counters["errors"].items():
+        lines.append(f'fse_validation_errors_total{{code="{code}"}} {count}')
+
+    for metric, kind, help_text in (("hits", "counter", "Result cache hits."),
+                                    ("misses", "counter", "Result cache misses."),
+                                    ("evictions", "counter", "Result cache evictions."),
+                                    ("size", "gauge", "Entries in the result cache.")):
+        name = f"fse_cache_{metric}_total" if kind == "counter" else f"fse_cache_{metric}"
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+        for cache_name, values in data["cache"].items():
+            lines.append(f'{name}{{cache="{cache_name}"}} {values[metric]}')
+    return "\n".join(lines) + "\n"
+
+
+def write_metrics(path: str):
+    """Writes the metrics to ``path``: Prometheus text for ``.prom``/``.txt``, JSON otherwise."""
+    import json
+    with open(path, "w", encoding="utf-8") as f:
+        if path.endswith((".prom", ".txt")):
+            f.write(export_prometheus())
+        else:
+            json.dump(export_json(), f, indent=2)
+
+
+@contextmanager
+def profiled(report_path: str, top: int = 30):
+    """
+    Runs the enclosed block under cProfile and tracemalloc.
+
+    Instrumentation is enabled for the duration of the block. The report
+    written to ``report_path`` lists the functions with the highest
+    cumulative time, the largest memory allocation sites and the collected
+    metrics.
+    """
+    import cProfile
+    import io
+    import json
+    import pstats
+    import tracemalloc
+
+    was_enabled = _enabled
+    enable()
+    profiler = cProfile.Profile()
+    tracemalloc.start()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        if not was_enabled:
+            disable()
+
+        stats_text = io.StringIO()
+        pstats.Stats(profiler, stream=stats_text).sort_stats("cumulative").print_stats(top)
+        with open(report_path, "w", encoding="utf-8") as f:
+            f.write("=== CPU profile (cProfile, by cumulative time) ===\n")
+            f.write(stats_text.getvalue())
+            f.write(f"\n=== Memory (tracemalloc): current {current / 2**20:.1f} MiB, "
+                    f"peak {peak / 2**20:.1f} MiB ===\n")
+            for stat in snapshot.statistics("lineno")[:top]:
+                f.write(f"{stat}\n")
+            f.write("\n=== Metrics ===\n")
+            f.write(json.dumps(export_json(), indent=2) + "\n")
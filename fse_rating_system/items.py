@@ -0,0 +1,176 @@
+"""
+Line-item (sub-item) scoring of checklist parts.
+
+Inspectors can score individual items under a part, e.g. twenty hygiene
+items, instead of one number per part. The items of a part are defined in
+its ``ChecklistSchema`` with a maximum score and an integer weight.
+
+``ItemScores`` records one inspection sparsely: only the items that were
+scored or marked "not applicable" are stored, as flat item indices and
+one-byte scores in ``array`` buffers. Items that are not recorded score 0.
+
+A part's score is the weighted share of the item points it earned, scaled
+to the part's ``max_score`` and rounded half up:
+
+    part score = max_score * sum(weight * score / item_max) / sum(weight)
+
+"Not applicable" items are left out of both sums, so the remaining items
+are renormalized to the full ``max_score`` of the part; a part with every
+item not applicable gets its full ``max_score``. The sums are computed in
+integers from the schema's precompiled weight vectors, in one pass over the
+recorded items.
+
+In ``perform_assessment`` and the bulk pipeline, the score of an itemized
+part can be given as ``{item_name: score}``, with None for "not
+applicable".
+"""
+from array import array
+
+from .schema import DEFAULT_SCHEMA, ChecklistSchema
+
+
+class ItemScores:
+    """Sparse item scores of one inspection."""
+    __slots__ = ("schema", "indices", "scores", "not_applicable")
+
+    def __init__(self, schema: ChecklistSchema = DEFAULT_SCHEMA):
+        self.schema = schema
+        self.indices = array("H")        # item index in schema.item_keys, per scored item
+        self.scores = array("B")         # score of each item in ``indices``
+        self.not_applicable = array("H") # item indices marked "not applicable"
+
+    @classmethod
+    def from_dict(cls, items: dict, schema: ChecklistSchema = DEFAULT_SCHEMA) -> "ItemScores":
+        """
+        Builds item scores from ``{part_name: {item_name: score}}``, with None for "not applicable".
+
+        Raises:
+            ValueError: If a part or item is unknown or a score is out of range.
+        """
+        item_scores = cls(schema)
+        item_index = schema.item_index
+        item_max_scores = schema.item_max_scores
+        indices, scores, not_applicable = item_scores.indices, item_scores.scores, item_scores.not_applicable
+        # Each item appears once per mapping, so items are appended without
+        # the duplicate search that ``set_score`` does.
+        for part_name, part_items in items.items():
+            if not isinstance(part_items, dict):
+                raise ValueError(f"Item scores for {part_name} must be a mapping of item name to score.")
+            for item_name, score in part_items.items():
+                index = item_index.get((part_name, item_name))
+                if index is None:
+                    raise ValueError(f"Invalid item {item_name!r} for {part_name}.")
+                if score is None:
+                    not_applicable.append(index)
+                elif type(score) is int and 0 <= score <= item_max_scores[index]:
+                    if score:
+                        indices.append(index)
+                        scores.append(score)
+                else:
+                    raise ValueError(f"Score for {item_name} in {part_name} must be between 0 and "
+                                     f"{item_max_scores[index]}, not {score!r}.")
+        return item_scores
+
+    def _item_index(self, part_name: str, item_name: str, verbose: bool) -> int:
+        index = self.schema.item_index.get((part_name, item_name))
+        if index is None and verbose:
+            print(f"Error: Invalid item '{item_name}' for {part_name}.")
+        return index
+
+    def _forget(self, index: int):
+        """Removes any earlier score or "not applicable" mark of an item."""
+        if index in self.indices:
+            position = self.indices.index(index)
+            del self.indices[position]
+            del self.scores[position]
+        if index in self.not_applicable:
+            self.not_applicable.remove(index)
+
+    def set_score(self, part_name: str, item_name: str, score: int, verbose: bool = True) -> bool:
+        """Sets the score of an item.
+        Returns True if successful, False if the item is unknown or the score is out of bounds.
+        Errors are printed unless verbose is False.
+        """
+        index = self._item_index(part_name, item_name, verbose)
+        if index is None:
+            return False
+        max_score = self.schema.item_max_scores[index]
+        if not isinstance(score, int) or isinstance(score, bool) or not 0 <= score <= max_score:
+            if verbose:
+                print(f"Error: Score for {item_name} must be between 0 and {max_score}.")
+            return False
+        self._forget(index)
+        if score:
+            self.indices.append(index)
+            self.scores.append(score)
+        return True
+
+    def set_not_applicable(self, part_name: str, item_name: str, verbose: bool = True) -> bool:
+        """Marks an item as not applicable. Returns False if the item is unknown."""
+        index = self._item_index(part_name, item_name, verbose)
+        if index is None:
+            return False
+        self._forget(index)
+        self.not_applicable.append(index)
+        return True
+
+    def part_scores(self) -> dict:
+        """Returns ``{part_name: score}`` for every itemized part of the schema."""
+        schema = self.schema
+        item_parts = schema.item_parts
+        item_factors = schema.item_factors
+        earned = [0] * len(schema)
+        for index, score in zip(self.indices, self.scores):
+            earned[item_parts[index]] += item_factors[index] * score
+        applicable = list(schema.part_item_weights)
+        item_weights = schema.item_weights
+        for index in self.not_applicable:
+            applicable[item_parts[index]] -= item_weights[index]
+
+        scores = {}
+        for part in schema.itemized_parts:
+            max_score = schema.max_scores[part]
+            denominator = applicable[part] * schema.part_item_scales[part]
+            if denominator:
+                # Rounded half up, in integers: floor(max_score * earned / denominator + 1/2)
+                scores[schema.part_names[part]] = (2 * max_score * earned[part] + denominator) // (2 * denominator)
+            else:
+                scores[schema.part_names[part]] = max_score
+        return scores
+
+    def to_dict(self) -> dict:
+        """Returns the recorded items as ``{part_name: {item_name: score}}``, with None for "not applicable"."""
+        items = {}
+        item_keys = self.schema.item_keys
+        for index, score in zip(self.indices, self.scores):
+            part_name, item_name = item_keys[index]
+            items.setdefault(part_name, {})[item_name] = score
+        for index in self.not_applicable:
+            part_name, item_name = item_keys[index]
+            items.setdefault(part_name, {})[item_name] = None
+        return items
+
+    def __len__(self):
+        return len(self.indices) + len(self.not_applicable)
+
+
+def resolve_item_scores(checklist_scores: dict, schema: ChecklistSchema = DEFAULT_SCHEMA) -> dict:
+    """
+    Replaces ``{item_name: score}`` values in ``checklist_scores`` by part scores.
+
+    Parts given as plain numbers are kept as they are.
+
+    Raises:
+        ValueError: If item scores are given for a part without items, or
+                    an item or its score is invalid.
+    """
+    items = {part_name: score for part_name, score in checklist_scores.items() if isinstance(score, dict)}
+    if not items:
+        return checklist_scores
+    for part_name in items:
+        part = schema.part_index.get(part_name)
+        if part is None or not schema.part_item_weights[part]:
+            raise ValueError(f"{part_name} is not scored by items.")
+    part_scores = ItemScores.from_dict(items, schema).part_scores()
+    return {part_name: part_scores[part_name] if part_name in items else score
+            for part_name, score in checklist_scores.items()}
@@ -1,27 +1,54 @@
+from array import array
+from numbers import Integral
+
+from .schema import DEFAULT_SCHEMA, ChecklistSchema
+
+# Background information (Part 1) key that holds the assessment date, as YYYY-MM-DD.
+ASSESSMENT_DATE_KEY = "Date of Assessment"
+
+def is_integer_score(score) -> bool:
+    """Returns True if ``score`` is an integer (not a bool, float or string), as part scores must be."""
+    return type(score) is int or isinstance(score, Integral) and not isinstance(score, bool)
+
+def establishment_key(name: str, location: str, fse_id: str = None) -> str:
+    """
+    Returns the identity key of an establishment.
+
+    An explicit ``fse_id`` takes precedence. Otherwise the key is built from the
+    name and location, case-folded and with runs of whitespace collapsed, so
+    that "Cafe  A" in "accra" and "cafe a" in "Accra" are the same establishment.
+    """
+    if fse_id:
+        return f"id:{fse_id}"
+    return " ".join(name.casefold().split()) + "|" + " ".join(location.casefold().split())
+
 class FSE:
     """Represents a Food Service Establishment."""
-    def __init__(self, name: str, location: str, owner_name: str, owner_contact: str):
+    def __init__(self, name: str, location: str, owner_name: str, owner_contact: str, fse_id: str = None):
         self.name = name
         self.location = location
         self.owner_name = owner_name
         self.owner_contact = owner_contact
+        self.fse_id = fse_id # Optional explicit identifier, e.g. a licence number
         self.assessment_scores = {}
         self.total_score = 0
         self.star_rating = 0
 
+    @property
+    def key(self) -> str:
+        """Identity key used to find re-inspections of the same establishment."""
+        return establishment_key(self.name, self.location, self.fse_id)
+
     def __str__(self):
         return f"FSE: {self.name} at {self.location}, Owner: {self.owner_name} ({self.owner_contact})"
 
 class AssessmentChecklist:
     """Represents the assessment checklist and its parts."""
-    def __init__(self):
+    def __init__(self, schema: ChecklistSchema = DEFAULT_SCHEMA):
+        self.schema = schema
         self.parts = {
-            "Part 2: Documentations": {"max_score": 20, "score": 0},
-            "Part 3: Personal Hygiene of Food handlers": {"max_score": 20, "score": 0},
-            "Part 4: Material sourcing": {"max_score": 20, "score": 0},
-            "Part 5: Water Sources and Storage": {"max_score": 10, "score": 0},
-            "Part 6: Waste Disposal": {"max_score": 20, "score": 0},
-            "Part 7: Cleaning": {"max_score": 10, "score": 0},
+            part_name: {"max_score": max_score, "score": 0}
+            for part_name, max_score in zip(schema.part_names, schema.max_scores)
         }
         self.background_info = {} # Part 1, not scored
 
@@ -29,22 +56,30 @@ class AssessmentChecklist:
         """Sets the background information for the assessment."""
         self.background_info = info
 
-    def set_score(self, part_name: str, score: int) -> bool:
+    def set_score(self, part_name: str, score: int, verbose: bool = True) -> bool:
         """Sets the score for a specific part of the checklist.
-        Returns True if successful, False if part_name is invalid or score is out of bounds.
+        Returns True if successful, False if part_name is invalid or score is not an integer within bounds.
+        Errors are printed unless verbose is False.
         """
         if part_name in self.parts:
             max_score = self.parts[part_name]["max_score"]
-            if 0 <= score <= max_score:
+            if is_integer_score(score) and 0 <= score <= max_score:
                 self.parts[part_name]["score"] = score
                 return True
             else:
-                print(f"Error: Score for {part_name} must be between 0 and {max_score}.")
+                if verbose:
+                    print(f"Error: Score for {part_name} must be an integer between 0 and {max_score}.")
                 return False
         else:
-            print(f"Error: Invalid part name '{part_name}'.")
+            if verbose:
+                print(f"Error: Invalid part name '{part_name}'.")
             return False
 
+    def set_item_scores(self, item_scores):
+        """Sets the scores of the itemized parts from an ``items.ItemScores`` record."""
+        for part_name, score in item_scores.part_scores().items():
+            self.parts[part_name]["score"] = score
+
     def get_total_score(self) -> int:
         """Calculates the total score for the assessment."""
         total = 0
@@ -53,11 +88,123 @@ class AssessmentChecklist:
         return total
 
     def get_max_total_score(self) -> int:
-        """Calculates the maximum possible total score for the assessment."""
-        max_total = 0
-        for part_name in self.parts:
-            max_total += self.parts[part_name]["max_score"]
-        return max_total
+        """Returns the maximum possible total score, as precomputed by the schema."""
+        return self.schema.max_total
+
+    def __str__(self):
+        details = "Assessment Checklist:\n"
+        if self.background_info:
+            details += "Part 1: Background Information\n"
+            for key, value in self.background_info.items():
+                details += f"  {key}: {value}\n"
+        for part_name, data in self.parts.items():
+            details += f"{part_name}: Score {data['score']}/{data['max_score']}\n"
+        details += f"Total Score: {self.get_total_score()}/{self.get_max_total_score()}\n"
+        return details
+
+class CompactFSE:
+    """
+    Memory-compact version of ``FSE`` for holding millions of establishments.
+
+    Uses ``__slots__`` instead of a per-instance ``__dict__`` and keeps the
+    part scores as one byte per part in an ``array('B')``, with the part names
+    held once in a shared ``ChecklistSchema``. ``assessment_scores`` is still
+    available as a dict view, so it can be used wherever an ``FSE`` is,
+    including ``perform_assessment``.
+    """
+    __slots__ = ("name", "location", "owner_name", "owner_contact", "fse_id",
+                 "schema", "scores", "total_score", "star_rating")
+
+    def __init__(self, name: str, location: str, owner_name: str, owner_contact: str,
+                 schema: ChecklistSchema = DEFAULT_SCHEMA, fse_id: str = None):
+        self.name = name
+        self.location = location
+        self.owner_name = owner_name
+        self.owner_contact = owner_contact
+        self.fse_id = fse_id
+        self.schema = schema
+        self.scores = None # array('B') once assessed
+        self.total_score = 0
+        self.star_rating = 0
+
+    @property
+    def assessment_scores(self) -> dict:
+        """Part scores as a ``{part_name: score}`` dict, built on access."""
+        if self.scores is None:
+            return {}
+        return dict(zip(self.schema.part_names, self.scores))
+
+    @assessment_scores.setter
+    def assessment_scores(self, scores: dict):
+        if not scores:
+            self.scores = None
+            return
+        packed = array("B", bytes(len(self.schema)))
+        for part_name, score in scores.items():
+            packed[self.schema.part_index[part_name]] = score
+        self.scores = packed
+
+    @property
+    def key(self) -> str:
+        """Identity key used to find re-inspections of the same establishment."""
+        return establishment_key(self.name, self.location, self.fse_id)
+
+    def __str__(self):
+        return f"FSE: {self.name} at {self.location}, Owner: {self.owner_name} ({self.owner_contact})"
+
+class CompactChecklist:
+    """
+    Memory-compact version of ``AssessmentChecklist``.
+
+    Scores are stored as one byte per part in an ``array('B')``. The ``parts``
+    attribute is a dict view with the same shape as
+    ``AssessmentChecklist.parts``; it is rebuilt on each access, so scores
+    must be changed through ``set_score``.
+    """
+    __slots__ = ("schema", "scores", "background_info")
+
+    def __init__(self, schema: ChecklistSchema = DEFAULT_SCHEMA):
+        self.schema = schema
+        self.scores = array("B", bytes(len(schema)))
+        self.background_info = {} # Part 1, not scored
+
+    @property
+    def parts(self) -> dict:
+        """Parts as ``{part_name: {"max_score": ..., "score": ...}}``."""
+        return {
+            name: {"max_score": max_score, "score": score}
+            for name, max_score, score in zip(self.schema.part_names, self.schema.max_scores, self.scores)
+        }
+
+    def set_background_info(self, info: dict):
+        """Sets the background information for the assessment."""
+        self.background_info = info
+
+    def set_score(self, part_name: str, score: int, verbose: bool = True) -> bool:
+        """Sets the score for a specific part of the checklist.
+        Returns True if successful, False if part_name is invalid or score is not an integer within bounds.
+        Errors are printed unless verbose is False.
+        """
+        index = self.schema.part_index.get(part_name)
+        if index is None:
+            if verbose:
+                print(f"Error: Invalid part name '{part_name}'.")
+            return False
+        max_score = self.schema.max_scores[index]
+        if is_integer_score(score) and 0 <= score <= max_score:
+            self.scores[index] = score
+            return True
+        if verbose:
+            print(f"Error: Score for {part_name} must be an integer between 0 and {max_score}.")
+        return False
+
+    def get_total_score(self) -> int:
+        """Calculates the total score for the assessment."""
+        return sum(self.scores)
+
+    def get_max_total_score(self) -> int:
+        """Returns the maximum possible total score for the assessment."""
+        return self.schema.max_total
 
     def __str__(self):
         details = "Assessment Checklist:\n"
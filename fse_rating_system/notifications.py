@@ -1,37 +1,40 @@
 from .models import FSE
+from .schema import DEFAULT_SCHEMA, ChecklistSchema
+from .templates import get_template
+from .instrumentation import instrumented
+from . import cache
 
-def format_assessment_sms(fse: FSE) -> str:
+@instrumented("format_assessment_sms")
+def format_assessment_sms(fse: FSE, schema: ChecklistSchema = DEFAULT_SCHEMA, language: str = "en") -> str:
     """
     Formats a text message summarizing the assessment outcome.
 
     Args:
         fse: The Food Service Establishment object, which should have
              total_score and star_rating attributes populated.
+        schema: Checklist schema the FSE was assessed against.
+        language: Language of the message template (see ``templates``).
 
     Returns:
-        A string formatted as an SMS message.
+        A string formatted as an SMS message. Messages are cached by
+        language, schema version and field values (see ``cache``).
     """
-    # Need to import AssessmentChecklist to get the max score.
-    # This assumes the default checklist is always used for max score calculation.
-    from .models import AssessmentChecklist
-
     if fse.total_score is None or fse.star_rating is None:
         return "Assessment data for SMS is incomplete. Cannot generate message."
 
-    # Get the maximum possible score from a default checklist instance
-    # This is a simplification; in a more complex system, the specific checklist
-    # used for the assessment (or its max score) might need to be passed around or retrieved.
-    max_score = AssessmentChecklist().get_max_total_score()
-
-    message = (
-        f"Dear {fse.owner_name},\n"
-        f"The food safety assessment for '{fse.name}' is complete.\n"
-        f"Final Score: {fse.total_score}/{max_score}.\n"
-        f"Star Rating: {fse.star_rating} Star(s).\n"
-        f"Thank you."
-    )
+    # Compiled once per language and schema, with the max score already filled in.
+    template = get_template(language, schema)
+    if not cache.messages.maxsize:
+        return template.render(fse)
+    values = template.field_values(fse)
+    cache_key = (language, schema, values)
+    message = cache.messages.get(cache_key)
+    if message is cache.MISSING:
+        message = template.render_values(values)
+        cache.messages.put(cache_key, message)
     return message
 
+@instrumented("send_sms")
 def send_sms(phone_number: str, message: str):
     """
     Simulates sending an SMS message.
@@ -47,8 +50,6 @@ def send_sms(phone_number: str, message: str):
 
 # Example Usage (for testing purposes)
 if __name__ == "__main__":
-    from .models import AssessmentChecklist # Required for the format_assessment_sms example
-
     # Create a dummy FSE with assessment results
     sample_fse = FSE(name="The Corner Cafe",
                      location="789 Main St",
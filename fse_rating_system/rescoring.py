@@ -0,0 +1,159 @@
+"""
+Incremental re-scoring of stored assessments after a checklist schema change.
+
+The ``AssessmentStore`` keeps the raw per-part scores of every assessment,
+so a new schema never requires re-running ``perform_assessment``:
+
+*   If only maximum scores or star bands change, totals stay the same (they
+    are the sum of the raw part scores). Star bands are monotonic over the
+    percentage score, so the totals whose rating changes form a few
+    contiguous ranges; only rows in those ranges are updated, with one
+    indexed ``UPDATE ... WHERE total_score BETWEEN ? AND ?`` per range.
+    Rows whose raw score for some part is above that part's new maximum are
+    reported as invalid and left untouched.
+*   If parts are added, removed or reordered, the raw scores are remapped
+    by part name and totals and stars are recomputed row by row.
+
+Only rows stored under the old schema's name and version are touched, so
+a store can hold the assessments of several checklists. Either way the
+establishments whose star rating changed are returned, so that only their
+owners need a new SMS (see ``change_notifications``).
+"""
+from collections.abc import Iterable
+
+from .models import FSE
+from .notifications import format_assessment_sms
+from .schema import ChecklistSchema
+
+_CHANGE_COLUMNS = ("id", "establishment", "location", "owner_name", "owner_contact", "total_score")
+_OLD_SCHEMA = "schema_name = ? AND schema_version = ?"
+
+
+def changed_total_ranges(old_schema: ChecklistSchema, new_schema: ChecklistSchema) -> list[tuple]:
+    """
+    Finds the totals whose star rating differs between two schemas with the same parts.
+
+    Returns:
+        ``(low, high, old_stars, new_stars)`` tuples; every total in
+        ``low..high`` (inclusive) moves from ``old_stars`` to ``new_stars``.
+    """
+    ranges = []
+    for total in range(old_schema.max_total + 1):
+        old_stars = old_schema.star_rating(total)
+        new_stars = new_schema.star_rating(total)
+        if old_stars == new_stars:
+            continue
+        if ranges and ranges[-1][1] == total - 1 and ranges[-1][2:] == (old_stars, new_stars):
+            ranges[-1] = (ranges[-1][0], total, old_stars, new_stars)
+        else:
+            ranges.append((total, total, old_stars, new_stars))
+    return ranges
+
+
+def _find_invalid(connection, old_schema: ChecklistSchema, new_schema: ChecklistSchema) -> list[int]:
+    """Returns ids of rows with a part score above that part's new maximum."""
+    lowered = [(i, new_max) for i, (old_max, new_max)
+               in enumerate(zip(old_schema.max_scores, new_schema.max_scores)) if new_max < old_max]
+    if not lowered:
+        return []
+    rows = connection.execute(f"SELECT id, scores FROM assessments WHERE {_OLD_SCHEMA}",
+                              (old_schema.name, old_schema.version))
+    return [row_id for row_id, scores in rows if any(scores[i] > new_max for i, new_max in lowered)]
+
+
+def _rescore_ranges(connection, old_schema: ChecklistSchema, new_schema: ChecklistSchema) -> tuple:
+    invalid = _find_invalid(connection, old_schema, new_schema)
+    connection.execute("CREATE TEMP TABLE IF NOT EXISTS rescore_invalid (id INTEGER PRIMARY KEY)")
+    connection.execute("DELETE FROM rescore_invalid")
+    connection.executemany("INSERT INTO rescore_invalid (id) VALUES (?)", [(i,) for i in invalid])
+    not_invalid = "id NOT IN (SELECT id FROM rescore_invalid)"
+
+    changed = []
+    for low, high, old_stars, new_stars in changed_total_ranges(old_schema, new_schema):
+        where = f"{_OLD_SCHEMA} AND total_score BETWEEN ? AND ? AND star_rating = ? AND {not_invalid}"
+        params = (old_schema.name, old_schema.version, low, high, old_stars)
+        for values in connection.execute(f"SELECT {', '.join(_CHANGE_COLUMNS)} FROM assessments WHERE {where}",
+                                         params):
+            change = dict(zip(_CHANGE_COLUMNS, values))
+            change["old_star_rating"] = old_stars
+            change["star_rating"] = new_stars
+            changed.append(change)
+        connection.execute(f"UPDATE assessments SET star_rating = ?, schema_name = ?, schema_version = ? "
+                           f"WHERE {where}", (new_stars, new_schema.name, new_schema.version) + params)
+
+    connection.execute(f"UPDATE assessments SET schema_name = ?, schema_version = ? "
+                       f"WHERE {_OLD_SCHEMA} AND {not_invalid}",
+                       (new_schema.name, new_schema.version, old_schema.name, old_schema.version))
+    return changed, invalid
+
+
+def _rescore_rows(connection, old_schema: ChecklistSchema, new_schema: ChecklistSchema) -> tuple:
+    columns = _CHANGE_COLUMNS + ("scores", "star_rating")
+    rows = connection.execute(f"SELECT {', '.join(columns)} FROM assessments WHERE {_OLD_SCHEMA}",
+                              (old_schema.name, old_schema.version)).fetchall()
+    changed, invalid, updates = [], [], []
+    for values in rows:
+        row = dict(zip(columns, values))
+        old_scores = dict(zip(old_schema.part_names, row.pop("scores")))
+        scores = [old_scores.get(part_name, 0) for part_name in new_schema.part_names]
+        if any(score > max_score for score, max_score in zip(scores, new_schema.max_scores)):
+            invalid.append(row["id"])
+            continue
+        total = sum(scores)
+        stars = new_schema.star_rating(total)
+        updates.append((bytes(scores), total, stars, new_schema.name, new_schema.version, row["id"]))
+        if stars != row["star_rating"]:
+            row["old_star_rating"] = row["star_rating"]
+            row["star_rating"] = stars
+            row["total_score"] = total
+            changed.append(row)
+    connection.executemany(
+        "UPDATE assessments SET scores = ?, total_score = ?, star_rating = ?, schema_name = ?, schema_version = ? "
+        "WHERE id = ?",
+        updates)
+    return changed, invalid
+
+
+def rescore(store, old_schema: ChecklistSchema, new_schema: ChecklistSchema) -> tuple[list, list]:
+    """
+    Brings every assessment stored under ``old_schema`` up to ``new_schema``.
+
+    All updates run in one transaction. Afterwards the store should be
+    opened with ``new_schema``.
+
+    Args:
+        store: The ``AssessmentStore`` holding the assessments.
+        old_schema: Schema the assessments were stored with.
+        new_schema: Schema to re-score them against. Must have a different
+                    name or version.
+
+    Returns:
+        A tuple ``(changed, invalid)``. ``changed`` lists a dictionary per
+        assessment whose star rating changed, with the establishment details,
+        ``total_score``, ``old_star_rating`` and ``star_rating``. ``invalid``
+        lists the ids of assessments that are not valid under the new schema
+        and were left unchanged.
+
+    Raises:
+        ValueError: If both schemas have the same name and version.
+    """
+    if (old_schema.name, old_schema.version) == (new_schema.name, new_schema.version):
+        raise ValueError("The new schema needs a different name or version from the old one.")
+    with store.connection:
+        if old_schema.part_names == new_schema.part_names:
+            return _rescore_ranges(store.connection, old_schema, new_schema)
+        return _rescore_rows(store.connection, old_schema, new_schema)
+
+
+def change_notifications(changed: Iterable[dict], schema: ChecklistSchema) -> Iterable[dict]:
+    """
+    Yields one result per changed assessment with the new SMS text.
+
+    The dictionaries have ``owner_contact`` and ``sms`` entries, like the
+    output of the ``batch`` command, so they can be sent with ``dispatch``.
+    """
+    for change in changed:
+        fse = FSE(change["establishment"], change["location"], change["owner_name"], change["owner_contact"])
+        fse.total_score = change["total_score"]
+        fse.star_rating = change["star_rating"]
+        yield {**change, "sms": format_assessment_sms(fse, schema)}
@@ -0,0 +1,281 @@
+"""
+Checklist schemas.
+
+A ``ChecklistSchema`` describes one checklist variant: its scored parts and
+their maximum scores, and the star-rating bands. It is validated and
+compiled once (maximum total, part index map and a total-to-stars lookup
+table) and is immutable afterwards, so a single instance can be shared by
+every checklist, assessment and notification that uses it.
+
+Regional variants can be loaded from JSON, TOML or YAML with
+``load_schema``. A schema file looks like this (JSON shown):
+
+    {
+        "name": "greater-accra",
+        "version": "2",
+        "parts": [
+            {"name": "Part 2: Documentations", "max_score": 20},
+            {"name": "Part 3: Personal Hygiene of Food handlers", "max_score": 20}
+        ],
+        "star_bands": [
+            {"min_percentage": 90, "stars": 5},
+            {"min_percentage": 0, "stars": 1}
+        ]
+    }
+
+``star_bands`` is optional and defaults to the standard 90/80/70/60 bands.
+Each band has a numeric ``min_percentage`` and integer ``stars`` from 0 to 5.
+
+A part can also be scored from line items, each with its own maximum score
+(default 1, i.e. pass/fail) and integer weight (default 1):
+
+    {"name": "Part 3: Personal Hygiene of Food handlers", "max_score": 20,
+     "items": [
+         {"name": "Clean uniforms", "max_score": 2, "weight": 2},
+         {"name": "Hair covered"}
+     ]}
+
+The part score is then the weighted share of item points earned, scaled to
+the part's ``max_score`` (see ``items.ItemScores``). Items are compiled
+into flat weight vectors (``item_parts``, ``item_factors``,
+``item_weights``), so scoring never walks nested dictionaries.
+"""
+import math
+import os
+import sys
+
+# Part 1 (background information) is not scored and so has no entry here.
+DEFAULT_PARTS = {
+    "Part 2: Documentations": 20,
+    "Part 3: Personal Hygiene of Food handlers": 20,
+    "Part 4: Material sourcing": 20,
+    "Part 5: Water Sources and Storage": 10,
+    "Part 6: Waste Disposal": 20,
+    "Part 7: Cleaning": 10,
+}
+
+# (minimum percentage, stars), highest band first.
+DEFAULT_STAR_BANDS = ((90, 5), (80, 4), (70, 3), (60, 2), (0, 1))
+
+
+class ChecklistSchema:
+    """An immutable, precompiled checklist variant."""
+    __slots__ = ("name", "version", "part_names", "max_scores", "part_index",
+                 "max_total", "star_bands", "rating_table", "items", "item_keys", "item_index",
+                 "item_parts", "item_max_scores", "item_weights", "item_factors",
+                 "part_item_weights", "part_item_scales", "itemized_parts", "_hash")
+
+    def __init__(self, parts: dict, star_bands=DEFAULT_STAR_BANDS, name: str = "default", version: str = "1",
+                 items: dict = None):
+        """
+        Args:
+            parts: Mapping of part name to maximum score, in checklist order.
+            star_bands: ``(min_percentage, stars)`` pairs, highest band first.
+            name: Name of the checklist variant.
+            version: Version of the variant; bump it whenever parts, items or bands change.
+            items: Optional mapping of part name to its line items, as
+                   ``(item_name, max_score, weight)`` tuples in checklist order.
+
+        Raises:
+            ValueError: If the parts, items or bands are not valid.
+        """
+        if not parts:
+            raise ValueError("A checklist schema needs at least one part.")
+        for part_name, max_score in parts.items():
+            if not isinstance(part_name, str) or not part_name:
+                raise ValueError(f"Invalid part name {part_name!r}.")
+            if not isinstance(max_score, int) or isinstance(max_score, bool) or not 0 < max_score <= 255:
+                raise ValueError(f"Max score for {part_name} must be an integer between 1 and 255.")
+        try:
+            star_bands = tuple((min_percentage, stars) for min_percentage, stars in star_bands)
+        except (TypeError, ValueError):
+            raise ValueError("Star bands must be (min_percentage, stars) pairs.") from None
+        for min_percentage, stars in star_bands:
+            if not isinstance(min_percentage, (int, float)) or isinstance(min_percentage, bool) \
+                    or not math.isfinite(min_percentage):
+                raise ValueError(f"Star band minimum percentage must be a number, not {min_percentage!r}.")
+            if not isinstance(stars, int) or isinstance(stars, bool) or not 0 <= stars <= 5:
+                raise ValueError(f"Star band stars must be an integer between 0 and 5, not {stars!r}.")
+        if not star_bands:
+            raise ValueError("A checklist schema needs at least one star band.")
+        for (higher, _), (lower, _) in zip(star_bands, star_bands[1:]):
+            if higher <= lower:
+                raise ValueError("Star bands must be listed from the highest minimum percentage down.")
+        if star_bands[-1][0] > 0:
+            raise ValueError("The lowest star band must start at 0 percent.")
+
+        # Interning lets every record and dict view share one copy of each name.
+        set_ = object.__setattr__
+        set_(self, "name", name)
+        set_(self, "version", str(version))
+        set_(self, "part_names", tuple(sys.intern(part_name) for part_name in parts))
+        set_(self, "max_scores", tuple(parts.values()))
+        set_(self, "part_index", {part_name: i for i, part_name in enumerate(self.part_names)})
+        set_(self, "max_total", sum(self.max_scores))
+        set_(self, "star_bands", star_bands)
+        set_(self, "rating_table", tuple(
+            self.rating_for_percentage(total / self.max_total * 100) for total in range(self.max_total + 1)
+        ))
+        self._compile_items(items or {})
+        # Schemas are used as cache keys on every assessment, so the hash is computed once.
+        set_(self, "_hash", hash((self.name, self.version, self.part_names, self.max_scores, self.star_bands,
+                                  self.items)))
+
+    def _compile_items(self, items: dict):
+        """Validates the line items and builds the flat weight vectors used for scoring."""
+        normalized = []
+        item_keys, item_parts, item_max_scores, item_weights, item_factors = [], [], [], [], []
+        part_item_weights = [0] * len(self.part_names)
+        part_item_scales = [1] * len(self.part_names)
+        for part_name, part_items in items.items():
+            part = self.part_index.get(part_name)
+            if part is None:
+                raise ValueError(f"Items given for unknown part {part_name!r}.")
+            part_items = tuple((item_name, max_score, weight) for item_name, max_score, weight in part_items)
+            if not part_items:
+                continue
+            names = set()
+            for item_name, max_score, weight in part_items:
+                if not isinstance(item_name, str) or not item_name or item_name in names:
+                    raise ValueError(f"Invalid or duplicate item name {item_name!r} in {part_name}.")
+                names.add(item_name)
+                for label, value in (("Max score", max_score), ("Weight", weight)):
+                    if not isinstance(value, int) or isinstance(value, bool) or not 0 < value <= 255:
+                        raise ValueError(f"{label} of {item_name} in {part_name} must be an integer "
+                                         "between 1 and 255.")
+            # Item points are scaled to a common denominator per part, so part
+            # scores are computed exactly in integers.
+            scale = math.lcm(*(max_score for _, max_score, _ in part_items))
+            for item_name, max_score, weight in part_items:
+                item_keys.append((self.part_names[part], sys.intern(item_name)))
+                item_parts.append(part)
+                item_max_scores.append(max_score)
+                item_weights.append(weight)
+                item_factors.append(weight * (scale // max_score))
+            part_item_weights[part] = sum(weight for _, _, weight in part_items)
+            part_item_scales[part] = scale
+            normalized.append((self.part_names[part], part_items))
+        if len(item_keys) > 65535:
+            raise ValueError("A checklist schema can have at most 65535 items.")
+
+        set_ = object.__setattr__
+        set_(self, "items", tuple(normalized))
+        set_(self, "item_keys", tuple(item_keys))
+        set_(self, "item_index", {key: i for i, key in enumerate(item_keys)})
+        set_(self, "item_parts", tuple(item_parts))
+        set_(self, "item_max_scores", tuple(item_max_scores))
+        set_(self, "item_weights", tuple(item_weights))
+        set_(self, "item_factors", tuple(item_factors))
+        set_(self, "part_item_weights", tuple(part_item_weights))
+        set_(self, "part_item_scales", tuple(part_item_scales))
+        set_(self, "itemized_parts", tuple(i for i, weight in enumerate(part_item_weights) if weight))
+
+    def __setattr__(self, attr, value):
+        raise AttributeError("ChecklistSchema is immutable.")
+
+    def __delattr__(self, attr):
+        raise AttributeError("ChecklistSchema is immutable.")
+
+    def __reduce__(self):
+        return (ChecklistSchema, (dict(zip(self.part_names, self.max_scores)), self.star_bands,
+                                  self.name, self.version, dict(self.items)))
+
+    def __eq__(self, other):
+        if not isinstance(other, ChecklistSchema):
+            return NotImplemented
+        return (self.name, self.version, self.part_names, self.max_scores, self.star_bands, self.items) == \
+            (other.name, other.version, other.part_names, other.max_scores, other.star_bands, other.items)
+
+    def __hash__(self):
+        return self._hash
+
+    def __len__(self):
+        return len(self.part_names)
+
+    def __repr__(self):
+        return f"ChecklistSchema(name={self.name!r}, version={self.version!r}, parts={len(self)})"
+
+    def rating_for_percentage(self, percentage_score: float) -> int:
+        """Returns the star rating for a percentage score, or 0 if it is negative."""
+        for min_percentage, stars in self.star_bands:
+            if percentage_score >= min_percentage:
+                return stars
+        return 0
+
+    def star_rating(self, total_score: int) -> int:
+        """Returns the star rating for a total score on this checklist."""
+        if isinstance(total_score, int) and 0 <= total_score <= self.max_total:
+            return self.rating_table[total_score]
+        return self.rating_for_percentage(total_score / self.max_total * 100)
+
+
+DEFAULT_SCHEMA = ChecklistSchema(DEFAULT_PARTS)
+
+
+def schema_from_dict(data: dict) -> ChecklistSchema:
+    """
+    Validates and compiles a schema from its dictionary form (see module docstring).
+
+    Raises:
+        ValueError: If the data does not describe a valid schema.
+    """
+    if not isinstance(data, dict):
+        raise ValueError("A checklist schema must be a mapping.")
+    parts = {}
+    items = {}
+    for part in data.get("parts") or ():
+        try:
+            part_name, max_score = part["name"], part["max_score"]
+        except (KeyError, TypeError):
+            raise ValueError(f"Each part needs a 'name' and a 'max_score', got {part!r}.") from None
+        if part_name in parts:
+            raise ValueError(f"Duplicate part name {part_name!r}.")
+        parts[part_name] = max_score
+        if part.get("items"):
+            try:
+                items[part_name] = [(item["name"], item.get("max_score", 1), item.get("weight", 1))
+                                    for item in part["items"]]
+            except (KeyError, TypeError, AttributeError):
+                raise ValueError(f"Each item of {part_name} needs a 'name'.") from None
+
+    star_bands = DEFAULT_STAR_BANDS
+    if "star_bands" in data:
+        try:
+            star_bands = [(band["min_percentage"], band["stars"]) for band in data["star_bands"]]
+        except (KeyError, TypeError):
+            raise ValueError("Each star band needs a 'min_percentage' and a 'stars' value.") from None
+
+    return ChecklistSchema(parts, star_bands,
+                           name=data.get("name", "default"),
+                           version=data.get("version", "1"),
+                           items=items)
+
+
+def load_schema(path: str) -> ChecklistSchema:
+    """
+    Loads a checklist schema from a ``.json``, ``.toml`` or ``.yaml``/``.yml`` file.
+
+    YAML support needs the optional PyYAML package.
+
+    Raises:
+        ValueError: If the file type is not supported or the schema is invalid.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".json":
+        import json
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    elif extension == ".toml":
+        import tomllib
+        with open(path, "rb") as f:
+            data = tomllib.load(f)
+    elif extension in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError:
+            raise ImportError("Loading YAML checklist schemas requires PyYAML (pip install pyyaml).") from None
+        with open(path, encoding="utf-8") as f:
+            data = yaml.safe_load(f)
+    else:
+        raise ValueError(f"Unsupported checklist schema file type: {extension or path!r}")
+    return schema_from_dict(data)
@@ -0,0 +1,312 @@
+"""
+HTTP assessment service for field inspectors.
+
+``AssessmentService`` is a small asyncio HTTP/1.1 server with JSON
+endpoints:
+
+    POST /assess        one record, as in a bulk JSON Lines file -> one result
+    POST /assess/batch  {"records": [...]}                     -> {"results": [...]}
+    GET  /rating        ?fse_id=... or ?name=...&location=...   -> latest assessment
+    GET  /health        -> service status and the loaded schema
+
+Results have the same shape as the output of the ``batch`` command. The
+checklist schema is loaded once at startup and shared by every request.
+
+Concurrent submissions are micro-batched: records that arrive within
+``batch_window`` seconds of each other (up to ``max_batch``) are validated,
+deduplicated against the ``AssessmentIndex``, assessed and saved together,
+so the store is written with one transaction per micro-batch rather than
+one per request. Connections are kept alive between requests unless the
+client sends ``Connection: close``.
+
+Run it with ``python main_cli.py serve --port 8080``.
+"""
+import asyncio
+import json
+from urllib.parse import parse_qs, urlsplit
+
+from .bulk import assess_fses, build_fses, validate_fses
+from .index import AssessmentIndex
+from .models import ASSESSMENT_DATE_KEY, establishment_key
+from .schema import DEFAULT_SCHEMA, ChecklistSchema
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            413: "Payload Too Large", 422: "Unprocessable Entity", 500: "Internal Server Error"}
+
+
+class HttpError(Exception):
+    """Raised by a request handler to answer with an error status."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class AssessmentService:
+    """
+    Asyncio HTTP server that assesses submitted records.
+
+    Can be used as an async context manager, which starts and stops the server.
+    """
+
+    def __init__(self, schema: ChecklistSchema = DEFAULT_SCHEMA, index: AssessmentIndex = None, store=None,
+                 host: str = "127.0.0.1", port: int = 8080, batch_window: float = 0.002,
+                 max_batch: int = 256, keepalive_timeout: float = 30.0, max_body: int = 10 * 2**20):
+        """
+        Args:
+            schema: Checklist schema shared by all requests.
+            index: Index of latest assessments, used for rating lookups and
+                   to skip duplicate submissions. Defaults to an in-memory index.
+            store: Optional ``AssessmentStore`` that successful results are saved to.
+            host: Address to listen on.
+            port: Port to listen on; 0 picks a free port.
+            batch_window: Seconds to wait for more submissions before
+                          assessing a micro-batch; 0 only groups records
+                          that are already queued.
+            max_batch: Maximum records assessed together.
+            keepalive_timeout: Seconds an idle connection is kept open.
+            max_body: Largest accepted request body, in bytes.
+        """
+        self.schema = schema
+        self.index = index if index is not None else AssessmentIndex(schema=schema)
+        self.store = store
+        self.host = host
+        self.port = port
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.keepalive_timeout = keepalive_timeout
+        self.max_body = max_body
+        self.stats = {"requests": 0, "records": 0, "batches": 0, "duplicates": 0}
+        self._queue = None
+        self._batcher = None
+        self._server = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self):
+        """Starts the micro-batcher and begins accepting connections."""
+        self._queue = asyncio.Queue()
+        self._batcher = asyncio.create_task(self._run_batcher())
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        """Stops accepting connections and stops the micro-batcher."""
+        self._server.close()
+        await self._server.wait_closed()
+        self._batcher.cancel()
+        await asyncio.gather(self._batcher, return_exceptions=True)
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.stop()
+
+    async def submit(self, record: dict) -> dict:
+        """Queues one record for the next micro-batch and waits for its result."""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((record, future))
+        return await future
+
+    async def _run_batcher(self):
+        while True:
+            batch = [await self._queue.get()]
+            if self.batch_window:
+                await asyncio.sleep(self.batch_window)
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                results = self.assess_records([record for record, _ in batch])
+            except Exception as exc: # Fail the waiting requests, keep the batcher running
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+                continue
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+    def assess_records(self, records: list[dict]) -> list[dict]:
+        """
+        Assesses one micro-batch of records.
+
+        Records already in the index are not assessed again; their result
+        has ``"duplicate": true`` and the latest stored rating instead. A
+        record that is malformed, or cannot be scored or stored, only fails
+        itself: its result has an ``error`` and it is not marked as seen in
+        the index. After a failed bulk insert the results are stored one at
+        a time to find the rows that fail.
+
+        Returns:
+            One result dictionary per record, in order.
+        """
+        results = [None] * len(records)
+        positions, items, fingerprints = [], [], []
+        for position, item in enumerate(validate_fses(build_fses(records), self.schema)):
+            fse, checklist_scores, background_info, error = item
+            fingerprint = None
+            if error is None:
+                fingerprint = (fse.key, background_info.get(ASSESSMENT_DATE_KEY),
+                               self.index.scores_tuple(checklist_scores))
+                if not self.index.claim(*fingerprint):
+                    latest = self.index.latest(fse.key) or {}
+                    results[position] = {"name": fse.name, "location": fse.location, "fse_id": fse.fse_id,
+                                         "duplicate": True, "total_score": latest.get("total_score"),
+                                         "star_rating": latest.get("star_rating")}
+                    self.stats["duplicates"] += 1
+                    continue
+            positions.append(position)
+            items.append(item)
+            fingerprints.append(fingerprint)
+
+        assessed = [] # (position, fingerprint, result) of the successful records
+        for position, item, fingerprint in zip(positions, items, fingerprints):
+            try:
+                result = next(assess_fses([item], self.schema))
+            except Exception as exc: # Only this record fails
+                fse = item[0]
+                result = {"name": fse.name, "location": fse.location, "fse_id": fse.fse_id,
+                          "error": f"{type(exc).__name__}: {exc}"}
+            results[position] = result
+            if "error" in result:
+                self._release(fingerprint)
+            else:
+                assessed.append((position, fingerprint, result))
+        if self.store is not None and assessed:
+            try:
+                # One transaction, so a failed insert leaves nothing behind
+                self.store.add_results([result for _, _, result in assessed], batch_size=len(assessed))
+            except Exception:
+                assessed = self._store_one_by_one(assessed, results)
+        for _, _, result in assessed:
+            self.index.add_result(result)
+        self.stats["records"] += len(records)
+        self.stats["batches"] += 1
+        return results
+
+    def _store_one_by_one(self, assessed: list, results: list) -> list:
+        """
+        Stores results one at a time after a failed bulk insert.
+
+        Results that cannot be stored are replaced by an error result and
+        their index claim is released.
+
+        Returns:
+            The ``(position, fingerprint, result)`` entries that were stored.
+        """
+        stored = []
+        for position, fingerprint, result in assessed:
+            try:
+                self.store.add_results([result])
+            except Exception as exc:
+                results[position] = {"name": result["name"], "location": result["location"],
+                                     "fse_id": result.get("fse_id"),
+                                     "error": f"Could not save the result: {type(exc).__name__}: {exc}"}
+                self._release(fingerprint)
+                continue
+            stored.append((position, fingerprint, result))
+        return stored
+
+    def _release(self, fingerprint: tuple):
+        if fingerprint is not None:
+            self.index.release(*fingerprint)
+
+    def rating(self, query: dict) -> dict:
+        """Returns the latest assessment for ``fse_id`` or ``name`` + ``location``."""
+        fse_id = query.get("fse_id")
+        if not fse_id and not ("name" in query and "location" in query):
+            raise HttpError(400, "Give fse_id, or name and location.")
+        key = establishment_key(query.get("name", ""), query.get("location", ""), fse_id)
+        latest = self.index.latest(key)
+        if latest is None:
+            raise HttpError(404, "No assessment found for this establishment.")
+        return latest
+
+    async def _route(self, method: str, target: str, body: bytes) -> tuple[int, dict]:
+        parts = urlsplit(target)
+        path = parts.path.rstrip("/") or "/"
+        if path == "/health":
+            return 200, {"status": "ok", "schema": self.schema.name, "schema_version": self.schema.version,
+                         **self.stats}
+        if path == "/rating":
+            if method != "GET":
+                raise HttpError(405, "Use GET.")
+            query = {name: values[0] for name, values in parse_qs(parts.query).items()}
+            return 200, self.rating(query)
+        if path in ("/assess", "/assess/batch"):
+            if method != "POST":
+                raise HttpError(405, "Use POST.")
+            try:
+                payload = json.loads(body)
+            except ValueError as exc:
+                raise HttpError(400, f"Invalid JSON: {exc}") from exc
+            if path == "/assess":
+                if not isinstance(payload, dict):
+                    raise HttpError(400, "Expected a JSON object.")
+                result = await self.submit(payload)
+                return (422 if "error" in result else 200), result
+            records = payload.get("records") if isinstance(payload, dict) else None
+            if not isinstance(records, list) or not all(isinstance(r, dict) for r in records):
+                raise HttpError(400, 'Expected {"records": [...]}.')
+            results = await asyncio.gather(*(self.submit(record) for record in records))
+            return 200, {"results": results}
+        raise HttpError(404, f"Unknown path {parts.path!r}.")
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request_line = await asyncio.wait_for(reader.readline(), self.keepalive_timeout)
+                except asyncio.TimeoutError:
+                    break
+                if not request_line.strip():
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                method, target, *version = request_line.decode("latin-1").split()
+                keep_alive = headers.get("connection", "").lower() != "close" and version != ["HTTP/1.0"]
+
+                self.stats["requests"] += 1
+                length = int(headers.get("content-length", 0))
+                try:
+                    if length > self.max_body:
+                        raise HttpError(413, "Request body too large.")
+                    body = await reader.readexactly(length)
+                    status, payload = await self._route(method, target, body)
+                except HttpError as exc:
+                    status, payload = exc.status, {"error": str(exc)}
+                    if exc.status == 413:
+                        keep_alive = False
+                except Exception as exc: # Report the failure instead of dropping the connection
+                    status, payload = 500, {"error": f"{type(exc).__name__}: {exc}"}
+
+                data = json.dumps(payload).encode("utf-8")
+                writer.write((
+                    f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+                    "Content-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+                ).encode("ascii") + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(service: AssessmentService):
+    """Runs ``service`` until the task is cancelled."""
+    async with service:
+        print(f"Assessment service listening on {service.url}")
+        await asyncio.Event().wait()
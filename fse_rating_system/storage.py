@@ -0,0 +1,237 @@
+"""
+Persistent assessment store backed by SQLite.
+
+Each assessment result is one row holding the establishment details, the
+assessment date, the raw part scores (one byte per part, in schema order),
+the total score and the star rating. Rows are inserted in bulk with
+``executemany`` inside a transaction, the database runs in WAL mode, and
+the columns used for lookups are indexed so that queries such as "all
+1-star FSEs in location X last quarter" do not scan the whole table.
+
+Keeping the raw part scores and the schema name and version of each row
+means the store can be re-scored in place when the checklist schema
+changes (see ``rescoring``), even if it holds rows of several checklists.
+"""
+import sqlite3
+from collections.abc import Iterable
+
+from .models import ASSESSMENT_DATE_KEY, FSE
+from .schema import DEFAULT_SCHEMA, ChecklistSchema
+
+_SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS assessments (
+    id INTEGER PRIMARY KEY,
+    establishment TEXT NOT NULL,
+    location TEXT NOT NULL,
+    owner_name TEXT,
+    owner_contact TEXT,
+    assessment_date TEXT,
+    schema_name TEXT NOT NULL,
+    schema_version TEXT NOT NULL,
+    scores BLOB NOT NULL,
+    total_score INTEGER NOT NULL,
+    star_rating INTEGER NOT NULL
+);
+"""
+
+_INDEX_SQL = """
+CREATE INDEX IF NOT EXISTS idx_assessments_establishment ON assessments (establishment, location);
+CREATE INDEX IF NOT EXISTS idx_assessments_date ON assessments (assessment_date);
+CREATE INDEX IF NOT EXISTS idx_assessments_rating ON assessments (star_rating, location, assessment_date);
+CREATE INDEX IF NOT EXISTS idx_assessments_total ON assessments (schema_name, schema_version, total_score);
+"""
+
+_INSERT_SQL = """
+INSERT INTO assessments (establishment, location, owner_name, owner_contact, assessment_date,
+                         schema_name, schema_version, scores, total_score, star_rating)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_COLUMNS = ("id", "establishment", "location", "owner_name", "owner_contact",
+            "assessment_date", "schema_name", "schema_version", "scores", "total_score", "star_rating")
+
+
+class AssessmentStore:
+    """
+    SQLite-backed store of assessment results.
+
+    Can be used as a context manager, which closes the connection on exit.
+    """
+
+    def __init__(self, path: str = ":memory:", schema: ChecklistSchema = DEFAULT_SCHEMA):
+        """
+        Args:
+            path: Database file, or ":memory:" for a throwaway database.
+            schema: Checklist schema used to pack and unpack part scores.
+        """
+        self.path = path
+        self.schema = schema
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(_SCHEMA_SQL)
+        self._add_schema_name()
+        self.connection.executescript(_INDEX_SQL)
+
+    def _add_schema_name(self):
+        """
+        Adds the ``schema_name`` column to a database created before it existed.
+
+        Its rows are assumed to have been written with this store's schema.
+        """
+        columns = [row[1] for row in self.connection.execute("PRAGMA table_info(assessments)")]
+        if "schema_name" in columns:
+            return
+        with self.connection:
+            self.connection.execute("DROP INDEX IF EXISTS idx_assessments_total")
+            self.connection.execute("ALTER TABLE assessments ADD COLUMN schema_name TEXT NOT NULL DEFAULT ''")
+            self.connection.execute("UPDATE assessments SET schema_name = ?", (self.schema.name,))
+
+    def close(self):
+        """Closes the database connection."""
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _pack_scores(self, assessment_scores: dict) -> bytes:
+        packed = bytearray(len(self.schema))
+        for part_name, score in assessment_scores.items():
+            packed[self.schema.part_index[part_name]] = score
+        return bytes(packed)
+
+    def _row(self, result: dict) -> tuple:
+        return (result["name"], result["location"], result.get("owner_name"), result.get("owner_contact"),
+                result.get("assessment_date"), self.schema.name, self.schema.version,
+                self._pack_scores(result["assessment_scores"]), result["total_score"], result["star_rating"])
+
+    def add_results(self, results: Iterable[dict], batch_size: int = 10000) -> int:
+        """
+        Inserts assessment results in bulk.
+
+        Results are dictionaries as produced by ``bulk.assess_fses``; results
+        with an ``error`` entry are skipped. Each batch of ``batch_size`` rows
+        is written with one ``executemany`` call in its own transaction.
+
+        Returns:
+            The number of rows inserted.
+        """
+        count = 0
+        batch = []
+        for result in results:
+            if "error" in result:
+                continue
+            batch.append(self._row(result))
+            if len(batch) >= batch_size:
+                with self.connection:
+                    self.connection.executemany(_INSERT_SQL, batch)
+                count += len(batch)
+                batch.clear()
+        if batch:
+            with self.connection:
+                self.connection.executemany(_INSERT_SQL, batch)
+            count += len(batch)
+        return count
+
+    def add_assessment(self, fse: FSE, background_info: dict = None) -> int:
+        """
+        Stores the result of ``perform_assessment`` for a single FSE.
+
+        Returns:
+            The id of the new row.
+        """
+        result = {
+            "name": fse.name,
+            "location": fse.location,
+            "owner_name": fse.owner_name,
+            "owner_contact": fse.owner_contact,
+            "assessment_date": (background_info or {}).get(ASSESSMENT_DATE_KEY),
+            "assessment_scores": fse.assessment_scores,
+            "total_score": fse.total_score,
+            "star_rating": fse.star_rating,
+        }
+        with self.connection:
+            cursor = self.connection.execute(_INSERT_SQL, self._row(result))
+        return cursor.lastrowid
+
+    def query(self, establishment: str = None, location: str = None, star_rating: int = None,
+              since: str = None, until: str = None, limit: int = None) -> list[dict]:
+        """
+        Returns stored assessments matching all of the given filters.
+
+        Args:
+            establishment: FSE name.
+            location: FSE location.
+            star_rating: Exact star rating.
+            since: Earliest assessment date (inclusive, YYYY-MM-DD).
+            until: Latest assessment date (inclusive, YYYY-MM-DD).
+            limit: Maximum number of rows to return.
+
+        Returns:
+            A list of dictionaries, newest assessment first, with the part
+            scores unpacked into an ``assessment_scores`` dict.
+        """
+        clauses, params = [], []
+        for column, value in (("establishment", establishment), ("location", location),
+                              ("star_rating", star_rating)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            clauses.append("assessment_date >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("assessment_date <= ?")
+            params.append(until)
+
+        sql = f"SELECT {', '.join(_COLUMNS)} FROM assessments"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY assessment_date DESC, id DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        rows = []
+        for values in self.connection.execute(sql, params):
+            row = dict(zip(_COLUMNS, values))
+            row["assessment_scores"] = dict(zip(self.schema.part_names, row.pop("scores")))
+            rows.append(row)
+        return rows
+
+    def count(self) -> int:
+        """Returns the number of stored assessments."""
+        return self.connection.execute("SELECT COUNT(*) FROM assessments").fetchone()[0]
+
+    def last_id(self) -> int:
+        """Returns the id of the most recently inserted row, or 0 if the store is empty."""
+        return self.connection.execute("SELECT COALESCE(MAX(id), 0) FROM assessments").fetchone()[0]
+
+    def sync(self):
+        """
+        Makes every committed row durable.
+
+        In WAL mode with ``synchronous=NORMAL`` the latest commits are only
+        in the WAL file, which is not synced on commit. A full checkpoint
+        syncs the WAL, copies it into the database file and syncs that too.
+
+        Raises:
+            sqlite3.OperationalError: If another connection kept the
+                                      checkpoint from completing.
+        """
+        busy, _, _ = self.connection.execute("PRAGMA wal_checkpoint(FULL)").fetchone()
+        if busy:
+            raise sqlite3.OperationalError(f"Could not checkpoint {self.path}: the database is busy.")
+
+    def delete_after(self, row_id: int) -> int:
+        """
+        Deletes the rows inserted after ``row_id``, e.g. by a run that is being resumed.
+
+        Returns:
+            The number of rows deleted.
+        """
+        with self.connection:
+            return self.connection.execute("DELETE FROM assessments WHERE id > ?", (row_id,)).rowcount
@@ -0,0 +1,190 @@
+"""
+Compiled SMS message templates.
+
+A template is written with ``str.format``-style fields, e.g.
+``"Dear {owner_name}, ... Final Score: {total_score}/{max_score}."``, and is
+compiled once per language and checklist schema:
+
+*   fields that only depend on the schema (``{max_score}``) are folded into
+    the text at compile time,
+*   the remaining per-FSE fields are rendered with a single prebuilt
+    ``str.format`` call, and
+*   the encoding (GSM-7 or UCS-2) and the worst-case number of SMS segments
+    are worked out up front, so the cost of a message is known before
+    anything is sent.
+
+``get_template`` caches compiled templates per (language, schema), and
+``get_digest_templates`` does the same for the per-recipient digest
+messages built by ``digests``.
+"""
+import string
+from functools import lru_cache
+from operator import attrgetter
+
+from .schema import DEFAULT_SCHEMA, ChecklistSchema
+from . import cache
+
+DEFAULT_TEMPLATES = {
+    "en": (
+        "Dear {owner_name},\n"
+        "The food safety assessment for '{name}' is complete.\n"
+        "Final Score: {total_score}/{max_score}.\n"
+        "Star Rating: {star_rating} Star(s).\n"
+        "Thank you."
+    ),
+}
+
+# Digest messages combine the results of several establishments for one
+# recipient: a header, one line per establishment and a footer.
+DIGEST_TEMPLATES = {
+    "en": (
+        "Dear {owner_name},\n"
+        "The food safety assessments of your establishments are complete:\n",
+        "- '{name}' ({location}): {total_score}/{max_score}, {star_rating} Star(s)\n",
+        "Thank you.",
+    ),
+}
+
+# Longest value assumed for each per-FSE field when estimating message length.
+FIELD_MAX_LENGTHS = {
+    "owner_name": 40,
+    "name": 60,
+    "location": 60,
+    "total_score": 3,
+    "star_rating": 1,
+}
+
+# GSM 03.38 basic character set, and the extension table characters that
+# take two septets each.
+GSM7_BASIC = set(
+    "@£$¥èéùìòÇ\nØø\rÅåΔ_ΦΓΛΩΠΨΣΘΞÆæßÉ !\"#¤%&'()*+,-./0123456789:;<=>?"
+    "¡ABCDEFGHIJKLMNOPQRSTUVWXYZÄÖÑÜ§¿abcdefghijklmnopqrstuvwxyzäöñüà"
+)
+GSM7_EXTENSION = set("^{}\\[~]|€\f")
+
+
+def sms_encoding(text: str) -> str:
+    """Returns "GSM-7" if the text can be sent in the GSM 7-bit alphabet, else "UCS-2"."""
+    if all(char in GSM7_BASIC or char in GSM7_EXTENSION for char in text):
+        return "GSM-7"
+    return "UCS-2"
+
+
+def sms_length(text: str, encoding: str = None) -> int:
+    """Returns the length of the text in encoding units (septets or UCS-2 code units)."""
+    encoding = encoding or sms_encoding(text)
+    if encoding == "GSM-7":
+        return len(text) + sum(1 for char in text if char in GSM7_EXTENSION)
+    return len(text.encode("utf-16-le")) // 2
+
+
+def sms_segments(length: int, encoding: str) -> int:
+    """Returns the number of SMS segments needed for a message of ``length`` units."""
+    single, multipart = (160, 153) if encoding == "GSM-7" else (70, 67)
+    if length <= single:
+        return 1
+    return -(-length // multipart)
+
+
+class MessageTemplate:
+    """A message template compiled for one language and checklist schema."""
+    __slots__ = ("language", "schema", "source", "fields", "encoding", "max_length", "max_segments",
+                 "_format", "_getter")
+
+    def __init__(self, source: str, schema: ChecklistSchema = DEFAULT_SCHEMA, language: str = "en"):
+        """
+        Args:
+            source: Template text with ``{field}`` placeholders. Supported
+                    fields are ``max_score`` and those in ``FIELD_MAX_LENGTHS``.
+            schema: Checklist schema the messages are for.
+            language: Language code of the template.
+
+        Raises:
+            ValueError: If the template uses an unknown field.
+        """
+        constants = {"max_score": str(schema.max_total)}
+        pieces, fields, static_text = [], [], []
+        for literal, field_name, format_spec, conversion in string.Formatter().parse(source):
+            static_text.append(literal)
+            pieces.append(literal.replace("{", "{{").replace("}", "}}"))
+            if field_name is None:
+                continue
+            if format_spec or conversion:
+                raise ValueError(f"Format specs are not supported in SMS templates: {{{field_name}}}")
+            if field_name in constants:
+                static_text.append(constants[field_name])
+                pieces.append(constants[field_name])
+            elif field_name in FIELD_MAX_LENGTHS:
+                pieces.append(f"{{{len(fields)}}}")
+                fields.append(field_name)
+            else:
+                raise ValueError(f"Unknown field in SMS template: {{{field_name}}}")
+
+        self.language = language
+        self.schema = schema
+        self.source = source
+        self.fields = tuple(fields)
+        self._format = "".join(pieces).format
+        if len(fields) == 1:
+            getter = attrgetter(fields[0])
+            self._getter = lambda fse: (getter(fse),)
+        elif fields:
+            self._getter = attrgetter(*fields)
+        else:
+            self._getter = lambda fse: ()
+
+        # Field values are assumed to be GSM-7 safe; a name outside that
+        # alphabet switches the actual message to UCS-2 when it is sent.
+        static = "".join(static_text)
+        self.encoding = sms_encoding(static)
+        self.max_length = sms_length(static, self.encoding) + sum(FIELD_MAX_LENGTHS[f] for f in fields)
+        self.max_segments = sms_segments(self.max_length, self.encoding)
+
+    def render(self, fse) -> str:
+        """Renders the message for an assessed FSE."""
+        return self._format(*self._getter(fse))
+
+    def field_values(self, fse) -> tuple:
+        """Returns the values of the per-FSE fields used by the template, in order."""
+        return self._getter(fse)
+
+    def render_values(self, values: tuple) -> str:
+        """Renders the message from values returned by ``field_values``."""
+        return self._format(*values)
+
+    def __repr__(self):
+        return (f"MessageTemplate(language={self.language!r}, schema={self.schema!r}, "
+                f"encoding={self.encoding!r}, max_segments={self.max_segments})")
+
+
+_templates = dict(DEFAULT_TEMPLATES)
+
+
+@lru_cache(maxsize=None)
+def get_template(language: str = "en", schema: ChecklistSchema = DEFAULT_SCHEMA) -> MessageTemplate:
+    """
+    Returns the compiled template for a language and checklist schema.
+
+    Raises:
+        KeyError: If no template is registered for the language.
+    """
+    return MessageTemplate(_templates[language], schema, language)
+
+
+@lru_cache(maxsize=None)
+def get_digest_templates(language: str = "en", schema: ChecklistSchema = DEFAULT_SCHEMA) -> tuple:
+    """
+    Returns the compiled ``(header, line, footer)`` digest templates for a language and schema.
+
+    Raises:
+        KeyError: If no digest template is defined for the language.
+    """
+    return tuple(MessageTemplate(source, schema, language) for source in DIGEST_TEMPLATES[language])
+
+
+def register_template(language: str, source: str):
+    """Adds or replaces the template for a language, compiling it to check it is valid."""
+    MessageTemplate(source, language=language)
+    _templates[language] = source
+    get_template.cache_clear()
+    cache.messages.clear()
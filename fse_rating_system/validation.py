@@ -0,0 +1,183 @@
+"""
+Structured validation of checklist scores.
+
+Unlike ``AssessmentChecklist.set_score``, which prints and stops at the
+first problem, the functions here never print and collect every error in a
+record as compact ``(error_code, part_index)`` pairs. ``part_index`` is the
+position of the part in the checklist schema, or -1 for a part name the
+schema does not know.
+
+``validate_batch`` checks a whole matrix of scores column by column, and
+``counters`` keeps running totals that can be exported for monitoring.
+"""
+from .models import is_integer_score
+from .schema import DEFAULT_SCHEMA, ChecklistSchema
+
+ERROR_UNKNOWN_PART = 1
+ERROR_NOT_A_NUMBER = 2
+ERROR_OUT_OF_RANGE = 3
+ERROR_WRONG_WIDTH = 4
+ERROR_INVALID_ITEM = 5
+
+ERROR_NAMES = {
+    ERROR_UNKNOWN_PART: "unknown_part",
+    ERROR_NOT_A_NUMBER: "not_a_number",
+    ERROR_OUT_OF_RANGE: "out_of_range",
+    ERROR_WRONG_WIDTH: "wrong_width",
+    ERROR_INVALID_ITEM: "invalid_item",
+}
+
+
+class ValidationResult:
+    """The errors found in one record; empty if the record is valid."""
+    __slots__ = ("errors",)
+
+    def __init__(self, errors=()):
+        self.errors = tuple(errors)
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+    def __bool__(self):
+        return not self.errors
+
+    def __eq__(self, other):
+        return isinstance(other, ValidationResult) and self.errors == other.errors
+
+    def __repr__(self):
+        return f"ValidationResult({list(self.errors)!r})"
+
+    def messages(self, schema: ChecklistSchema = DEFAULT_SCHEMA) -> list[str]:
+        """Returns a human-readable message per error."""
+        messages = []
+        for code, part_index in self.errors:
+            part_name = schema.part_names[part_index] if part_index >= 0 else "an unknown part"
+            if code == ERROR_OUT_OF_RANGE:
+                messages.append(f"Score for {part_name} must be between 0 and {schema.max_scores[part_index]}.")
+            elif code == ERROR_NOT_A_NUMBER:
+                messages.append(f"Score for {part_name} is not a valid number.")
+            elif code == ERROR_WRONG_WIDTH:
+                messages.append(f"Expected {len(schema)} part scores.")
+            elif code == ERROR_INVALID_ITEM:
+                messages.append(f"Item scores for {part_name} name an unknown item or are out of range.")
+            else:
+                messages.append("Invalid part name.")
+        return messages
+
+
+VALID = ValidationResult()
+
+
+class ValidationCounters:
+    """Running totals of validated records and errors by code."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.records = 0
+        self.invalid_records = 0
+        self.errors = dict.fromkeys(ERROR_NAMES, 0)
+
+    def add(self, result: ValidationResult):
+        self.records += 1
+        if result.errors:
+            self.invalid_records += 1
+            for code, _ in result.errors:
+                self.errors[code] += 1
+
+    def export(self) -> dict:
+        """Returns the counters as a JSON-serializable dictionary."""
+        return {
+            "records": self.records,
+            "invalid_records": self.invalid_records,
+            "errors": {ERROR_NAMES[code]: count for code, count in self.errors.items()},
+        }
+
+
+counters = ValidationCounters()
+
+
+def validate_scores(checklist_scores: dict, schema: ChecklistSchema = DEFAULT_SCHEMA) -> ValidationResult:
+    """
+    Checks every part score in a record without printing anything.
+
+    Part scores must be integers; None, strings, floats such as 18.5 and
+    bools are reported as ``ERROR_NOT_A_NUMBER``.
+
+    Args:
+        checklist_scores: ``{part_name: score}`` as passed to ``perform_assessment``;
+                          itemized parts may be ``{item_name: score}``.
+        schema: Checklist schema to validate against.
+
+    Returns:
+        A ``ValidationResult`` with all the errors found, in the order of
+        ``checklist_scores``.
+    """
+    errors = []
+    part_index = schema.part_index
+    max_scores = schema.max_scores
+    for part_name, score in checklist_scores.items():
+        index = part_index.get(part_name)
+        if index is None:
+            errors.append((ERROR_UNKNOWN_PART, -1))
+        elif isinstance(score, dict):
+            if not _items_valid(part_name, score, schema):
+                errors.append((ERROR_INVALID_ITEM, index))
+        elif not is_integer_score(score):
+            errors.append((ERROR_NOT_A_NUMBER, index))
+        elif not 0 <= score <= max_scores[index]:
+            errors.append((ERROR_OUT_OF_RANGE, index))
+    result = ValidationResult(errors) if errors else VALID
+    counters.add(result)
+    return result
+
+
+def _items_valid(part_name: str, item_scores: dict, schema: ChecklistSchema) -> bool:
+    """Returns True if every item exists in the part and has a score in range or None."""
+    item_index = schema.item_index
+    item_max_scores = schema.item_max_scores
+    if not schema.part_item_weights[schema.part_index[part_name]]:
+        return False
+    for item_name, score in item_scores.items():
+        index = item_index.get((part_name, item_name))
+        if index is None:
+            return False
+        if score is not None and (not isinstance(score, int) or isinstance(score, bool)
+                                  or not 0 <= score <= item_max_scores[index]):
+            return False
+    return True
+
+
+def validate_batch(scores_matrix, schema: ChecklistSchema = DEFAULT_SCHEMA) -> dict:
+    """
+    Validates a matrix of scores (one row per record, one column per part).
+
+    Rows are checked one column at a time, in the same layout as
+    ``perform_assessments_batch``. Like that function, it only accepts
+    integer scores: None, strings, floats such as 18.5 and bools are
+    reported as ``ERROR_NOT_A_NUMBER``.
+
+    Returns:
+        ``{row_index: ValidationResult}`` for the invalid rows only.
+    """
+    width = len(schema)
+    rows = list(scores_matrix)
+    errors = {i: [(ERROR_WRONG_WIDTH, -1)] for i, row in enumerate(rows) if len(row) != width}
+    well_formed = [i for i in range(len(rows)) if i not in errors]
+    columns = zip(*(rows[i] for i in well_formed)) if well_formed else ()
+    for part, (column, max_score) in enumerate(zip(columns, schema.max_scores)):
+        for i, value in zip(well_formed, column):
+            if not is_integer_score(value):
+                errors.setdefault(i, []).append((ERROR_NOT_A_NUMBER, part))
+            elif not 0 <= value <= max_score:
+                errors.setdefault(i, []).append((ERROR_OUT_OF_RANGE, part))
+
+    invalid = {i: ValidationResult(errors[i]) for i in sorted(errors)}
+    counters.records += len(rows)
+    counters.invalid_records += len(invalid)
+    for result in invalid.values():
+        for code, _ in result.errors:
+            counters.errors[code] += 1
+    return invalid
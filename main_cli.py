@@ -1,6 +1,9 @@
-from fse_rating_system.models import FSE, AssessmentChecklist
-from fse_rating_system.assessment import perform_assessment
-from fse_rating_system.notifications import format_assessment_sms, send_sms
+import argparse
+import sys
+
+# Only the lightweight schema module is imported up front; everything else is
+# imported by the mode that needs it, to keep start-up fast for short runs.
+from fse_rating_system.schema import DEFAULT_SCHEMA, load_schema
 
 def get_valid_score(prompt: str, max_score: int) -> int:
     """Gets a valid integer score from the user."""
@@ -14,8 +17,12 @@ def get_valid_score(prompt: str, max_score: int) -> int:
         except ValueError:
             print("Invalid input. Please enter a number.")
 
-def run_cli():
+def run_cli(schema=DEFAULT_SCHEMA):
     """Runs the command-line interface for FSE assessment."""
+    from fse_rating_system.models import FSE, AssessmentChecklist
+    from fse_rating_system.assessment import perform_assessment
+    from fse_rating_system.notifications import format_assessment_sms, send_sms
+
     print("Welcome to the FSE Rating System CLI")
     print("------------------------------------")
 
@@ -41,7 +48,7 @@ def run_cli():
 
     # 2. Get scores for each part of the checklist
     print("\n--- Enter Assessment Scores ---")
-    checklist = AssessmentChecklist() # Used here to access part names and max scores
+    checklist = AssessmentChecklist(schema) # Used here to access part names and max scores
     checklist_scores_input = {}
 
     for part_name, details in checklist.parts.items():
@@ -51,7 +58,7 @@ def run_cli():
 
     # 3. Perform Assessment
     print("\n--- Processing Assessment ---")
-    total_score, star_rating = perform_assessment(fse_instance, checklist_scores_input, assessment_bg_info)
+    total_score, star_rating = perform_assessment(fse_instance, checklist_scores_input, assessment_bg_info, schema)
 
     if total_score is not None and star_rating is not None:
         print("\n--- Assessment Results ---")
@@ -66,7 +73,7 @@ def run_cli():
 
         # 4. Generate and "Send" SMS
         print("\n--- SMS Notification ---")
-        sms_message = format_assessment_sms(fse_instance)
+        sms_message = format_assessment_sms(fse_instance, schema)
         if fse_instance.owner_contact:
             send_sms(fse_instance.owner_contact, sms_message)
         else:
@@ -78,14 +85,271 @@ def run_cli():
     print("\n------------------------------------")
     print("Thank you for using the FSE Rating System.")
 
+def _shard(value: str) -> tuple:
+    """Parses an "I/N" shard argument into ``(I, N)``."""
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected I/N, e.g. 0/4, not {value!r}") from None
+    if not 0 <= index < count:
+        raise argparse.ArgumentTypeError(f"shard index must be between 0 and {count - 1}")
+    return index, count
+
+def build_parser() -> argparse.ArgumentParser:
+    """Builds the parser for the command-line options and sub-commands."""
+    parser = argparse.ArgumentParser(description="FSE Rating System")
+    parser.add_argument("--schema", help="Checklist schema file (.json, .toml or .yaml). Defaults to the standard checklist.")
+    parser.add_argument("--metrics", help="Collect timings and counters and write them to this file "
+                                          "(.prom for Prometheus text, otherwise JSON).")
+    parser.add_argument("--profile", help="Run under cProfile and tracemalloc and write a report to this file.")
+    parser.add_argument("--cache-size", type=int,
+                        help="Entries kept in each result cache (default: 4096; 0 disables caching).")
+    parser.add_argument("--daemon-socket", help="Run the command in the warm daemon listening on this socket.")
+    subparsers = parser.add_subparsers(dest="command")
+
+    batch_parser = subparsers.add_parser("batch", help="Assess every record in a CSV or JSON Lines file.")
+    batch_parser.add_argument("--in", dest="in_path", required=True, help="Input .csv or .jsonl file.")
+    batch_parser.add_argument("--out", dest="out_path", required=True, help="Output .jsonl file.")
+    batch_parser.add_argument("--chunk-size", type=int, default=1000,
+                              help="Number of results written per flush (default: 1000).")
+    batch_parser.add_argument("--db", help="SQLite database file to save the results to.")
+    batch_parser.add_argument("--index", dest="index_path",
+                              help="Assessment index file; records already in it are skipped as duplicates.")
+    batch_parser.add_argument("--workers", type=int, default=1,
+                              help="Number of worker processes (default: 1).")
+    batch_parser.add_argument("--outbox", help="Outbox .jsonl file for one message per recipient, for 'dispatch'.")
+    batch_parser.add_argument("--digest-window", type=int, default=10000,
+                              help="Results grouped per recipient before the outbox is written (default: 10000).")
+    batch_parser.add_argument("--digest-max-items", type=int, default=10,
+                              help="Maximum establishments listed in one digest message (default: 10).")
+    batch_parser.add_argument("--country-code",
+                              help="Country calling code for national phone numbers, e.g. 233.")
+    batch_parser.add_argument("--checkpoint",
+                              help="Checkpoint file; the run commits its progress there and resumes from it.")
+    batch_parser.add_argument("--checkpoint-every", type=int, default=10000,
+                              help="Input records per checkpoint (default: 10000).")
+    batch_parser.add_argument("--shard", type=_shard,
+                              help="Assess only shard I of N of the input, e.g. 2/4 (requires --checkpoint); "
+                                   "each shard needs its own --out, --db, --index and --outbox files.")
+
+    dispatch_parser = subparsers.add_parser("dispatch", help="Send the SMS messages from a batch results file.")
+    dispatch_parser.add_argument("--in", dest="in_path", required=True, help="Results .jsonl file or outbox from 'batch'.")
+    dispatch_parser.add_argument("--gateway", required=True, help="HTTP SMS gateway URL.")
+    dispatch_parser.add_argument("--rate", type=float, default=10.0, help="Maximum messages per second (default: 10).")
+    dispatch_parser.add_argument("--concurrency", type=int, default=4, help="Batches in flight at once (default: 4).")
+    dispatch_parser.add_argument("--batch-size", type=int, default=50, help="Messages per gateway call (default: 50).")
+    dispatch_parser.add_argument("--dead-letter", default="dead_letter.jsonl",
+                                 help="File for messages that could not be delivered (default: dead_letter.jsonl).")
+
+    rescore_parser = subparsers.add_parser(
+        "rescore", help="Re-score stored assessments after a checklist schema change.")
+    rescore_parser.add_argument("--db", required=True, help="SQLite database written by 'batch --db'.")
+    rescore_parser.add_argument("--old-schema", help="Schema the assessments were stored with (default: standard checklist).")
+    rescore_parser.add_argument("--out", dest="out_path", required=True,
+                                help="Output .jsonl file listing the assessments whose star rating changed.")
+
+    serve_parser = subparsers.add_parser("serve", help="Run the HTTP assessment service.")
+    serve_parser.add_argument("--host", default="127.0.0.1", help="Address to listen on (default: 127.0.0.1).")
+    serve_parser.add_argument("--port", type=int, default=8080, help="Port to listen on (default: 8080).")
+    serve_parser.add_argument("--db", help="SQLite database file to save the results to.")
+    serve_parser.add_argument("--index", dest="index_path",
+                              help="Assessment index file used for rating lookups and duplicate detection.")
+    serve_parser.add_argument("--batch-window", type=float, default=0.002,
+                              help="Seconds to wait for more submissions per micro-batch (default: 0.002).")
+    serve_parser.add_argument("--max-batch", type=int, default=256,
+                              help="Maximum records assessed together (default: 256).")
+
+    archive_parser = subparsers.add_parser(
+        "archive", help="Append the results of a batch results file to a binary assessment archive.")
+    archive_parser.add_argument("--in", dest="in_path", required=True, help="Results .jsonl file from 'batch'.")
+    archive_parser.add_argument("--out", dest="out_path", required=True, help="Archive file to append to.")
+
+    daemon_parser = subparsers.add_parser(
+        "daemon", help="Keep one warm process running commands from stdin or a Unix socket.")
+    daemon_parser.add_argument("--socket", help="Unix domain socket to listen on (default: read commands from stdin).")
+    return parser
+
+def main(argv=None):
+    """Parses command-line arguments and runs the requested mode.
+
+    With no sub-command the interactive CLI is started. The ``batch``
+    sub-command assesses a whole CSV or JSON Lines file without prompting,
+    ``serve`` runs the HTTP assessment service for several inspectors, and
+    ``daemon`` runs many short commands in one warm process.
+    """
+    args = build_parser().parse_args(argv)
+    if args.daemon_socket:
+        from fse_rating_system.daemon import send
+        status, output = send(args.daemon_socket, _without_option(sys.argv[1:] if argv is None else argv,
+                                                                  "--daemon-socket"))
+        print(output, end="")
+        sys.exit(status)
+    schema = load_schema(args.schema) if args.schema else DEFAULT_SCHEMA
+    if args.cache_size is not None:
+        from fse_rating_system import cache
+        cache.configure(args.cache_size)
+
+    if args.metrics or args.profile:
+        from contextlib import nullcontext
+        from fse_rating_system import instrumentation
+        instrumentation.enable()
+        with instrumentation.profiled(args.profile) if args.profile else nullcontext():
+            run_command(args, schema)
+        if args.metrics:
+            instrumentation.write_metrics(args.metrics)
+    else:
+        run_command(args, schema)
+
+def _without_option(argv, option):
+    """Returns ``argv`` without ``option`` and its value."""
+    result = []
+    skip = False
+    for arg in argv:
+        if skip:
+            skip = False
+        elif arg == option:
+            skip = True
+        elif not arg.startswith(option + "="):
+            result.append(arg)
+    return result
+
+def run_in_daemon(argv):
+    """Runs one command inside the daemon, starting from fresh counters and metrics."""
+    args = build_parser().parse_args(argv)
+    if args.command in (None, "daemon", "serve") or args.daemon_socket:
+        raise SystemExit("The daemon only runs the batch, dispatch, rescore and archive sub-commands.")
+    from fse_rating_system import instrumentation, validation
+    validation.counters.reset()
+    instrumentation.disable()
+    instrumentation.reset()
+    main(argv)
+
+def run_command(args, schema):
+    """Runs the sub-command selected on the command line."""
+    if args.command == "batch":
+        from fse_rating_system.bulk import run_batch
+        store = index = outbox = checkpoint = None
+        if args.shard and not args.checkpoint:
+            raise SystemExit("--shard requires --checkpoint.")
+        if args.checkpoint:
+            from fse_rating_system.checkpoint import Checkpoint, checkpoint_job, claim_files
+            checkpoint = Checkpoint(args.checkpoint)
+            try:
+                job = checkpoint_job(args.in_path, args.out_path, schema, args.shard)
+                checkpoint.check_job(job)
+                if not checkpoint.complete:
+                    # Before anything is rolled back: another shard may be writing to the same files
+                    claim_files(job, [args.out_path, args.db, args.index_path, args.outbox])
+            except ValueError as exc:
+                raise SystemExit(str(exc))
+            if not checkpoint.complete:
+                checkpoint.restore() # Before the index and outbox files are opened
+                if checkpoint.offset:
+                    print(f"Resuming after {checkpoint.offset} committed records.")
+        if args.db:
+            from fse_rating_system.storage import AssessmentStore
+            store = AssessmentStore(args.db, schema)
+        if args.index_path:
+            from fse_rating_system.index import AssessmentIndex
+            index = AssessmentIndex(args.index_path, schema)
+        if args.outbox:
+            from fse_rating_system.digests import DigestOutbox
+            outbox = DigestOutbox(args.outbox, window=args.digest_window, max_items=args.digest_max_items,
+                                  schema=schema, country_code=args.country_code,
+                                  append=checkpoint is not None and bool(checkpoint.state))
+        try:
+            if checkpoint is not None:
+                from fse_rating_system.checkpoint import run_checkpointed
+                totals = run_checkpointed(args.in_path, args.out_path, checkpoint, every=args.checkpoint_every,
+                                          workers=args.workers, schema=schema, store=store, index=index,
+                                          outbox=outbox, shard=args.shard)
+            else:
+                count = run_batch(args.in_path, args.out_path, chunk_size=args.chunk_size, workers=args.workers,
+                                  schema=schema, store=store, index=index, outbox=outbox)
+        finally:
+            if store is not None:
+                store.close()
+            if index is not None:
+                index.close()
+            if outbox is not None:
+                outbox.close()
+        if checkpoint is not None:
+            print(f"Assessed {totals['written']} records ({totals['errors']} with errors). "
+                  f"Results written to {args.out_path}")
+            if index is not None:
+                print(f"Skipped {totals['duplicates']} duplicate submissions.")
+        else:
+            from fse_rating_system.validation import counters
+            print(f"Assessed {count} records ({counters.invalid_records} invalid). "
+                  f"Results written to {args.out_path}")
+            if index is not None:
+                print(f"Skipped {index.duplicates} duplicate submissions.")
+        if outbox is not None:
+            print(f"Wrote {outbox.stats['messages']} messages ({outbox.stats['digests']} digests) "
+                  f"to {args.outbox}")
+    elif args.command == "dispatch":
+        import asyncio
+        import json
+        from fse_rating_system.dispatch import HttpGatewayTransport, dispatch_messages, messages_from_results
+        with open(args.in_path, encoding="utf-8") as f:
+            results = (json.loads(line) for line in f if line.strip())
+            stats = asyncio.run(dispatch_messages(
+                messages_from_results(results), HttpGatewayTransport(args.gateway),
+                concurrency=args.concurrency, rate=args.rate, batch_size=args.batch_size,
+                dead_letter_path=args.dead_letter))
+        print(f"Sent {stats['sent']} messages in {stats['batches']} batches; "
+              f"{stats['dead_lettered']} written to {args.dead_letter}")
+        if stats["lost"]:
+            print(f"Warning: {stats['lost']} undeliverable messages could not be written to {args.dead_letter}.")
+    elif args.command == "rescore":
+        import json
+        from fse_rating_system.storage import AssessmentStore
+        from fse_rating_system.rescoring import change_notifications, rescore
+        old_schema = load_schema(args.old_schema) if args.old_schema else DEFAULT_SCHEMA
+        with AssessmentStore(args.db, schema) as store:
+            changed, invalid = rescore(store, old_schema, schema)
+        with open(args.out_path, "w", encoding="utf-8") as f:
+            for change in change_notifications(changed, schema):
+                f.write(json.dumps(change) + "\n")
+        print(f"{len(changed)} star ratings changed (written to {args.out_path}); "
+              f"{len(invalid)} assessments are not valid under the new schema.")
+    elif args.command == "serve":
+        import asyncio
+        from fse_rating_system.index import AssessmentIndex
+        from fse_rating_system.service import AssessmentService, serve
+        store = None
+        if args.db:
+            from fse_rating_system.storage import AssessmentStore
+            store = AssessmentStore(args.db, schema)
+        index = AssessmentIndex(args.index_path, schema)
+        service = AssessmentService(schema, index=index, store=store, host=args.host, port=args.port,
+                                    batch_window=args.batch_window, max_batch=args.max_batch)
+        try:
+            asyncio.run(serve(service))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            index.close()
+            if store is not None:
+                store.close()
+    elif args.command == "archive":
+        import json
+        from fse_rating_system.archive import ArchiveWriter
+        with open(args.in_path, encoding="utf-8") as f, ArchiveWriter(args.out_path, schema) as writer:
+            count = writer.append_results(json.loads(line) for line in f if line.strip())
+        print(f"Archived {count} assessments to {args.out_path}")
+    elif args.command == "daemon":
+        from fse_rating_system import daemon
+        if args.socket:
+            print(f"FSE daemon listening on {args.socket}")
+            try:
+                daemon.serve_socket(run_in_daemon, args.socket)
+            except KeyboardInterrupt:
+                pass
+        elif daemon.run_lines(run_in_daemon, sys.stdin):
+            sys.exit(1)
+    else:
+        run_cli(schema)
+
 if __name__ == "__main__":
-    # Create the package directory if it doesn't exist, for imports to work when run directly
-    import os
-    if not os.path.exists("fse_rating_system"):
-        os.makedirs("fse_rating_system")
-    # Create an __init__.py if it doesn't exist for the same reason
-    if not os.path.exists("fse_rating_system/__init__.py"):
-        with open("fse_rating_system/__init__.py", "w") as f:
-            pass # Empty file is fine for a simple package marker
-
-    run_cli()
+    main()
@@ -0,0 +1,69 @@
+import unittest
+
+from fse_rating_system.models import FSE
+from fse_rating_system.assessment import perform_assessment, perform_assessments_batch
+from fse_rating_system.analytics import RunningAggregates, summarize
+from fse_rating_system.schema import DEFAULT_SCHEMA
+
+LOCATIONS = ["Accra", "Accra", "Kumasi", "Accra"]
+DATES = ["2024-05-02", "2024-05-20", "2024-06-11", "2024-06-30"]
+ROWS = [
+    (20, 20, 20, 10, 20, 10),  # 100 -> 5
+    (18, 16, 14, 2, 18, 9),    # 77 -> 3
+    (10, 10, 10, 5, 10, 5),    # 50 -> 1
+    (17, 17, 17, 4, 17, 8),    # 80 -> 4
+]
+
+
+def incremental():
+    aggregates = RunningAggregates()
+    for i, (location, date, row) in enumerate(zip(LOCATIONS, DATES, ROWS)):
+        fse = FSE(f"FSE {i}", location, "Owner", "555-0000")
+        perform_assessment(fse, dict(zip(DEFAULT_SCHEMA.part_names, row)))
+        aggregates.add_fse(fse, {"Date of Assessment": date})
+    return aggregates
+
+
+class TestAnalytics(unittest.TestCase):
+
+    def test_star_distribution(self):
+        """Test star counts per location and overall."""
+        aggregates = incremental()
+        self.assertEqual(aggregates.star_distribution("Accra"), {0: 0, 1: 0, 2: 0, 3: 1, 4: 1, 5: 1})
+        self.assertEqual(aggregates.star_distribution()[1], 1)
+        self.assertEqual(aggregates.star_distribution("Nowhere"), dict.fromkeys(range(6), 0))
+
+    def test_part_means_and_worst_part(self):
+        """Test per-part means and the worst part as a percentage of its maximum."""
+        aggregates = incremental()
+        means = aggregates.part_means("Accra")
+        self.assertAlmostEqual(means["Part 2: Documentations"], (20 + 18 + 17) / 3)
+        part_name, percentage = aggregates.worst_part("Accra")
+        self.assertEqual(part_name, "Part 5: Water Sources and Storage")
+        self.assertAlmostEqual(percentage, (10 + 2 + 4) / 3 / 10 * 100)
+        self.assertEqual(aggregates.worst_parts()["Kumasi"][1], 50.0)
+        self.assertAlmostEqual(aggregates.mean_score("Accra"), (100 + 77 + 80) / 3)
+
+    def test_trend(self):
+        """Test monthly trend over assessment dates."""
+        trend = incremental().trend()
+        self.assertEqual([t["month"] for t in trend], ["2024-05", "2024-06"])
+        self.assertEqual(trend[0]["assessments"], 2)
+        self.assertAlmostEqual(trend[1]["mean_score"], 65.0)
+
+    def test_summarize_matches_incremental(self):
+        """Test that one-pass columnar aggregation equals adding records one by one."""
+        totals, stars, _ = perform_assessments_batch(ROWS)
+        columnar = summarize(LOCATIONS, DATES, ROWS, totals, stars)
+        running = incremental()
+        self.assertEqual(columnar.star_distributions(), running.star_distributions())
+        self.assertEqual(columnar.part_means("Accra"), running.part_means("Accra"))
+        self.assertEqual(columnar.trend(), running.trend())
+
+        # Columnar aggregates keep updating incrementally.
+        columnar.add("Kumasi", "2024-07-01", (20, 20, 20, 10, 20, 10), 100, 5)
+        self.assertEqual(columnar.star_distribution("Kumasi")[5], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
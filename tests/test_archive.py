@@ -0,0 +1,78 @@
+import os
+import tempfile
+import unittest
+
+from fse_rating_system.models import FSE, establishment_key
+from fse_rating_system.assessment import perform_assessment
+from fse_rating_system.archive import (ArchiveReader, ArchiveWriter, date_to_int, establishment_id, int_to_date,
+                                       pack_scores, unpack_scores)
+from fse_rating_system.schema import DEFAULT_PARTS, DEFAULT_SCHEMA, ChecklistSchema
+
+SCORES = dict(zip(DEFAULT_SCHEMA.part_names, [18, 20, 15, 7, 18, 9]))
+
+
+def result(name, date, scores, stars):
+    return {"name": name, "location": "Accra", "assessment_date": date,
+            "assessment_scores": dict(zip(DEFAULT_SCHEMA.part_names, scores)),
+            "total_score": sum(scores), "star_rating": stars}
+
+
+class TestArchive(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "history.fsea")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_converters(self):
+        """Test conversion of dates and score dicts to and from the binary form."""
+        self.assertEqual(date_to_int("2024-07-01"), 20240701)
+        self.assertEqual(int_to_date(20240701), "2024-07-01")
+        self.assertEqual(date_to_int(None), 0)
+        self.assertEqual(date_to_int("July 2024"), 0)
+        self.assertEqual(unpack_scores(pack_scores(SCORES)), SCORES)
+
+    def test_write_append_and_read(self):
+        """Test that records round-trip through the file, across several appends."""
+        with ArchiveWriter(self.path) as writer:
+            self.assertEqual(writer.append_results([
+                result("Cafe A", "2024-03-01", [20, 20, 20, 10, 20, 10], 5),
+                result("Cafe B", "2024-05-01", [10, 10, 10, 5, 10, 5], 1),
+                {"name": "Cafe C", "location": "Accra", "error": "bad"},
+            ], batch_size=1), 2)
+        fse = FSE("Cafe A", "Accra", "Ama", "555-0001")
+        perform_assessment(fse, SCORES)
+        with ArchiveWriter(self.path) as writer:
+            writer.append_fse(fse, {"Date of Assessment": "2024-09-01"})
+
+        with ArchiveReader(self.path) as reader:
+            self.assertEqual(len(reader), 3)
+            last = reader[-1]
+            self.assertEqual(last.establishment_id, establishment_id(fse.key))
+            self.assertEqual((last.total_score, last.star_rating), (87, 4))
+            self.assertEqual(reader.to_result(last)["assessment_scores"], SCORES)
+            self.assertEqual(reader.to_result(last)["assessment_date"], "2024-09-01")
+            self.assertEqual([r.star_rating for r in reader], [5, 1, 4])
+
+            self.assertEqual(reader.find(establishment=establishment_key("cafe a", "accra")), [0, 2])
+            self.assertEqual(reader.find(since="2024-04-01", until="2024-12-31"), [1, 2])
+            self.assertEqual(reader.find(star_rating=1), [1])
+            self.assertEqual(reader.star_distribution(since="2024-04-01"), {0: 0, 1: 1, 2: 0, 3: 0, 4: 1, 5: 0})
+
+    def test_schema_mismatch(self):
+        """Test that a file written for one schema is rejected for another."""
+        ArchiveWriter(self.path).close()
+        other = ChecklistSchema(DEFAULT_PARTS, version="2")
+        with self.assertRaises(ValueError):
+            ArchiveReader(self.path, other)
+        with self.assertRaises(ValueError):
+            ArchiveWriter(self.path, other)
+        with ArchiveReader(self.path) as reader:
+            self.assertEqual(len(reader), 0)
+            self.assertEqual(list(reader), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,7 @@
 import unittest
 from fse_rating_system.models import AssessmentChecklist
-from fse_rating_system.assessment import calculate_star_rating
+from fse_rating_system.models import FSE
+from fse_rating_system.assessment import calculate_star_rating, perform_assessment, perform_assessments_batch
 
 class TestAssessmentChecklist(unittest.TestCase):
 
@@ -92,6 +93,46 @@ class TestStarRating(unittest.TestCase):
         """Test star rating with a negative score."""
         self.assertEqual(calculate_star_rating(-10, 100), 0) # Or specific error indicator
 
+class TestBatchAssessment(unittest.TestCase):
+
+    def test_batch_matches_single_assessment(self):
+        """Test that batch totals and stars match perform_assessment row by row."""
+        part_names = list(AssessmentChecklist().parts)
+        rows = [
+            (18, 20, 15, 7, 18, 9),
+            (20, 20, 20, 10, 20, 10),
+            (0, 0, 0, 0, 0, 0),
+            (12, 12, 12, 6, 12, 6),
+        ]
+        totals, stars, invalid = perform_assessments_batch(rows)
+        for i, row in enumerate(rows):
+            fse = FSE("Batch FSE", "Somewhere", "Owner", "555-0000")
+            expected = perform_assessment(fse, dict(zip(part_names, row)))
+            self.assertEqual((totals[i], stars[i]), expected)
+        self.assertEqual(list(invalid), [0, 0, 0, 0])
+
+    def test_batch_flags_invalid_rows(self):
+        """Test that out-of-range, non-integer and wrongly sized rows are masked, not aborted."""
+        rows = [
+            (25, 20, 15, 7, 18, 9),   # Part 2 above max
+            (18, 20, 15, 7, 18, -1),  # negative score
+            (18, 20, 15),             # too few parts
+            (18, 20, 15, 7, 18, 9),
+            (None, 20, 15, 7, 18, 9), # missing score
+            (18.5, 20, 15, 7, 18, 9), # not an integer
+            (18, "20", 15, 7, 18, 9), # string
+            (18, 20, 15, 7, True, 9), # bool
+        ]
+        totals, stars, invalid = perform_assessments_batch(rows)
+        self.assertEqual(list(invalid), [1, 1, 1, 0, 1, 1, 1, 1])
+        self.assertEqual(list(totals), [0, 0, 0, 87, 0, 0, 0, 0])
+        self.assertEqual(list(stars), [0, 0, 0, 4, 0, 0, 0, 0])
+
+    def test_batch_empty(self):
+        """Test that an empty batch returns empty arrays."""
+        totals, stars, invalid = perform_assessments_batch([])
+        self.assertEqual((len(totals), len(stars), len(invalid)), (0, 0, 0))
+
 if __name__ == '__main__':
     # This setup is to allow running tests directly from this file,
     # ensuring that the fse_rating_system package is discoverable.
@@ -0,0 +1,124 @@
+import csv
+import json
+import os
+import tempfile
+import unittest
+
+from fse_rating_system.models import AssessmentChecklist
+from fse_rating_system.bulk import run_batch
+from fse_rating_system.index import AssessmentIndex
+from fse_rating_system.storage import AssessmentStore
+
+PART_NAMES = list(AssessmentChecklist().parts)
+
+
+class TestBulkPipeline(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.out_path = os.path.join(self.tmp.name, "results.jsonl")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def read_output(self):
+        with open(self.out_path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f]
+
+    def test_csv_input(self):
+        """Test that CSV rows are assessed in order and bad rows are reported."""
+        in_path = os.path.join(self.tmp.name, "inspections.csv")
+        header = ["name", "location", "owner_name", "owner_contact", "Date of Assessment"] + PART_NAMES
+        with open(in_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            writer.writerow(["Cafe A", "Accra", "Ama", "555-0001", "2024-07-01", 18, 20, 15, 7, 18, 9])
+            writer.writerow(["Cafe B", "Kumasi", "Kofi", "555-0002", "2024-07-02", 25, 20, 15, 7, 18, 9])
+            writer.writerow(["Cafe C", "Tema", "Esi", "555-0003", "2024-07-03", "x", 20, 15, 7, 18, 9])
+
+        count = run_batch(in_path, self.out_path, chunk_size=2)
+
+        self.assertEqual(count, 3)
+        results = self.read_output()
+        self.assertEqual([r["name"] for r in results], ["Cafe A", "Cafe B", "Cafe C"])
+        self.assertEqual(results[0]["total_score"], 87)
+        self.assertEqual(results[0]["star_rating"], 4)
+        self.assertIn("Final Score: 87/100.", results[0]["sms"])
+        self.assertEqual(results[1]["error_codes"], [[3, 0]])  # out of range, Part 2
+        self.assertEqual(results[2]["error_codes"], [[2, 0]])  # not a number, Part 2
+
+    def test_jsonl_input(self):
+        """Test that JSON Lines records are assessed."""
+        in_path = os.path.join(self.tmp.name, "inspections.jsonl")
+        record = {
+            "name": "Cafe D", "location": "Accra", "owner_name": "Yaw", "owner_contact": "555-0004",
+            "background_info": {"Date of Assessment": "2024-07-04"},
+            "scores": dict(zip(PART_NAMES, [20, 20, 20, 10, 20, 10])),
+        }
+        with open(in_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+
+        self.assertEqual(run_batch(in_path, self.out_path), 1)
+        result = self.read_output()[0]
+        self.assertEqual((result["total_score"], result["star_rating"]), (100, 5))
+
+    def test_float_score_with_store(self):
+        """Test that a fractional score is reported per record instead of stopping a run that saves results."""
+        in_path = os.path.join(self.tmp.name, "inspections.jsonl")
+        scores = dict(zip(PART_NAMES, [20, 20, 20, 10, 20, 10]))
+        with open(in_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"name": "Cafe H", "location": "Accra",
+                                "scores": {**scores, PART_NAMES[0]: 18.5}}) + "\n")
+            f.write(json.dumps({"name": "Cafe I", "location": "Accra", "scores": scores}) + "\n")
+
+        with AssessmentStore() as store:
+            self.assertEqual(run_batch(in_path, self.out_path, store=store), 2)
+            self.assertEqual([row["establishment"] for row in store.query()], ["Cafe I"])
+        results = self.read_output()
+        self.assertEqual(results[0]["error_codes"], [[2, 0]])
+        self.assertEqual(results[1]["total_score"], 100)
+
+    def test_malformed_jsonl_lines(self):
+        """Test that malformed JSON Lines records are reported per record without stopping the run."""
+        in_path = os.path.join(self.tmp.name, "inspections.jsonl")
+        good = {"name": "Cafe E", "location": "Accra", "scores": dict(zip(PART_NAMES, [20, 20, 20, 10, 20, 10]))}
+        with open(in_path, "w", encoding="utf-8") as f:
+            f.write("{not json\n")
+            f.write("[1, 2]\n")
+            f.write(json.dumps({"name": "Cafe F", "location": "Accra", "scores": [20, 20]}) + "\n")
+            f.write(json.dumps({"name": "Cafe G", "location": "Accra", "background_info": "x",
+                                "scores": good["scores"]}) + "\n")
+            f.write(json.dumps(good) + "\n")
+            f.write(json.dumps({**good, "background_info": {"Date of Assessment": 20240201}}) + "\n")
+            f.write(json.dumps({**good, "background_info": {"Date of Assessment": "2024-02-01"}}) + "\n")
+
+        self.assertEqual(run_batch(in_path, self.out_path, index=AssessmentIndex()), 7)
+        results = self.read_output()
+        self.assertIn("Line 1", results[0]["error"])
+        self.assertIn("must be an object", results[1]["error"])
+        self.assertEqual(results[2]["name"], "Cafe F")
+        self.assertIn("scores", results[2]["error"])
+        self.assertIn("background_info", results[3]["error"])
+        self.assertEqual(results[4]["total_score"], 100)
+        self.assertIn("Date of Assessment", results[5]["error"])
+        self.assertEqual(results[6]["total_score"], 100)
+
+    def test_parallel_workers_preserve_order(self):
+        """Test that a multi-worker run gives the same output as a single-process run."""
+        in_path = os.path.join(self.tmp.name, "inspections.jsonl")
+        with open(in_path, "w", encoding="utf-8") as f:
+            for i in range(25):
+                record = {
+                    "name": f"Cafe {i}", "location": "Accra", "owner_name": "Owner", "owner_contact": "555",
+                    "scores": dict(zip(PART_NAMES, [i % 21, 20, 20, 10, 20, 10])),
+                }
+                f.write(json.dumps(record) + "\n")
+
+        run_batch(in_path, self.out_path)
+        expected = self.read_output()
+        self.assertEqual(run_batch(in_path, self.out_path, workers=2), 25)
+        self.assertEqual(self.read_output(), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
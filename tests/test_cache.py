@@ -0,0 +1,103 @@
+import unittest
+
+from fse_rating_system import cache
+from fse_rating_system.models import FSE
+from fse_rating_system.assessment import perform_assessment
+from fse_rating_system.notifications import format_assessment_sms
+from fse_rating_system.schema import DEFAULT_PARTS, DEFAULT_SCHEMA, ChecklistSchema, schema_from_dict
+from fse_rating_system.templates import DEFAULT_TEMPLATES, register_template
+
+SCORES = dict(zip(DEFAULT_SCHEMA.part_names, [18, 20, 15, 7, 18, 9]))
+
+
+class TestLRUCache(unittest.TestCase):
+
+    def test_eviction_and_stats(self):
+        """Test that the least recently used entry is evicted and lookups are counted."""
+        lru = cache.LRUCache(maxsize=2)
+        lru.put("a", 1)
+        lru.put("b", 2)
+        self.assertEqual(lru.get("a"), 1)  # "b" is now least recently used
+        lru.put("c", 3)
+        self.assertIs(lru.get("b"), cache.MISSING)
+        self.assertEqual(lru.stats()["evictions"], 1)
+        self.assertEqual((lru.hits, lru.misses), (1, 1))
+
+        lru.resize(0)
+        lru.put("d", 4)
+        self.assertEqual(len(lru), 0)
+        self.assertFalse(lru.enabled)
+
+
+class TestResultCaches(unittest.TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def tearDown(self):
+        cache.configure(cache.DEFAULT_MAXSIZE)
+        cache.clear()
+
+    def test_assessment_cache_hit(self):
+        """Test that a repeated score vector is served from the cache with the same results."""
+        first = FSE("Cafe A", "Accra", "Ama", "555-0001")
+        second = FSE("Cafe B", "Tema", "Kofi", "555-0002")
+        self.assertEqual(perform_assessment(first, SCORES), (87, 4))
+        self.assertEqual(perform_assessment(second, dict(SCORES)), (87, 4))
+        self.assertEqual(second.assessment_scores, first.assessment_scores)
+        self.assertEqual(cache.assessments.stats()["hits"], 1)
+
+    def test_schema_version_is_part_of_the_key(self):
+        """Test that results computed under one schema version are not reused for another."""
+        strict = ChecklistSchema(DEFAULT_PARTS, star_bands=((95, 5), (90, 4), (75, 3), (65, 2), (0, 1)), version="2")
+        fse = FSE("Cafe A", "Accra", "Ama", "555-0001")
+        self.assertEqual(perform_assessment(fse, SCORES), (87, 4))
+        self.assertEqual(perform_assessment(fse, SCORES, schema=strict), (87, 3))
+        self.assertEqual(cache.assessments.stats()["hits"], 0)
+
+    def test_unnamed_schemas_do_not_collide(self):
+        """Test that schemas with the default name and version are told apart by their content."""
+        parts = [{"name": name, "max_score": max_score} for name, max_score in DEFAULT_PARTS.items()]
+        strict = schema_from_dict({"parts": parts, "star_bands": [{"min_percentage": 95, "stars": 5},
+                                                                  {"min_percentage": 0, "stars": 1}]})
+        doubled = schema_from_dict({"parts": [dict(part, max_score=part["max_score"] * 2) for part in parts]})
+        self.assertEqual((strict.name, strict.version), (DEFAULT_SCHEMA.name, DEFAULT_SCHEMA.version))
+
+        fse = FSE("Cafe A", "Accra", "Ama", "555-0001")
+        self.assertEqual(perform_assessment(fse, SCORES), (87, 4))
+        self.assertIn("87/100", format_assessment_sms(fse))
+        self.assertEqual(perform_assessment(fse, SCORES, schema=strict), (87, 1))
+        self.assertEqual(perform_assessment(fse, SCORES, schema=doubled), (87, 1))
+        self.assertIn("87/200", format_assessment_sms(fse, doubled))
+        self.assertEqual(cache.assessments.stats()["hits"], 0)
+
+    def test_message_cache(self):
+        """Test that messages are cached per owner and name and cleared when templates change."""
+        fse = FSE("Cafe A", "Accra", "Ama", "555-0001")
+        perform_assessment(fse, SCORES)
+        message = format_assessment_sms(fse)
+        self.assertEqual(format_assessment_sms(fse), message)
+        fse.owner_name = "Kofi"
+        self.assertIn("Dear Kofi,", format_assessment_sms(fse))
+        self.assertEqual(cache.messages.stats()["hits"], 1)
+
+        try:
+            register_template("en", "Hello {owner_name}: {star_rating} stars.")
+            self.assertEqual(len(cache.messages), 0)
+            self.assertEqual(format_assessment_sms(fse), "Hello Kofi: 4 stars.")
+        finally:
+            register_template("en", DEFAULT_TEMPLATES["en"])
+
+    def test_disabled(self):
+        """Test that a size of 0 turns caching off."""
+        cache.configure(0)
+        fse = FSE("Cafe A", "Accra", "Ama", "555-0001")
+        perform_assessment(fse, SCORES)
+        perform_assessment(fse, SCORES)
+        format_assessment_sms(fse)
+        self.assertEqual(cache.stats()["assessments"]["size"], 0)
+        self.assertEqual(cache.stats()["messages"]["hits"] + cache.stats()["messages"]["misses"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,152 @@
+import json
+import os
+import tempfile
+import unittest
+
+from fse_rating_system.bulk import run_batch
+from fse_rating_system.checkpoint import Checkpoint, checkpoint_job, claim_files, load_aggregates, run_checkpointed
+from fse_rating_system.digests import DigestOutbox
+from fse_rating_system.index import AssessmentIndex
+from fse_rating_system.schema import DEFAULT_SCHEMA
+from fse_rating_system.storage import AssessmentStore
+
+PART_NAMES = DEFAULT_SCHEMA.part_names
+
+
+class CrashingCheckpoint(Checkpoint):
+    """Checkpoint that fails before committing its ``crash_at``-th save."""
+
+    def __init__(self, path, crash_at):
+        super().__init__(path)
+        self.crash_at = crash_at
+        self.saves = 0
+
+    def save(self, *args, **kwargs):
+        self.saves += 1
+        if self.saves == self.crash_at:
+            raise KeyboardInterrupt("simulated crash")
+        super().save(*args, **kwargs)
+
+
+class TestCheckpointedRun(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.in_path = self.path("inspections.jsonl")
+        with open(self.in_path, "w", encoding="utf-8") as f:
+            for i in range(25):
+                scores = dict(zip(PART_NAMES, (20, 20, 20, 10, 20, i % 11)))
+                if i == 7:
+                    scores[PART_NAMES[0]] = 99 # invalid
+                record = {"name": f"Cafe {i}", "location": ("Accra", "Tema")[i % 2], "owner_name": "Ama",
+                          "owner_contact": f"555-{i % 4:04d}", "scores": scores,
+                          "background_info": {"Date of Assessment": f"2024-0{i % 9 + 1}-01"}}
+                f.write(json.dumps(record) + "\n")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def read_lines(self, path):
+        with open(path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f]
+
+    def run_job(self, checkpoint, out_path, shard=None):
+        """Runs the job like the CLI does: check, claim and restore first, then open the index, store and outbox."""
+        job = checkpoint_job(self.in_path, out_path, shard=shard)
+        checkpoint.check_job(job)
+        if not checkpoint.complete:
+            claim_files(job, [out_path, self.path("db.sqlite"), self.path("index.jsonl"),
+                              self.path("outbox.jsonl")])
+            checkpoint.restore()
+        with AssessmentStore(self.path("db.sqlite")) as store, \
+                AssessmentIndex(self.path("index.jsonl")) as index, \
+                DigestOutbox(self.path("outbox.jsonl"), append=bool(checkpoint.state)) as outbox:
+            return run_checkpointed(self.in_path, out_path, checkpoint, every=10, store=store, index=index,
+                                    outbox=outbox, shard=shard)
+
+    def test_resume_after_crash_is_idempotent(self):
+        """Test that a crashed run resumes from its checkpoint without duplicating any output."""
+        expected_path = self.path("expected.jsonl")
+        run_batch(self.in_path, expected_path)
+
+        out_path = self.path("results.jsonl")
+        checkpoint_path = self.path("run.ckpt")
+        # Crash after the first segment is committed, while the second one is being committed.
+        with self.assertRaises(KeyboardInterrupt):
+            self.run_job(CrashingCheckpoint(checkpoint_path, crash_at=3), out_path)
+        checkpoint = Checkpoint(checkpoint_path)
+        self.assertEqual(checkpoint.offset, 10)
+        self.assertGreater(len(self.read_lines(out_path)), 10) # Second segment written but not committed
+
+        totals = self.run_job(Checkpoint(checkpoint_path), out_path)
+
+        self.assertEqual(self.read_lines(out_path), self.read_lines(expected_path))
+        self.assertEqual(totals, {"records": 25, "written": 25, "errors": 1, "duplicates": 0})
+        self.assertEqual(len(self.read_lines(self.path("index.jsonl"))), 24)
+        with AssessmentStore(self.path("db.sqlite")) as store:
+            self.assertEqual(store.count(), 24)
+        outbox = self.read_lines(self.path("outbox.jsonl"))
+        self.assertEqual(sum(message["establishments"] for message in outbox), 24)
+
+        aggregates = Checkpoint(checkpoint_path).aggregates()
+        self.assertEqual(sum(aggregates.star_distribution().values()), 24)
+
+        # A completed job is not run again and leaves no files marked as in use.
+        self.assertEqual(self.run_job(Checkpoint(checkpoint_path), out_path), totals)
+        self.assertEqual(len(self.read_lines(out_path)), 25)
+        self.assertEqual([name for name in os.listdir(self.tmp.name) if name.endswith(".owner")], [])
+        job = checkpoint_job(self.in_path, out_path)
+        claim_files(job, [out_path])
+        run_checkpointed(self.in_path, out_path, Checkpoint(checkpoint_path))
+        self.assertFalse(os.path.exists(out_path + ".owner"))
+
+    def test_shards(self):
+        """Test that shards split the input and their aggregates combine."""
+        paths = []
+        written = []
+        for shard in range(3):
+            checkpoint_path = self.path(f"shard{shard}.ckpt")
+            out_path = self.path(f"shard{shard}.jsonl")
+            run_checkpointed(self.in_path, out_path, Checkpoint(checkpoint_path), every=4, shard=(shard, 3))
+            paths.append(checkpoint_path)
+            written.extend(result["name"] for result in self.read_lines(out_path))
+        self.assertEqual(sorted(written), sorted(f"Cafe {i}" for i in range(25)))
+
+        combined = load_aggregates(paths)
+        self.assertEqual(sum(combined.star_distribution().values()), 24)
+        self.assertEqual(combined.star_distribution("Accra")[5] + combined.star_distribution("Tema")[5],
+                         combined.star_distribution()[5])
+
+    def test_shards_cannot_share_files(self):
+        """Test that a shard cannot write to the database and index of another unfinished shard."""
+        with self.assertRaises(KeyboardInterrupt):
+            self.run_job(CrashingCheckpoint(self.path("shard0.ckpt"), crash_at=3), self.path("shard0.jsonl"),
+                         shard=(0, 2))
+        with AssessmentStore(self.path("db.sqlite")) as store:
+            rows = store.count()
+        with self.assertRaises(ValueError):
+            self.run_job(Checkpoint(self.path("shard1.ckpt")), self.path("shard1.jsonl"), shard=(1, 2))
+        with AssessmentStore(self.path("db.sqlite")) as store:
+            self.assertEqual(store.count(), rows) # Nothing rolled back
+
+        # Once shard 0 has completed, its files are released.
+        self.run_job(Checkpoint(self.path("shard0.ckpt")), self.path("shard0.jsonl"), shard=(0, 2))
+        self.run_job(Checkpoint(self.path("shard1.ckpt")), self.path("shard1.jsonl"), shard=(1, 2))
+        with AssessmentStore(self.path("db.sqlite")) as store:
+            self.assertEqual(store.count(), 24)
+        self.assertFalse(os.path.exists(self.path("db.sqlite.owner")))
+
+    def test_different_job(self):
+        """Test that a checkpoint is not reused for a different input or shard."""
+        checkpoint_path = self.path("run.ckpt")
+        run_checkpointed(self.in_path, self.path("results.jsonl"), Checkpoint(checkpoint_path), every=10)
+        with self.assertRaises(ValueError):
+            run_checkpointed(self.in_path, self.path("results.jsonl"), Checkpoint(checkpoint_path),
+                             shard=(0, 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import pickle
+import unittest
+
+from fse_rating_system.models import AssessmentChecklist, CompactChecklist, CompactFSE
+from fse_rating_system.assessment import perform_assessment
+
+
+class TestCompactChecklist(unittest.TestCase):
+
+    def setUp(self):
+        self.checklist = CompactChecklist()
+
+    def test_parts_view_matches_checklist(self):
+        """Test that the parts view has the same shape as AssessmentChecklist.parts."""
+        self.assertEqual(self.checklist.parts, AssessmentChecklist().parts)
+
+    def test_set_score(self):
+        """Test valid and invalid scores."""
+        self.assertTrue(self.checklist.set_score("Part 2: Documentations", 15))
+        self.assertFalse(self.checklist.set_score("Part 2: Documentations", 25))
+        self.assertFalse(self.checklist.set_score("Invalid Part Name", 10))
+        self.assertEqual(self.checklist.parts["Part 2: Documentations"]["score"], 15)
+        self.assertEqual(self.checklist.get_total_score(), 15)
+        self.assertEqual(self.checklist.get_max_total_score(), 100)
+
+    def test_no_instance_dict(self):
+        """Test that compact instances do not carry a __dict__."""
+        self.assertFalse(hasattr(self.checklist, "__dict__"))
+
+
+class TestCompactFSE(unittest.TestCase):
+
+    def test_perform_assessment(self):
+        """Test that perform_assessment works on a CompactFSE."""
+        fse = CompactFSE("Cafe", "Accra", "Ama", "555-0001")
+        self.assertEqual(fse.assessment_scores, {})
+        scores = {
+            "Part 2: Documentations": 18,
+            "Part 3: Personal Hygiene of Food handlers": 20,
+            "Part 4: Material sourcing": 15,
+            "Part 5: Water Sources and Storage": 7,
+            "Part 6: Waste Disposal": 18,
+            "Part 7: Cleaning": 9,
+        }
+        self.assertEqual(perform_assessment(fse, scores), (87, 4))
+        self.assertEqual(fse.assessment_scores, scores)
+        self.assertEqual(len(fse.scores), 6)
+
+    def test_pickle_round_trip(self):
+        """Test that compact FSEs can be sent to worker processes."""
+        fse = CompactFSE("Cafe", "Accra", "Ama", "555-0001")
+        fse.assessment_scores = {"Part 7: Cleaning": 9}
+        copy = pickle.loads(pickle.dumps(fse))
+        self.assertEqual(copy.assessment_scores, fse.assessment_scores)
+        self.assertEqual(copy.name, "Cafe")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import json
+import os
+import tempfile
+import unittest
+
+from fse_rating_system.bulk import run_batch
+from fse_rating_system.digests import DigestOutbox, normalize_phone
+from fse_rating_system.dispatch import messages_from_results
+from fse_rating_system.schema import DEFAULT_SCHEMA
+
+PART_NAMES = DEFAULT_SCHEMA.part_names
+SCORES = (18, 20, 15, 7, 18, 9)
+
+
+class TestNormalizePhone(unittest.TestCase):
+
+    def test_formats_map_to_one_number(self):
+        """Test that spacing, punctuation and prefixes do not split a recipient."""
+        self.assertEqual(normalize_phone("+233 (24) 123-4567"), "+233241234567")
+        self.assertEqual(normalize_phone("00233 24 123 4567"), "+233241234567")
+        self.assertEqual(normalize_phone("024 123 4567", country_code="233"), "+233241234567")
+        self.assertEqual(normalize_phone("555-0001"), "5550001")
+        self.assertEqual(normalize_phone(" - "), "")
+        self.assertEqual(normalize_phone(None), "")
+
+
+class TestDigestOutbox(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.in_path = os.path.join(self.tmp.name, "inspections.jsonl")
+        self.out_path = os.path.join(self.tmp.name, "results.jsonl")
+        self.outbox_path = os.path.join(self.tmp.name, "outbox.jsonl")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write_records(self, records):
+        with open(self.in_path, "w", encoding="utf-8") as f:
+            for name, contact, date in records:
+                record = {"name": name, "location": "Accra", "owner_name": "Ama", "owner_contact": contact,
+                          "scores": dict(zip(PART_NAMES, SCORES)),
+                          "background_info": {"Date of Assessment": date}}
+                f.write(json.dumps(record) + "\n")
+
+    def read_outbox(self):
+        with open(self.outbox_path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f]
+
+    def test_one_message_per_recipient(self):
+        """Test that results are grouped per normalized phone and deduplicated per establishment."""
+        self.write_records([
+            ("Cafe A", "024 123 4567", "2024-07-01"),
+            ("Cafe B", "+233-24-123-4567", "2024-07-01"),
+            ("Cafe A", "0241234567", "2024-07-02"),
+            ("Bar C", "555-0003", "2024-07-01"),
+            ("Bar D", "", "2024-07-01"),
+        ])
+        with DigestOutbox(self.outbox_path, country_code="233") as outbox:
+            self.assertEqual(run_batch(self.in_path, self.out_path, outbox=outbox), 5)
+
+        messages = self.read_outbox()
+        self.assertEqual([m["to"] for m in messages], ["+233241234567", "5550003"])
+        digest, single = messages
+        self.assertEqual(digest["establishments"], 2)
+        self.assertEqual(digest["message"].count("- 'Cafe A'"), 1)
+        self.assertIn("- 'Cafe B' (Accra): 87/100, 4 Star(s)", digest["message"])
+        self.assertTrue(digest["message"].startswith("Dear Ama,"))
+        self.assertIn("'Bar C'", single["message"])
+        self.assertEqual(outbox.stats["duplicates"], 1)
+        self.assertEqual(outbox.stats["skipped"], 1)
+
+        # The outbox feeds the dispatcher directly.
+        sent = list(messages_from_results(messages))
+        self.assertEqual(sent[0], {"to": "+233241234567", "message": digest["message"]})
+
+    def test_window_and_max_items(self):
+        """Test that a window flushes early and long digests are split."""
+        self.write_records([(f"Cafe {i}", "555-0001", "2024-07-01") for i in range(5)])
+        with DigestOutbox(self.outbox_path, window=3, max_items=2) as outbox:
+            run_batch(self.in_path, self.out_path, outbox=outbox)
+
+        messages = self.read_outbox()
+        self.assertEqual([m["establishments"] for m in messages], [2, 1, 2])
+        self.assertEqual(outbox.stats["messages"], 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+import asyncio
+import json
+import os
+import tempfile
+import time
+import unittest
+
+from fse_rating_system.dispatch import (FakeGateway, HttpGatewayTransport, SmsDispatcher, TokenBucket,
+                                        Transport, TransportError, dispatch_messages)
+
+
+class RecordingTransport(Transport):
+    """In-process transport that records batches and can fail on demand."""
+
+    def __init__(self, fail_first=0, always_fail=False, error=TransportError("gateway down")):
+        self.fail_first = fail_first
+        self.always_fail = always_fail
+        self.error = error
+        self.calls = 0
+        self.batches = []
+
+    async def send_batch(self, messages):
+        self.calls += 1
+        if self.always_fail or self.calls <= self.fail_first:
+            raise self.error
+        self.batches.append(list(messages))
+
+
+def make_messages(count):
+    return [{"to": f"555-{i:04d}", "message": f"Message {i}"} for i in range(count)]
+
+
+class TestSmsDispatcher(unittest.TestCase):
+
+    def test_batches_all_messages(self):
+        """Test that every message is delivered, in batches of at most batch_size."""
+        transport = RecordingTransport()
+        stats = asyncio.run(dispatch_messages(make_messages(23), transport, concurrency=1,
+                                              rate=1000, batch_size=10))
+        self.assertEqual(stats["sent"], 23)
+        delivered = [m for batch in transport.batches for m in batch]
+        self.assertEqual(sorted(m["to"] for m in delivered), [f"555-{i:04d}" for i in range(23)])
+        self.assertTrue(all(len(batch) <= 10 for batch in transport.batches))
+
+    def test_retries_then_succeeds(self):
+        """Test that failed batches are retried with backoff."""
+        transport = RecordingTransport(fail_first=2)
+        stats = asyncio.run(dispatch_messages(make_messages(3), transport, concurrency=1, rate=1000,
+                                              batch_size=10, base_delay=0.001))
+        self.assertEqual(stats["sent"], 3)
+        self.assertEqual(stats["retries"], 2)
+
+    def test_dead_letter(self):
+        """Test that messages are written to the dead-letter file once retries run out."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "dead.jsonl")
+            stats = asyncio.run(dispatch_messages(make_messages(4), RecordingTransport(always_fail=True),
+                                                  rate=1000, max_retries=1, base_delay=0.001,
+                                                  dead_letter_path=path))
+            self.assertEqual(stats["dead_lettered"], 4)
+            with open(path, encoding="utf-8") as f:
+                dead = [json.loads(line) for line in f]
+        self.assertEqual(len(dead), 4)
+        self.assertEqual(dead[0]["error"], "gateway down")
+
+    def test_unwritable_dead_letter_file(self):
+        """Test that a dead-letter file that cannot be written loses the messages without hanging the dispatcher."""
+        async def run():
+            dispatcher = SmsDispatcher(RecordingTransport(always_fail=True), concurrency=2, rate=1000, batch_size=2,
+                                       max_retries=0, dead_letter_path="/nonexistent/dir/dead.jsonl")
+            async with dispatcher:
+                for message in make_messages(6):
+                    await dispatcher.submit(message["to"], message["message"])
+            return dispatcher
+        dispatcher = asyncio.run(asyncio.wait_for(run(), 5))
+        self.assertEqual((dispatcher.stats["dead_lettered"], dispatcher.stats["lost"]), (6, 6))
+        self.assertIn("dead-letter file", dispatcher.errors[0])
+
+    def test_unexpected_transport_errors(self):
+        """Test that any exception from the transport is retried and dead-lettered without hanging the dispatcher."""
+        transport = RecordingTransport(fail_first=1, error=KeyError("to"))
+        stats = asyncio.run(dispatch_messages(make_messages(3), transport, concurrency=1, rate=1000,
+                                              batch_size=10, base_delay=0.001))
+        self.assertEqual((stats["sent"], stats["retries"]), (3, 1))
+
+        transport = RecordingTransport(always_fail=True, error=RuntimeError("bug"))
+        stats = asyncio.run(asyncio.wait_for(dispatch_messages(make_messages(4), transport, rate=1000,
+                                                               max_retries=1, base_delay=0.001), 5))
+        self.assertEqual(stats["dead_lettered"], 4)
+
+    def test_token_bucket_limits_rate(self):
+        """Test that the token bucket spaces out acquisitions beyond its capacity."""
+        async def run():
+            bucket = TokenBucket(rate=100, capacity=5)
+            start = time.monotonic()
+            for _ in range(15):
+                await bucket.acquire()
+            return time.monotonic() - start
+        # 5 tokens are available at once; the other 10 take about 0.1s at 100/s.
+        self.assertGreaterEqual(asyncio.run(run()), 0.08)
+
+
+class TestHttpGateway(unittest.TestCase):
+
+    def test_http_transport_against_fake_gateway(self):
+        """Test end-to-end delivery over HTTP, including a retry after a 503."""
+        async def run():
+            async with FakeGateway(fail_first=1) as gateway:
+                stats = await dispatch_messages(make_messages(5), HttpGatewayTransport(gateway.url),
+                                                rate=1000, base_delay=0.001)
+                return stats, gateway.received
+        stats, received = asyncio.run(run())
+        self.assertEqual(stats["sent"], 5)
+        self.assertEqual(stats["retries"], 1)
+        self.assertEqual(len(received), 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import json
+import os
+import tempfile
+import unittest
+
+from fse_rating_system.models import FSE, CompactFSE, establishment_key
+from fse_rating_system.assessment import perform_assessment
+from fse_rating_system.bulk import run_batch
+from fse_rating_system.index import AssessmentIndex
+from fse_rating_system.schema import DEFAULT_SCHEMA
+
+PART_NAMES = DEFAULT_SCHEMA.part_names
+
+
+class TestEstablishmentKey(unittest.TestCase):
+
+    def test_normalized_name_and_location(self):
+        """Test that case and spacing differences map to the same key."""
+        self.assertEqual(establishment_key("Cafe  A ", "accra"), establishment_key("cafe a", "Accra"))
+        self.assertNotEqual(establishment_key("Cafe A", "Accra"), establishment_key("Cafe A", "Tema"))
+
+    def test_explicit_id(self):
+        """Test that an explicit ID takes precedence over name and location."""
+        fse = FSE("Cafe A", "Accra", "Ama", "555-0001", fse_id="LIC-42")
+        renamed = CompactFSE("Cafe A (new name)", "Accra", "Ama", "555-0001", fse_id="LIC-42")
+        self.assertEqual(fse.key, renamed.key)
+
+
+class TestAssessmentIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "index.jsonl")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def assess(self, index, date, scores):
+        fse = FSE("Cafe A", "Accra", "Ama", "555-0001")
+        perform_assessment(fse, dict(zip(PART_NAMES, scores)), quiet=True)
+        return index.add_fse(fse, {"Date of Assessment": date})
+
+    def test_latest_and_history(self):
+        """Test that the latest assessment is found by date and history is kept."""
+        with AssessmentIndex(self.path) as index:
+            self.assess(index, "2024-03-01", (10, 10, 10, 5, 10, 5))
+            self.assess(index, "2024-09-01", (20, 20, 20, 10, 20, 10))
+            self.assess(index, "2024-06-01", (18, 16, 14, 2, 18, 9))
+        key = establishment_key("Cafe A", "Accra")
+
+        reopened = AssessmentIndex(self.path)
+        self.assertEqual(len(reopened.history(key)), 3)
+        self.assertEqual(reopened.latest(key)["assessment_date"], "2024-09-01")
+        self.assertEqual(reopened.current_rating(key), 5)
+        self.assertIsNone(reopened.current_rating("unknown|nowhere"))
+        self.assertTrue(reopened.is_duplicate(key, "2024-06-01", (18, 16, 14, 2, 18, 9)))
+        reopened.close()
+
+    def test_bulk_skips_duplicates(self):
+        """Test that duplicate submissions are skipped within and across loads."""
+        in_path = os.path.join(self.tmp.name, "inspections.jsonl")
+        out_path = os.path.join(self.tmp.name, "results.jsonl")
+        record = {"name": "Cafe A", "location": "Accra", "owner_name": "Ama", "owner_contact": "555-0001",
+                  "background_info": {"Date of Assessment": "2024-07-01"},
+                  "scores": dict(zip(PART_NAMES, [18, 20, 15, 7, 18, 9]))}
+        reinspection = {**record, "name": "CAFE A", "background_info": {"Date of Assessment": "2024-08-01"}}
+        with open(in_path, "w", encoding="utf-8") as f:
+            for r in (record, record, reinspection):
+                f.write(json.dumps(r) + "\n")
+
+        with AssessmentIndex(self.path) as index:
+            self.assertEqual(run_batch(in_path, out_path, index=index), 2)
+            self.assertEqual(index.duplicates, 1)
+        with AssessmentIndex(self.path) as index:
+            self.assertEqual(run_batch(in_path, out_path, index=index), 0)
+            self.assertEqual(index.duplicates, 3)
+            latest = index.latest(establishment_key("Cafe A", "Accra"))
+            self.assertEqual(latest["assessment_date"], "2024-08-01")
+            self.assertEqual(latest["total_score"], 87)
+
+
+if __name__ == '__main__':
+    unittest.main()
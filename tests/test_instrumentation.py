@@ -0,0 +1,70 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+from fse_rating_system import instrumentation
+from fse_rating_system.models import FSE
+from fse_rating_system.assessment import perform_assessment
+from fse_rating_system.notifications import format_assessment_sms, send_sms
+
+SCORES = {"Part 2: Documentations": 18, "Part 7: Cleaning": 9}
+
+
+class TestInstrumentation(unittest.TestCase):
+
+    def setUp(self):
+        instrumentation.reset()
+
+    def tearDown(self):
+        instrumentation.disable()
+        instrumentation.reset()
+
+    def run_pipeline(self):
+        fse = FSE("Cafe", "Accra", "Ama", "555-0001")
+        perform_assessment(fse, SCORES)
+        with contextlib.redirect_stdout(io.StringIO()):
+            send_sms(fse.owner_contact, format_assessment_sms(fse))
+
+    def test_disabled_by_default(self):
+        """Test that nothing is recorded while instrumentation is disabled."""
+        self.run_pipeline()
+        self.assertEqual(instrumentation.export_json()["functions"], {})
+
+    def test_records_calls_when_enabled(self):
+        """Test that enabled instrumentation records every instrumented call."""
+        instrumentation.enable()
+        self.run_pipeline()
+        self.run_pipeline()
+        functions = instrumentation.export_json()["functions"]
+        self.assertEqual(sorted(functions), ["format_assessment_sms", "perform_assessment", "send_sms"])
+        self.assertEqual(functions["perform_assessment"]["calls"], 2)
+        self.assertEqual(sum(functions["send_sms"]["buckets"].values()), 2)
+
+    def test_prometheus_export(self):
+        """Test the Prometheus text format."""
+        instrumentation.enable()
+        self.run_pipeline()
+        text = instrumentation.export_prometheus()
+        self.assertIn("# TYPE fse_call_duration_seconds histogram", text)
+        self.assertIn('fse_call_duration_seconds_bucket{function="perform_assessment",le="+Inf"} 1', text)
+        self.assertIn('fse_call_duration_seconds_count{function="send_sms"} 1', text)
+        self.assertIn("fse_validation_invalid_records_total", text)
+
+    def test_profiled_writes_report(self):
+        """Test that profiled() writes a CPU, memory and metrics report."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "profile.txt")
+            with instrumentation.profiled(path):
+                self.run_pipeline()
+            with open(path, encoding="utf-8") as f:
+                report = f.read()
+        self.assertIn("CPU profile", report)
+        self.assertIn("Memory (tracemalloc)", report)
+        self.assertIn('"perform_assessment"', report)
+        self.assertFalse(instrumentation.is_enabled())
+
+
+if __name__ == '__main__':
+    unittest.main()
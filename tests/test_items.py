@@ -0,0 +1,137 @@
+import json
+import os
+import pickle
+import tempfile
+import unittest
+
+from fse_rating_system.models import FSE, AssessmentChecklist
+from fse_rating_system.assessment import perform_assessment
+from fse_rating_system.bulk import run_batch
+from fse_rating_system.index import AssessmentIndex
+from fse_rating_system.items import ItemScores
+from fse_rating_system.schema import schema_from_dict
+from fse_rating_system.validation import ERROR_INVALID_ITEM, validate_scores
+
+HYGIENE = "Part 3: Personal Hygiene of Food handlers"
+CLEANING = "Part 7: Cleaning"
+
+ITEMIZED = schema_from_dict({
+    "name": "itemized",
+    "version": "1",
+    "parts": [
+        {"name": "Part 2: Documentations", "max_score": 20},
+        {"name": HYGIENE, "max_score": 20, "items": [
+            {"name": "Clean uniforms", "max_score": 2, "weight": 2},
+            {"name": "Hair covered"},
+            {"name": "Hand washing station"},
+        ]},
+        {"name": CLEANING, "max_score": 10, "items": [{"name": f"Area {i}"} for i in range(4)]},
+    ],
+})
+
+
+class TestItemScores(unittest.TestCase):
+
+    def part_score(self, items, part_name=HYGIENE):
+        return ItemScores.from_dict({part_name: items}, ITEMIZED).part_scores()[part_name]
+
+    def test_compiled_weight_vectors(self):
+        """Test that items are compiled into flat vectors on a common denominator per part."""
+        self.assertEqual(ITEMIZED.itemized_parts, (1, 2))
+        self.assertEqual(ITEMIZED.item_keys[0], (HYGIENE, "Clean uniforms"))
+        self.assertEqual(ITEMIZED.item_factors[:3], (2, 2, 2))
+        self.assertEqual(ITEMIZED.part_item_weights, (0, 4, 4))
+        self.assertEqual(pickle.loads(pickle.dumps(ITEMIZED)), ITEMIZED)
+
+    def test_weighted_part_scores(self):
+        """Test weighted part scores, rounding half up, with unrecorded items scoring 0."""
+        self.assertEqual(self.part_score({"Clean uniforms": 2, "Hair covered": 1}), 15)
+        self.assertEqual(self.part_score({"Clean uniforms": 1}), 5)
+        self.assertEqual(self.part_score({}), 0)
+        self.assertEqual(self.part_score({"Area 0": 1}, CLEANING), 3) # 2.5 rounds up
+
+    def test_not_applicable_renormalizes(self):
+        """Test that not-applicable items are left out and the part keeps its maximum."""
+        self.assertEqual(self.part_score({"Clean uniforms": 1, "Hair covered": None, "Hand washing station": 1}), 13)
+        self.assertEqual(self.part_score({"Clean uniforms": 2, "Hair covered": None, "Hand washing station": 1}), 20)
+        self.assertEqual(self.part_score({name: None for name in ("Clean uniforms", "Hair covered",
+                                                                   "Hand washing station")}), 20)
+
+    def test_sparse_storage(self):
+        """Test that only recorded items are stored and re-scoring an item replaces it."""
+        items = ItemScores(ITEMIZED)
+        self.assertTrue(items.set_score(HYGIENE, "Clean uniforms", 1))
+        self.assertTrue(items.set_score(HYGIENE, "Clean uniforms", 2))
+        self.assertTrue(items.set_not_applicable(HYGIENE, "Hair covered"))
+        self.assertTrue(items.set_score(HYGIENE, "Hair covered", 0))
+        self.assertEqual(len(items), 1)
+        self.assertEqual(items.to_dict(), {HYGIENE: {"Clean uniforms": 2}})
+        self.assertFalse(items.set_score(HYGIENE, "Clean uniforms", 3, verbose=False))
+        self.assertFalse(items.set_score(HYGIENE, "Unknown", 1, verbose=False))
+
+        checklist = AssessmentChecklist(ITEMIZED)
+        checklist.set_item_scores(items)
+        self.assertEqual(checklist.parts[HYGIENE]["score"], 10)
+
+    def test_perform_assessment_with_items(self):
+        """Test that item scores can be mixed with part scores and are validated."""
+        fse = FSE("Cafe A", "Accra", "Ama", "555-0001")
+        scores = {"Part 2: Documentations": 20,
+                  HYGIENE: {"Clean uniforms": 2, "Hair covered": 1, "Hand washing station": None},
+                  CLEANING: {"Area 0": 1, "Area 1": 1, "Area 2": 1, "Area 3": 1}}
+        self.assertEqual(perform_assessment(fse, scores, schema=ITEMIZED, quiet=True), (50, 5))
+        self.assertEqual(fse.assessment_scores[HYGIENE], 20)
+        self.assertTrue(validate_scores(scores, ITEMIZED).ok)
+
+        bad = {HYGIENE: {"Clean uniforms": 5}, "Part 2: Documentations": {"Anything": 1}}
+        self.assertEqual(perform_assessment(fse, bad, schema=ITEMIZED, quiet=True), (None, None))
+        self.assertEqual(validate_scores(bad, ITEMIZED).errors, ((ERROR_INVALID_ITEM, 1), (ERROR_INVALID_ITEM, 0)))
+
+    def test_invalid_items(self):
+        """Test that invalid item definitions are rejected with ValueError."""
+        invalid = [
+            [{"name": "A"}, {"name": "A"}],
+            [{"name": "A", "weight": 0}],
+            [{"name": "A", "max_score": 256}],
+            [{"max_score": 1}],
+        ]
+        for items in invalid:
+            with self.assertRaises(ValueError, msg=items):
+                schema_from_dict({"parts": [{"name": "P", "max_score": 10, "items": items}]})
+
+    def test_bulk_items(self):
+        """Test that the bulk pipeline accepts item scores in JSON Lines input."""
+        with tempfile.TemporaryDirectory() as tmp:
+            in_path = os.path.join(tmp, "inspections.jsonl")
+            out_path = os.path.join(tmp, "results.jsonl")
+            record = {"name": "Cafe A", "location": "Accra", "owner_name": "Ama", "owner_contact": "555-0001",
+                      "scores": {"Part 2: Documentations": 10, HYGIENE: {"Clean uniforms": 2},
+                                 CLEANING: {"Area 0": 1, "Area 1": 1}}}
+            with open(in_path, "w", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+            run_batch(in_path, out_path, schema=ITEMIZED)
+            with open(out_path, encoding="utf-8") as f:
+                result = json.loads(f.readline())
+        self.assertEqual(result["assessment_scores"], {"Part 2: Documentations": 10, HYGIENE: 10, CLEANING: 5})
+        self.assertEqual(result["total_score"], 25)
+
+    def test_bulk_items_with_index(self):
+        """Test that item-scored records are fingerprinted by their part scores for duplicate skipping."""
+        with tempfile.TemporaryDirectory() as tmp:
+            in_path = os.path.join(tmp, "inspections.jsonl")
+            out_path = os.path.join(tmp, "results.jsonl")
+            record = {"name": "Cafe A", "location": "Accra",
+                      "scores": {"Part 2: Documentations": 10, HYGIENE: {"Clean uniforms": 2},
+                                 CLEANING: {"Area 0": 1, "Area 1": 1}}}
+            same_scores = {**record, "scores": {**record["scores"], CLEANING: {"Area 2": 1, "Area 3": 1}}}
+            with open(in_path, "w", encoding="utf-8") as f:
+                for item in (record, record, same_scores):
+                    f.write(json.dumps(item) + "\n")
+            index = AssessmentIndex(schema=ITEMIZED)
+            self.assertEqual(run_batch(in_path, out_path, schema=ITEMIZED, index=index), 1)
+        self.assertEqual(index.duplicates, 2)
+        self.assertEqual(index.latest("cafe a|accra")["scores"], [10, 10, 5])
+
+
+if __name__ == "__main__":
+    unittest.main()
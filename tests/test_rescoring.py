@@ -0,0 +1,104 @@
+import os
+import tempfile
+import unittest
+
+from fse_rating_system.schema import DEFAULT_PARTS, DEFAULT_SCHEMA, ChecklistSchema
+from fse_rating_system.storage import AssessmentStore
+from fse_rating_system.rescoring import change_notifications, changed_total_ranges, rescore
+
+
+def make_result(name, scores):
+    scores = dict(zip(DEFAULT_SCHEMA.part_names, scores))
+    total = sum(scores.values())
+    return {
+        "name": name, "location": "Accra", "owner_name": "Owner", "owner_contact": "555-0000",
+        "assessment_date": "2024-07-01", "assessment_scores": scores,
+        "total_score": total, "star_rating": DEFAULT_SCHEMA.star_rating(total),
+    }
+
+
+class TestRescoring(unittest.TestCase):
+
+    def setUp(self):
+        self.store = AssessmentStore()
+        self.store.add_results([
+            make_result("Cafe 85", (17, 17, 17, 8, 17, 9)),     # 85 -> 4 stars
+            make_result("Cafe 88", (18, 18, 18, 8, 18, 8)),     # 88 -> 4 stars
+            make_result("Cafe 92", (19, 19, 19, 9, 18, 8)),     # 92 -> 5 stars
+            make_result("Cafe 55", (11, 11, 11, 6, 11, 5)),     # 55 -> 1 star
+        ])
+
+    def tearDown(self):
+        self.store.close()
+
+    def ratings(self):
+        return {row["establishment"]: row["star_rating"] for row in self.store.query()}
+
+    def test_changed_total_ranges(self):
+        """Test that only the totals between old and new thresholds are reported."""
+        stricter = ChecklistSchema(DEFAULT_PARTS, ((95, 5), (87, 4), (70, 3), (60, 2), (0, 1)), version="2")
+        self.assertEqual(changed_total_ranges(DEFAULT_SCHEMA, stricter),
+                         [(80, 86, 4, 3), (90, 94, 5, 4)])
+
+    def test_band_change_updates_only_affected_rows(self):
+        """Test re-scoring after the star bands change."""
+        stricter = ChecklistSchema(DEFAULT_PARTS, ((95, 5), (87, 4), (70, 3), (60, 2), (0, 1)), version="2")
+        changed, invalid = rescore(self.store, DEFAULT_SCHEMA, stricter)
+
+        self.assertEqual(invalid, [])
+        self.assertEqual(sorted((c["establishment"], c["old_star_rating"], c["star_rating"]) for c in changed),
+                         [("Cafe 85", 4, 3), ("Cafe 92", 5, 4)])
+        self.assertEqual(self.ratings(), {"Cafe 85": 3, "Cafe 88": 4, "Cafe 92": 4, "Cafe 55": 1})
+        self.assertEqual({row["schema_version"] for row in self.store.query()}, {"2"})
+
+        messages = list(change_notifications(changed, stricter))
+        self.assertEqual(len(messages), 2)
+        self.assertIn("Star Rating: 3 Star(s).", messages[0]["sms"] + messages[1]["sms"])
+
+    def test_max_score_change_flags_invalid_rows(self):
+        """Test that rows above a lowered part maximum are reported, not re-scored."""
+        parts = dict(DEFAULT_PARTS, **{"Part 2: Documentations": 18})  # max total 98
+        lowered = ChecklistSchema(parts, version="2")
+        changed, invalid = rescore(self.store, DEFAULT_SCHEMA, lowered)
+
+        invalid_names = {row["establishment"] for row in self.store.query() if row["id"] in invalid}
+        self.assertEqual(invalid_names, {"Cafe 92"})
+        # 88/98 is below 90% -> still 4 stars; 85/98 is 86.7% -> still 4 stars.
+        self.assertEqual(changed, [])
+        self.assertEqual(self.store.query(establishment="Cafe 92")[0]["schema_version"], "1")
+
+    def test_part_change_recomputes_totals(self):
+        """Test re-scoring when a part is removed from the checklist."""
+        parts = {name: max_score for name, max_score in DEFAULT_PARTS.items() if name != "Part 7: Cleaning"}
+        reduced = ChecklistSchema(parts, version="2")  # max total 90
+        changed, invalid = rescore(self.store, DEFAULT_SCHEMA, reduced)
+
+        self.assertEqual(invalid, [])
+        row = self.store.query(establishment="Cafe 88")[0]
+        self.assertEqual(row["total_score"], 80)  # 80/90 = 88.9% -> 4 stars
+        self.assertEqual(self.ratings(), {"Cafe 85": 4, "Cafe 88": 4, "Cafe 92": 5, "Cafe 55": 1})
+
+    def test_other_checklists_untouched(self):
+        """Test that rows of another checklist with the same version are not re-scored."""
+        regional = ChecklistSchema(DEFAULT_PARTS, name="regional", version="1")
+        stricter = ChecklistSchema(DEFAULT_PARTS, ((95, 5), (87, 4), (70, 3), (60, 2), (0, 1)), version="2")
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "assessments.db")
+            with AssessmentStore(path) as store, AssessmentStore(path, regional) as regional_store:
+                store.add_results([make_result("Cafe 85", (17, 17, 17, 8, 17, 9))])
+                regional_store.add_results([make_result("Regional 85", (17, 17, 17, 8, 17, 9))])
+                changed, _ = rescore(store, DEFAULT_SCHEMA, stricter)
+                rows = {row["establishment"]: row for row in store.query()}
+        self.assertEqual([c["establishment"] for c in changed], ["Cafe 85"])
+        self.assertEqual((rows["Cafe 85"]["star_rating"], rows["Cafe 85"]["schema_version"]), (3, "2"))
+        self.assertEqual((rows["Regional 85"]["star_rating"], rows["Regional 85"]["schema_name"],
+                          rows["Regional 85"]["schema_version"]), (4, "regional", "1"))
+
+    def test_same_version_rejected(self):
+        """Test that re-scoring requires a new schema version."""
+        with self.assertRaises(ValueError):
+            rescore(self.store, DEFAULT_SCHEMA, DEFAULT_SCHEMA)
+
+
+if __name__ == '__main__':
+    unittest.main()
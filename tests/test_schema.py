@@ -0,0 +1,103 @@
+import json
+import os
+import tempfile
+import unittest
+
+from fse_rating_system.models import FSE, AssessmentChecklist
+from fse_rating_system.assessment import calculate_star_rating, perform_assessment
+from fse_rating_system.notifications import format_assessment_sms
+from fse_rating_system.schema import DEFAULT_SCHEMA, ChecklistSchema, load_schema, schema_from_dict
+
+REGIONAL = {
+    "name": "regional",
+    "version": "2",
+    "parts": [
+        {"name": "Part 2: Documentations", "max_score": 30},
+        {"name": "Part 7: Cleaning", "max_score": 20},
+    ],
+    "star_bands": [
+        {"min_percentage": 95, "stars": 5},
+        {"min_percentage": 50, "stars": 3},
+        {"min_percentage": 0, "stars": 1},
+    ],
+}
+
+
+class TestChecklistSchema(unittest.TestCase):
+
+    def test_default_schema(self):
+        """Test that the default schema matches the standard checklist."""
+        self.assertEqual(DEFAULT_SCHEMA.max_total, 100)
+        self.assertEqual(list(DEFAULT_SCHEMA.part_names), list(AssessmentChecklist().parts))
+        self.assertEqual(DEFAULT_SCHEMA.part_index["Part 7: Cleaning"], 5)
+
+    def test_immutable(self):
+        """Test that a compiled schema cannot be modified."""
+        with self.assertRaises(AttributeError):
+            DEFAULT_SCHEMA.max_total = 50
+
+    def test_invalid_schemas(self):
+        """Test that invalid schema data is rejected with ValueError."""
+        invalid = [
+            {"parts": []},
+            {"parts": [{"name": "Part 2: Documentations"}]},
+            {"parts": [{"name": "Part 2: Documentations", "max_score": 0}]},
+            {"parts": [{"name": "A", "max_score": 10}, {"name": "A", "max_score": 10}]},
+            {"parts": [{"name": "A", "max_score": 10}], "star_bands": [{"min_percentage": 50, "stars": 1}]},
+            {"parts": [{"name": "A", "max_score": 10}],
+             "star_bands": [{"min_percentage": 0, "stars": 1}, {"min_percentage": 50, "stars": 3}]},
+            {"parts": [{"name": "A", "max_score": 10}], "star_bands": [{"min_percentage": "0", "stars": 1}]},
+            {"parts": [{"name": "A", "max_score": 10}], "star_bands": [{"min_percentage": 0, "stars": 6}]},
+            {"parts": [{"name": "A", "max_score": 10}], "star_bands": [{"min_percentage": 0, "stars": 2.5}]},
+            {"parts": [{"name": "A", "max_score": 10}], "star_bands": [{"min_percentage": 0, "stars": "1"}]},
+        ]
+        for data in invalid:
+            with self.assertRaises(ValueError, msg=data):
+                schema_from_dict(data)
+
+    def test_load_json_toml_yaml(self):
+        """Test that the same schema loads from JSON, TOML and YAML files."""
+        toml_text = (
+            'name = "regional"\nversion = "2"\n'
+            '[[parts]]\nname = "Part 2: Documentations"\nmax_score = 30\n'
+            '[[parts]]\nname = "Part 7: Cleaning"\nmax_score = 20\n'
+            '[[star_bands]]\nmin_percentage = 95\nstars = 5\n'
+            '[[star_bands]]\nmin_percentage = 50\nstars = 3\n'
+            '[[star_bands]]\nmin_percentage = 0\nstars = 1\n'
+        )
+        expected = schema_from_dict(REGIONAL)
+        with tempfile.TemporaryDirectory() as tmp:
+            files = {"schema.json": json.dumps(REGIONAL), "schema.toml": toml_text}
+            try:
+                import yaml
+                files["schema.yaml"] = yaml.safe_dump(REGIONAL)
+            except ImportError:
+                pass
+            for filename, text in files.items():
+                path = os.path.join(tmp, filename)
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(text)
+                self.assertEqual(load_schema(path), expected, filename)
+
+    def test_regional_schema_in_assessment(self):
+        """Test that a custom schema drives checklists, star bands and the SMS."""
+        schema = schema_from_dict(REGIONAL)
+        self.assertEqual(AssessmentChecklist(schema).get_max_total_score(), 50)
+        self.assertEqual(calculate_star_rating(40, 50, schema), 3)
+        self.assertEqual(calculate_star_rating(48, 50, schema), 5)
+        self.assertEqual(calculate_star_rating(24, 50, schema), 1)
+
+        fse = FSE("Cafe", "Accra", "Ama", "555-0001")
+        scores = {"Part 2: Documentations": 28, "Part 7: Cleaning": 12}
+        self.assertEqual(perform_assessment(fse, scores, schema=schema), (40, 3))
+        self.assertIn("Final Score: 40/50.", format_assessment_sms(fse, schema))
+
+    def test_rating_table_matches_percentage_bands(self):
+        """Test that the precomputed table agrees with percentage banding."""
+        schema = ChecklistSchema({"A": 7, "B": 6})
+        for total in range(schema.max_total + 1):
+            self.assertEqual(schema.star_rating(total), calculate_star_rating(total, 13, DEFAULT_SCHEMA))
+
+
+if __name__ == '__main__':
+    unittest.main()
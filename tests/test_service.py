@@ -0,0 +1,149 @@
+import asyncio
+import json
+import sqlite3
+import unittest
+
+from fse_rating_system.schema import DEFAULT_SCHEMA
+from fse_rating_system.service import AssessmentService
+from fse_rating_system.storage import AssessmentStore
+
+RECORD = {
+    "name": "Cafe A", "location": "Accra", "owner_name": "Ama", "owner_contact": "555-0001",
+    "background_info": {"Date of Assessment": "2024-07-01"},
+    "scores": dict(zip(DEFAULT_SCHEMA.part_names, [18, 20, 15, 7, 18, 9])),
+}
+
+
+class FailingStore(AssessmentStore):
+    """Store that cannot save the results of the establishment named ``failing_name``."""
+    failing_name = "Cafe Bad"
+
+    def _row(self, result):
+        if result["name"] == self.failing_name:
+            raise sqlite3.IntegrityError("cannot store")
+        return super()._row(result)
+
+
+class Client:
+    """Minimal keep-alive HTTP client."""
+
+    def __init__(self, port):
+        self.port = port
+
+    async def __aenter__(self):
+        self.reader, self.writer = await asyncio.open_connection("127.0.0.1", self.port)
+        return self
+
+    async def __aexit__(self, *exc):
+        self.writer.close()
+
+    async def request(self, method, path, payload=None):
+        body = json.dumps(payload).encode() if payload is not None else b""
+        self.writer.write(f"{method} {path} HTTP/1.1\r\nHost: test\r\nContent-Length: {len(body)}\r\n\r\n".encode()
+                          + body)
+        status = int((await self.reader.readline()).split()[1])
+        headers = {}
+        while (line := await self.reader.readline()) != b"\r\n":
+            name, _, value = line.decode().partition(":")
+            headers[name.lower()] = value.strip()
+        return status, json.loads(await self.reader.readexactly(int(headers["content-length"])))
+
+
+class TestAssessmentService(unittest.TestCase):
+
+    def run_with_service(self, scenario, **options):
+        async def run():
+            async with AssessmentService(port=0, **options) as service:
+                async with Client(service.port) as client:
+                    return await scenario(service, client)
+        return asyncio.run(run())
+
+    def test_assess_duplicate_and_rating(self):
+        """Test single submissions, duplicate detection and rating lookup over one connection."""
+        async def scenario(service, client):
+            status, result = await client.request("POST", "/assess", RECORD)
+            self.assertEqual(status, 200)
+            self.assertEqual((result["total_score"], result["star_rating"]), (87, 4))
+            self.assertIn("Final Score: 87/100.", result["sms"])
+
+            status, duplicate = await client.request("POST", "/assess", RECORD)
+            self.assertTrue(duplicate["duplicate"])
+            self.assertEqual(duplicate["star_rating"], 4)
+
+            status, latest = await client.request("GET", "/rating?name=cafe%20a&location=ACCRA")
+            self.assertEqual((status, latest["total_score"]), (200, 87))
+            status, _ = await client.request("GET", "/rating?name=Cafe%20B&location=Accra")
+            self.assertEqual(status, 404)
+            self.assertEqual(service.stats["duplicates"], 1)
+        self.run_with_service(scenario)
+
+    def test_batch_and_errors(self):
+        """Test the batch endpoint, invalid records and bad requests."""
+        store = AssessmentStore()
+        async def scenario(service, client):
+            invalid = {**RECORD, "name": "Cafe B", "scores": {**RECORD["scores"], "Part 2: Documentations": 25}}
+            status, body = await client.request("POST", "/assess/batch", {"records": [RECORD, invalid]})
+            self.assertEqual(status, 200)
+            results = body["results"]
+            self.assertEqual(results[0]["star_rating"], 4)
+            self.assertEqual(results[1]["error_codes"], [[3, 0]])
+
+            status, result = await client.request("POST", "/assess", invalid)
+            self.assertEqual(status, 422)
+            status, _ = await client.request("POST", "/assess/batch", {"records": "nope"})
+            self.assertEqual(status, 400)
+            status, _ = await client.request("GET", "/assess")
+            self.assertEqual(status, 405)
+            status, _ = await client.request("GET", "/unknown")
+            self.assertEqual(status, 404)
+        self.run_with_service(scenario, store=store)
+        self.assertEqual(store.count(), 1)
+        store.close()
+
+    def test_concurrent_submissions_are_micro_batched(self):
+        """Test that concurrent requests are assessed together in one micro-batch."""
+        async def scenario(service, client):
+            records = [{**RECORD, "name": f"Cafe {i}"} for i in range(20)]
+            results = await asyncio.gather(*(service.submit(record) for record in records))
+            self.assertEqual([r["name"] for r in results], [r["name"] for r in records])
+            self.assertEqual(service.stats["batches"], 1)
+        self.run_with_service(scenario, batch_window=0.01)
+
+    def test_malformed_record_fails_alone(self):
+        """Test that a malformed record in a micro-batch fails only itself and claims nothing."""
+        async def scenario(service, client):
+            malformed = {**RECORD, "name": "Cafe B", "background_info": "x"}
+            good, bad = await asyncio.gather(service.submit(RECORD), service.submit(malformed))
+            self.assertEqual(good["total_score"], 87)
+            self.assertIn("background_info", bad["error"])
+            self.assertEqual(service.stats["batches"], 1)
+
+            status, result = await client.request("POST", "/assess", malformed)
+            self.assertEqual(status, 422)
+            status, result = await client.request("POST", "/assess", {**malformed, "background_info": {}})
+            self.assertEqual((status, result["total_score"]), (200, 87))
+            status, duplicate = await client.request("POST", "/assess", RECORD)
+            self.assertTrue(duplicate["duplicate"])
+            self.assertEqual(duplicate["total_score"], 87)
+        self.run_with_service(scenario, batch_window=0.01)
+
+    def test_store_failure_fails_only_its_record(self):
+        """Test that a result the store rejects fails only its own record and releases its claim."""
+        store = FailingStore()
+        service = AssessmentService(store=store)
+        bad = {**RECORD, "name": "Cafe Bad"}
+        good, failed = service.assess_records([RECORD, bad])
+        self.assertEqual(good["total_score"], 87)
+        self.assertIn("Could not save", failed["error"])
+        self.assertEqual([row["establishment"] for row in store.query()], ["Cafe A"])
+        self.assertIsNone(service.index.latest("cafe bad|accra"))
+
+        store.failing_name = None # The store works again
+        resubmitted, duplicate = service.assess_records([bad, RECORD])
+        self.assertEqual(resubmitted["total_score"], 87)
+        self.assertTrue(duplicate["duplicate"])
+        store.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+import fse_rating_system
+from fse_rating_system import daemon
+from fse_rating_system.schema import DEFAULT_SCHEMA
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ("sqlite3", "asyncio", "multiprocessing", "concurrent.futures", "fse_rating_system.bulk",
+                 "fse_rating_system.storage", "fse_rating_system.analytics", "fse_rating_system.dispatch")
+
+
+class TestLazyImports(unittest.TestCase):
+
+    def test_cli_import_does_not_load_heavy_modules(self):
+        """Test that importing the CLI only loads what parsing the arguments needs."""
+        code = f"import main_cli, sys; print([m for m in {HEAVY_MODULES!r} if m in sys.modules])"
+        completed = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True,
+                                   check=True)
+        self.assertEqual(completed.stdout.strip(), "[]")
+
+    def test_package_attributes_are_imported_on_access(self):
+        """Test lazy access to exported names and submodules."""
+        from fse_rating_system.assessment import perform_assessment
+        self.assertIs(fse_rating_system.perform_assessment, perform_assessment)
+        self.assertIn("AssessmentStore", dir(fse_rating_system))
+        self.assertEqual(fse_rating_system.cache.DEFAULT_MAXSIZE, fse_rating_system.cache.LRUCache().maxsize)
+        with self.assertRaises(AttributeError):
+            fse_rating_system.no_such_name
+
+
+def write_input(directory, name="input.jsonl"):
+    record = {"name": "Cafe A", "location": "Accra", "owner_name": "Ama", "owner_contact": "555-0001",
+              "scores": dict(zip(DEFAULT_SCHEMA.part_names, [18, 20, 15, 7, 18, 9]))}
+    with open(os.path.join(directory, name), "w", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
+
+
+class TestDaemon(unittest.TestCase):
+
+    def setUp(self):
+        import main_cli
+        self.runner = main_cli.run_in_daemon
+        self.tmp = tempfile.TemporaryDirectory()
+        write_input(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_run_lines(self):
+        """Test that commands from stdin run in one process and failures are reported."""
+        out = io.StringIO()
+        in_path = os.path.join(self.tmp.name, "input.jsonl")
+        lines = [f"batch --in {in_path} --out {in_path}.out\n", "\n", "# comment\n", "daemon\n"]
+        self.assertEqual(daemon.run_lines(self.runner, lines, out), 1)
+        self.assertIn("Assessed 1 records (0 invalid).", out.getvalue())
+        self.assertIn("[exit status 1] daemon", out.getvalue())
+
+    @unittest.skipUnless(hasattr(__import__("socket"), "AF_UNIX"), "Unix domain sockets are not available")
+    def test_socket(self):
+        """Test that a forwarded command runs in the client's working directory."""
+        path = os.path.join(self.tmp.name, "fse.sock")
+        server = threading.Thread(target=daemon.serve_socket, args=(self.runner, path, 1))
+        server.start()
+        for _ in range(500):
+            try:
+                status, output = daemon.send(path, ["batch", "--in", "input.jsonl", "--out", "out.jsonl"],
+                                             self.tmp.name)
+                break
+            except (FileNotFoundError, ConnectionRefusedError): # Server not listening yet
+                time.sleep(0.01)
+        server.join()
+        self.assertEqual(status, 0)
+        self.assertIn("Results written to out.jsonl", output)
+        self.assertTrue(os.path.exists(os.path.join(self.tmp.name, "out.jsonl")))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from fse_rating_system.models import FSE
+from fse_rating_system.assessment import perform_assessment
+from fse_rating_system.schema import DEFAULT_SCHEMA
+from fse_rating_system.storage import AssessmentStore
+
+
+def make_result(name, location, date, scores):
+    scores = dict(zip(DEFAULT_SCHEMA.part_names, scores))
+    total = sum(scores.values())
+    return {
+        "name": name, "location": location, "owner_name": "Owner", "owner_contact": "555-0000",
+        "assessment_date": date, "assessment_scores": scores,
+        "total_score": total, "star_rating": DEFAULT_SCHEMA.star_rating(total),
+    }
+
+
+class TestAssessmentStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = AssessmentStore(os.path.join(self.tmp.name, "assessments.db"))
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def test_wal_mode(self):
+        """Test that file databases run in WAL mode."""
+        mode = self.store.connection.execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(mode, "wal")
+
+    def test_sync_writes_database_file(self):
+        """Test that sync moves committed rows from the WAL into the database file."""
+        self.store.add_results([make_result("Cafe A", "Accra", "2024-05-10", (5, 5, 5, 5, 5, 5))])
+        self.store.sync()
+        copy_path = os.path.join(self.tmp.name, "copy.db")
+        with open(os.path.join(self.tmp.name, "assessments.db"), "rb") as f, open(copy_path, "wb") as copy:
+            copy.write(f.read()) # Without the -wal file
+        with AssessmentStore(copy_path) as copy_store:
+            self.assertEqual(copy_store.count(), 1)
+
+    def test_bulk_insert_and_query(self):
+        """Test bulk inserts and the '1-star FSEs in location X last quarter' query."""
+        results = [
+            make_result("Cafe A", "Accra", "2024-05-10", (5, 5, 5, 5, 5, 5)),     # 1 star, in range
+            make_result("Cafe B", "Accra", "2024-02-10", (5, 5, 5, 5, 5, 5)),     # 1 star, too early
+            make_result("Cafe C", "Kumasi", "2024-05-10", (5, 5, 5, 5, 5, 5)),    # other location
+            make_result("Cafe D", "Accra", "2024-06-01", (20, 20, 20, 10, 20, 10)),  # 5 stars
+            {"name": "Bad", "location": "Accra", "error": "Invalid checklist scores."},
+        ]
+        self.assertEqual(self.store.add_results(results, batch_size=2), 4)
+        self.assertEqual(self.store.count(), 4)
+
+        rows = self.store.query(location="Accra", star_rating=1, since="2024-04-01", until="2024-06-30")
+        self.assertEqual([row["establishment"] for row in rows], ["Cafe A"])
+        self.assertEqual(rows[0]["assessment_scores"]["Part 7: Cleaning"], 5)
+        self.assertEqual(rows[0]["total_score"], 30)
+        self.assertEqual((rows[0]["schema_name"], rows[0]["schema_version"]), ("default", "1"))
+
+    def test_schema_name_added_to_old_database(self):
+        """Test that a database without the schema_name column is upgraded when opened."""
+        path = os.path.join(self.tmp.name, "old.db")
+        connection = sqlite3.connect(path)
+        connection.executescript("""
+            CREATE TABLE assessments (id INTEGER PRIMARY KEY, establishment TEXT NOT NULL, location TEXT NOT NULL,
+                owner_name TEXT, owner_contact TEXT, assessment_date TEXT, schema_version TEXT NOT NULL,
+                scores BLOB NOT NULL, total_score INTEGER NOT NULL, star_rating INTEGER NOT NULL);
+            CREATE INDEX idx_assessments_total ON assessments (schema_version, total_score);
+            INSERT INTO assessments (establishment, location, schema_version, scores, total_score, star_rating)
+                VALUES ('Cafe A', 'Accra', '1', x'050505050505', 30, 1);
+        """)
+        connection.close()
+        with AssessmentStore(path) as store:
+            store.add_results([make_result("Cafe B", "Accra", "2024-05-10", (5, 5, 5, 5, 5, 5))])
+            self.assertEqual({row["schema_name"] for row in store.query()}, {"default"})
+
+    def test_rating_query_uses_index(self):
+        """Test that rating/location/date queries are served by an index, not a full scan."""
+        plan = self.store.connection.execute(
+            "EXPLAIN QUERY PLAN SELECT id FROM assessments "
+            "WHERE star_rating = 1 AND location = 'Accra' AND assessment_date >= '2024-04-01'"
+        ).fetchall()
+        self.assertIn("idx_assessments_rating", " ".join(str(step) for step in plan))
+
+    def test_add_assessment(self):
+        """Test storing a single perform_assessment result."""
+        fse = FSE("Cafe E", "Tema", "Esi", "555-0005")
+        perform_assessment(fse, dict(zip(DEFAULT_SCHEMA.part_names, (18, 20, 15, 7, 18, 9))))
+        row_id = self.store.add_assessment(fse, {"Date of Assessment": "2024-07-31"})
+        row = self.store.query(establishment="Cafe E")[0]
+        self.assertEqual(row["id"], row_id)
+        self.assertEqual((row["total_score"], row["star_rating"]), (87, 4))
+        self.assertEqual(row["assessment_scores"], fse.assessment_scores)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+
+from fse_rating_system.models import FSE
+from fse_rating_system.notifications import format_assessment_sms
+from fse_rating_system.schema import ChecklistSchema
+from fse_rating_system.templates import (MessageTemplate, get_template, register_template,
+                                         sms_encoding, sms_length, sms_segments)
+
+
+def assessed_fse():
+    fse = FSE("The Corner Cafe", "789 Main St", "Sarah Owner", "555-8765")
+    fse.total_score = 85
+    fse.star_rating = 4
+    return fse
+
+
+class TestMessageTemplate(unittest.TestCase):
+
+    def test_default_message_unchanged(self):
+        """Test that the compiled default template renders the original SMS text."""
+        expected = (
+            "Dear Sarah Owner,\n"
+            "The food safety assessment for 'The Corner Cafe' is complete.\n"
+            "Final Score: 85/100.\n"
+            "Star Rating: 4 Star(s).\n"
+            "Thank you."
+        )
+        self.assertEqual(format_assessment_sms(assessed_fse()), expected)
+
+    def test_cached_per_language_and_schema(self):
+        """Test that templates are compiled once per (language, schema)."""
+        schema = ChecklistSchema({"A": 40, "B": 10}, version="custom")
+        self.assertIs(get_template("en"), get_template("en"))
+        self.assertIs(get_template("en", schema), get_template("en", schema))
+        self.assertIsNot(get_template("en"), get_template("en", schema))
+        self.assertIn("Final Score: 85/50.", format_assessment_sms(assessed_fse(), schema))
+
+    def test_segment_cost_known_at_compile_time(self):
+        """Test encoding and segment estimates for GSM-7 and UCS-2 templates."""
+        template = get_template("en")
+        self.assertEqual(template.encoding, "GSM-7")
+        self.assertEqual(template.max_segments, 2)
+
+        short = MessageTemplate("{name}: {star_rating}*")
+        self.assertEqual((short.encoding, short.max_length, short.max_segments), ("GSM-7", 64, 1))
+
+        unicode_template = MessageTemplate("★ {star_rating} — {name}")
+        self.assertEqual(unicode_template.encoding, "UCS-2")
+        self.assertEqual(unicode_template.max_segments, sms_segments(unicode_template.max_length, "UCS-2"))
+
+    def test_sms_length_helpers(self):
+        """Test GSM-7 extension characters and segment boundaries."""
+        self.assertEqual(sms_encoding("Price: 5€"), "GSM-7")
+        self.assertEqual(sms_length("5€"), 3)
+        self.assertEqual(sms_segments(160, "GSM-7"), 1)
+        self.assertEqual(sms_segments(161, "GSM-7"), 2)
+        self.assertEqual(sms_segments(70, "UCS-2"), 1)
+        self.assertEqual(sms_segments(135, "UCS-2"), 3)
+
+    def test_unknown_field_rejected(self):
+        """Test that templates with unknown fields fail to compile."""
+        with self.assertRaises(ValueError):
+            MessageTemplate("Hello {owner_phone}")
+        with self.assertRaises(ValueError):
+            register_template("xx", "Hello {owner_phone}")
+
+    def test_register_template(self):
+        """Test registering a template for another language."""
+        register_template("fr", "Bonjour {owner_name}, note {total_score}/{max_score}, {star_rating} etoile(s).")
+        self.assertEqual(format_assessment_sms(assessed_fse(), language="fr"),
+                         "Bonjour Sarah Owner, note 85/100, 4 etoile(s).")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import contextlib
+import io
+import unittest
+
+from fse_rating_system.models import FSE, AssessmentChecklist
+from fse_rating_system.assessment import perform_assessment, perform_assessments_batch
+from fse_rating_system.validation import (ERROR_NOT_A_NUMBER, ERROR_OUT_OF_RANGE, ERROR_UNKNOWN_PART,
+                                          ERROR_WRONG_WIDTH, ValidationCounters, counters,
+                                          validate_batch, validate_scores)
+
+
+class TestValidateScores(unittest.TestCase):
+
+    def setUp(self):
+        counters.reset()
+
+    def test_collects_all_errors(self):
+        """Test that every bad part in a record is reported, not just the first."""
+        result = validate_scores({
+            "Part 2: Documentations": 25,
+            "Part X: Imaginary Section": 10,
+            "Part 5: Water Sources and Storage": "ten",
+            "Part 7: Cleaning": 5,
+        })
+        self.assertFalse(result.ok)
+        self.assertEqual(result.errors, ((ERROR_OUT_OF_RANGE, 0), (ERROR_UNKNOWN_PART, -1), (ERROR_NOT_A_NUMBER, 3)))
+        self.assertEqual(result.messages()[0], "Score for Part 2: Documentations must be between 0 and 20.")
+
+    def test_non_integer_scores(self):
+        """Test that floats and bools are not valid part scores, as the store and the batch scorer need integers."""
+        result = validate_scores({"Part 2: Documentations": 18.5, "Part 7: Cleaning": True})
+        self.assertEqual(result.errors, ((ERROR_NOT_A_NUMBER, 0), (ERROR_NOT_A_NUMBER, 5)))
+        fse = FSE("Cafe", "Accra", "Ama", "555-0001")
+        self.assertEqual(perform_assessment(fse, {"Part 2: Documentations": True}, quiet=True), (None, None))
+        self.assertEqual(perform_assessment(fse, {"Part 2: Documentations": 18.5}, quiet=True), (None, None))
+        self.assertFalse(AssessmentChecklist().set_score("Part 2: Documentations", 18.5, verbose=False))
+
+    def test_valid_record(self):
+        """Test that a valid record has no errors."""
+        self.assertTrue(validate_scores({"Part 2: Documentations": 20}).ok)
+
+    def test_counters(self):
+        """Test that the exported counters track records and error codes."""
+        validate_scores({"Part 2: Documentations": 25, "Part 3: Personal Hygiene of Food handlers": -1})
+        validate_scores({"Part 2: Documentations": 5})
+        exported = counters.export()
+        self.assertEqual(exported["records"], 2)
+        self.assertEqual(exported["invalid_records"], 1)
+        self.assertEqual(exported["errors"]["out_of_range"], 2)
+        self.assertEqual(ValidationCounters().export()["records"], 0)
+
+    def test_validate_batch(self):
+        """Test the column-wise batch validator."""
+        rows = [
+            (18, 20, 15, 7, 18, 9),
+            (25, 20, 15, 7, 18, 11),
+            (18, 20),
+        ]
+        invalid = validate_batch(rows)
+        self.assertEqual(sorted(invalid), [1, 2])
+        self.assertEqual(invalid[1].errors, ((ERROR_OUT_OF_RANGE, 0), (ERROR_OUT_OF_RANGE, 5)))
+        self.assertEqual(invalid[2].errors, ((ERROR_WRONG_WIDTH, -1),))
+        self.assertEqual(counters.records, 3)
+
+    def test_validate_batch_non_integers(self):
+        """Test that the batch validator reports non-integer scores like the batch scorer flags them."""
+        rows = [
+            (None, 20, 15, 7, 18, 9),
+            (18.5, "20", 15, 7, 18, 9),
+            (18, 20, 15, 7, 18, 9),
+        ]
+        invalid = validate_batch(rows)
+        self.assertEqual(invalid[0].errors, ((ERROR_NOT_A_NUMBER, 0),))
+        self.assertEqual(invalid[1].errors, ((ERROR_NOT_A_NUMBER, 0), (ERROR_NOT_A_NUMBER, 1)))
+        self.assertEqual(sorted(invalid), [i for i, bad in enumerate(perform_assessments_batch(rows)[2]) if bad])
+
+
+class TestQuietAssessment(unittest.TestCase):
+
+    def test_quiet_mode_prints_nothing(self):
+        """Test that perform_assessment and set_score can run without printing."""
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            fse = FSE("Cafe", "Accra", "Ama", "555-0001")
+            self.assertEqual(perform_assessment(fse, {"Part 2: Documentations": 25}, quiet=True), (None, None))
+            self.assertFalse(AssessmentChecklist().set_score("Invalid Part", 1, verbose=False))
+        self.assertEqual(output.getvalue(), "")
+
+
+if __name__ == '__main__':
+    unittest.main()